@@ -0,0 +1 @@
+# Mock Equifax package
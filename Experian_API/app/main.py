@@ -35,13 +35,17 @@ README (developer quickstart)
 from __future__ import annotations
 
 import asyncio
+import os
 import uuid
 from typing import List, Optional
 
 from fastapi import Depends, FastAPI, Header, HTTPException, Request, Response
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel
 
+from . import profiling
+
 
 # --------- Pydantic request models (minimal fields we use) ---------
 
@@ -332,12 +336,39 @@ def make_success_body(req: CreditReportRequest) -> dict:
 
 app = FastAPI(title="Mock Experian Credit Profile", version="0.1.0")
 
+# On-demand request profiling (no middleware at all unless PROFILING_ENABLED)
+profiling.install(app)
+
+# Credit profiles are large JSON documents; gzip them for clients that accept it
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=int(os.getenv("GZIP_MINIMUM_SIZE", "1024")),
+    compresslevel=int(os.getenv("GZIP_COMPRESSLEVEL", "6")),
+)
+
 
 @app.get("/")
 async def root():
     return {"status": "ok", "service": "mock-experian-credit-profile"}
 
 
+@app.get("/__debug/profiles")
+async def debug_profiles(x_admin_token: Optional[str] = Header(default=None, alias="X-Admin-Token")):
+    if not profiling.is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    return {"profiles": profiling.list_profiles()}
+
+
+@app.get("/__debug/profiles/{name}")
+async def debug_profile_download(name: str, x_admin_token: Optional[str] = Header(default=None, alias="X-Admin-Token")):
+    if not profiling.is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    path = profiling.profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=name)
+
+
 @app.post("/v2/credit-report")
 async def credit_report(
     req: CreditReportRequest,
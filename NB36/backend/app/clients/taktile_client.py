@@ -1,17 +1,42 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 import httpx
 from ..config import settings
 
 
+# Remaining budget (ms) Taktile has to answer; it abandons the workflow once it is spent
+DEADLINE_HEADER = "X-Deadline-Ms"
+# Taktile's vendor-queue lane; applicants waiting on the frontend are "interactive"
+PRIORITY_HEADER = "X-Priority-Class"
+
+
 class TaktileClient:
-    def __init__(self, base_url: str | None = None, timeout: float = 10.0) -> None:
+    def __init__(self, base_url: str | None = None, timeout: float | None = None) -> None:
         self.base_url = (base_url or settings.TAKTILE_BASE_URL).rstrip("/")
-        self.client = httpx.Client(timeout=timeout)
+        self.timeout = timeout or settings.TAKTILE_TIMEOUT_SECONDS
+        self.client = httpx.Client(timeout=self.timeout, headers={"Accept-Encoding": "gzip"})
 
+    def _deadline_headers(self) -> Dict[str, str]:
+        budget = max(0.0, self.timeout - settings.TAKTILE_DEADLINE_MARGIN_SECONDS)
+        return {"Content-Type": "application/json", DEADLINE_HEADER: str(int(budget * 1000))}
 
-    def kyc_full(self, case_id: str, intake: Dict[str, Any]) -> Dict[str, Any]:
+
+    def kyc_full(
+        self,
+        case_id: str,
+        intake: Dict[str, Any],
+        callback: Optional[Dict[str, str]] = None,
+        priority: str = "interactive",
+        prefetch_token: Optional[str] = None,
+        replay_callback: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
         """
         Calls Taktile orchestrator to run full KYC (AML + Fraud).
+        With `replay_callback` ({"url", "token"}) a SEON/Experian outage yields status "PENDING_VENDOR" and Taktile
+        POSTs the full result to the callback once the vendor has recovered.
+        `prefetch_token` (from kyc_prefetch) lets Taktile reuse SEON results fetched while the form was being filled.
+        With `callback` ({"url", "token"}) Taktile may return a provisional CREDIT_PASS with
+        "income_pending": true and POST the income result to the callback later.
+        `priority` is the Taktile lane: "interactive" for live applications, "batch" for backfills/re-screens.
         Expects response:
           {
             "case_id": ...,
@@ -24,7 +49,33 @@ class TaktileClient:
           }
         """
         url = f"{self.base_url}/workflows/kyc/full"
-        payload = {"case_id": case_id, "intake": intake}
-        resp = self.client.post(url, json=payload, headers={"Content-Type": "application/json"})
+        payload: Dict[str, Any] = {"case_id": case_id, "intake": intake}
+        if callback:
+            payload["callback"] = callback
+        if prefetch_token:
+            payload["prefetch_token"] = prefetch_token
+        if replay_callback:
+            payload["replay_callback"] = replay_callback
+        headers = self._deadline_headers()
+        headers[PRIORITY_HEADER] = priority
+        resp = self.client.post(url, json=payload, headers=headers)
+        resp.raise_for_status()
+        return resp.json()
+
+    def kyc_prefetch(self, intake: Dict[str, Any], token: Optional[str] = None, priority: str = "interactive") -> Dict[str, Any]:
+        """
+        Asks Taktile to start the SEON AML/fraud calls a partial intake already allows. Returns at once:
+          {"token": str, "stages": {"aml": "started" | "unchanged" | "ineligible" | "skipped", "fraud": ...}, "expires_in": float}
+        """
+        url = f"{self.base_url}/workflows/kyc/prefetch"
+        payload: Dict[str, Any] = {"intake": intake}
+        if token:
+            payload["token"] = token
+        resp = self.client.post(
+            url,
+            json=payload,
+            headers={"Content-Type": "application/json", PRIORITY_HEADER: priority},
+            timeout=settings.TAKTILE_PREFETCH_TIMEOUT_SECONDS,
+        )
         resp.raise_for_status()
         return resp.json()
@@ -6,5 +6,31 @@ class Settings(BaseModel):
     # Taktile service base URL (the orchestrator we call from backend)
     #TAKTILE_BASE_URL: str = os.getenv("TAKTILE_BASE_URL", "http://localhost:9100")
     TAKTILE_BASE_URL: str = os.getenv("TAKTILE_BASE_URL", "https://nb-taktile.onrender.com")
+    # How long we wait for Taktile, and how much of that we keep for ourselves when telling
+    # Taktile its deadline (so it answers before we give up on it)
+    TAKTILE_TIMEOUT_SECONDS: float = float(os.getenv("TAKTILE_TIMEOUT_SECONDS", "10.0"))
+    TAKTILE_DEADLINE_MARGIN_SECONDS: float = float(os.getenv("TAKTILE_DEADLINE_MARGIN_SECONDS", "0.5"))
+    # Public URL of POST /callbacks/taktile/income on this backend. When set, Taktile may answer with a
+    # provisional CREDIT_PASS (income_pending) and deliver the income result there later
+    TAKTILE_CALLBACK_URL: str = os.getenv("TAKTILE_CALLBACK_URL", "")
+    # Public URL of POST /callbacks/taktile/kyc on this backend. When set, Taktile queues a case that hits a SEON or
+    # Experian outage (status PENDING_VENDOR) and delivers the result there once the vendor has recovered
+    TAKTILE_REPLAY_CALLBACK_URL: str = os.getenv("TAKTILE_REPLAY_CALLBACK_URL", "")
+    # Prefetch only starts vendor calls on Taktile, so it should answer fast; a slow or failed prefetch is ignored
+    TAKTILE_PREFETCH_TIMEOUT_SECONDS: float = float(os.getenv("TAKTILE_PREFETCH_TIMEOUT_SECONDS", "2.0"))
+    # Response compression: gzip bodies of at least GZIP_MINIMUM_SIZE bytes when the client accepts it
+    GZIP_MINIMUM_SIZE: int = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+    GZIP_COMPRESSLEVEL: int = int(os.getenv("GZIP_COMPRESSLEVEL", "6"))
+    # Raw vendor payloads kept on each case are zlib-compressed with a dictionary trained per vendor. Dictionaries are
+    # versioned files in PAYLOAD_DICT_DIR; the first one is trained once PAYLOAD_DICT_SAMPLES payloads have been seen
+    PAYLOAD_COMPRESSION: bool = os.getenv("PAYLOAD_COMPRESSION", "true").lower() in ("1", "true", "yes")
+    PAYLOAD_COMPRESSLEVEL: int = int(os.getenv("PAYLOAD_COMPRESSLEVEL", "6"))
+    PAYLOAD_DICT_DIR: str = os.getenv("PAYLOAD_DICT_DIR", "nb36_payload_dicts")
+    PAYLOAD_DICT_SIZE: int = int(os.getenv("PAYLOAD_DICT_SIZE", "32768"))
+    PAYLOAD_DICT_SAMPLES: int = int(os.getenv("PAYLOAD_DICT_SAMPLES", "64"))
+    PAYLOAD_DICT_RESCAN_SECONDS: float = float(os.getenv("PAYLOAD_DICT_RESCAN_SECONDS", "60"))
+    # Admin endpoints (/admin/*) are disabled while this is empty
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+
 
 settings = Settings()
@@ -1,8 +1,15 @@
-from fastapi import FastAPI, HTTPException
+import hmac
+import secrets
+import threading
+
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any
 
+from . import memory, payloads
+from .config import settings
 from .stages import B1
 from .clients.taktile_client import TaktileClient
 
@@ -16,9 +23,31 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE, compresslevel=settings.GZIP_COMPRESSLEVEL)
 
 taktile = TaktileClient()
 
+# case_id -> token Taktile must present when delivering a pending income result (one delivery per case)
+_INCOME_CALLBACK_TOKENS: Dict[str, str] = {}
+# case_id -> token Taktile must present when delivering the replay of a case queued during a vendor outage
+_KYC_CALLBACK_TOKENS: Dict[str, str] = {}
+# case_id -> the same token, kept after the replay: Taktile also delivers webhook re-evaluations of the case with it
+_CASE_UPDATE_TOKENS: Dict[str, str] = {}
+
+# Serializes callback deliveries with the recording of Taktile's response: Taktile may deliver a callback before
+# its response to /apply/kyc has been recorded, and the response must not overwrite the callback's final state
+_CALLBACK_LOCK = threading.RLock()
+
+# Taktile status of a case queued until a vendor outage ends
+PENDING_VENDOR = "PENDING_VENDOR"
+
+app.include_router(memory.router)
+app.include_router(payloads.router)
+memory.register_store("B1.cases", lambda: B1._CASES)
+memory.register_store("income_callback_tokens", lambda: _INCOME_CALLBACK_TOKENS)
+memory.register_store("kyc_callback_tokens", lambda: _KYC_CALLBACK_TOKENS)
+memory.register_store("case_update_tokens", lambda: _CASE_UPDATE_TOKENS)
+
 
 class ApplicationIntake(BaseModel):
     user_fullname: str
@@ -36,35 +65,38 @@ class ApplicationIntake(BaseModel):
     ip: Optional[str] = None
     session: Optional[str] = None
     custom_fields: Optional[Dict[str, Any]] = Field(default_factory=dict)
+    # Token returned by /apply/prefetch for this application (not part of the stored intake)
+    prefetch_token: Optional[str] = None
 
 
+class PrefetchIntake(BaseModel):
+    # Whatever the applicant has entered so far; Taktile decides which vendor calls it allows
+    user_fullname: Optional[str] = None
+    user_dob: Optional[str] = None
+    user_country: Optional[str] = None
+    email: Optional[str] = None
+    phone_number: Optional[str] = None
+    ip: Optional[str] = None
+    session: Optional[str] = None
+    custom_fields: Optional[Dict[str, Any]] = Field(default_factory=dict)
+    token: Optional[str] = None
 
 
-@app.post("/apply/kyc")
-def apply_kyc(intake: ApplicationIntake):
-    # B1: Create case
-    case = B1.create_case(intake.dict())
-    # Delegate full KYC (AML + Fraud) to Taktile (T*)
-    try:
-        result = taktile.kyc_full(case_id=case["case_id"], intake=case["intake"])
-    except Exception as e:
-        # Technical failure contacting Taktile — treat as review for this stage
-        B1.update_case(case["case_id"], status="FRAUD_REVIEW")
-        B1.append_timeline(case["case_id"], "taktile.error", {"error": str(e)})
-        return {
-            "case_id": case["case_id"],
-            "status": "FRAUD_REVIEW",
-            "aml_decision": None,
-            "fraud_decision": {
-                "decision": "FRAUD_REVIEW",
-                "reasons": ["taktile_unavailable_or_error"],
-                "details": {"exception": str(e)},
-            },
-            "provisional_tier": None,
-            "message": "KYC stage failed due to technical error contacting Taktile.",
-        }
+class IncomeCallback(BaseModel):
+    case_id: str
+    status: str
+    income_decision: Optional[Dict[str, Any]] = None
+    final_tier: Optional[int] = None
+    error: Optional[str] = None
 
-    # Persist outcome on case
+
+
+
+def _record_kyc_result(case_id: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Persist a Taktile KYC result on the case and build the applicant-facing response (apply_kyc, and the
+    replay of a case queued during a vendor outage).
+    """
     aml_decision = result.get("aml_decision")
     fraud_decision = result.get("fraud_decision")
     provisional_tier = result.get("provisional_tier")
@@ -78,32 +110,60 @@ def apply_kyc(intake: ApplicationIntake):
     income_decision = result.get("income_decision")
 
     status = result.get("status") or ("AML_DECLINE" if (aml_decision and aml_decision.get("decision") == "DECLINE") else None)
+    income_pending = bool(result.get("income_pending"))
+    income_delivered = False
+    with _CALLBACK_LOCK:
+        if income_pending and case_id not in _INCOME_CALLBACK_TOKENS:
+            # The income callback (which consumes the token) arrived first: keep the final state it recorded
+            case = B1.get_case(case_id) or {}
+            status, income_decision, final_tier = case.get("status"), case.get("income_decision"), case.get("final_tier")
+            income_pending, income_delivered = False, True
+        if not income_pending:
+            _INCOME_CALLBACK_TOKENS.pop(case_id, None)
 
-    B1.update_case(
-        case["case_id"],
-        status=status,
-        aml_raw=result.get("aml_raw"),
-        aml_decision=aml_decision,
-        fraud_raw=result.get("fraud_raw"),
-        fraud_decision=fraud_decision,
-        provisional_tier=provisional_tier,
-        credit_raw=result.get("credit_raw"),
-        credit_decision=credit_decision,
-        bureau_tier=bureau_tier,
-        # Persist income if provided
-        income_decision=income_decision,
-        final_tier=final_tier,
-    )
+        B1.update_case(
+            case_id,
+            status=status,
+            aml_raw=payloads.pack("seon_aml", result.get("aml_raw")),
+            aml_decision=aml_decision,
+            fraud_raw=payloads.pack("seon_fraud", result.get("fraud_raw")),
+            fraud_decision=fraud_decision,
+            provisional_tier=provisional_tier,
+            credit_raw=payloads.pack("experian", result.get("credit_raw")),
+            credit_decision=credit_decision,
+            bureau_tier=bureau_tier,
+            # Persist income if provided
+            income_decision=income_decision,
+            income_pending=income_pending,
+            final_tier=final_tier,
+        )
     if fraud_decision is not None:
-        B1.append_timeline(case["case_id"], "fraud.screened", {"decision": fraud_decision})
+        B1.append_timeline(case_id, "fraud.screened", {"decision": fraud_decision})
     if credit_decision is not None:
-        B1.append_timeline(case["case_id"], "credit.screened", {"decision": credit_decision})
-    if income_decision is not None:
-        B1.append_timeline(case["case_id"], "income.screened", {"decision": income_decision})
-    B1.append_timeline(case["case_id"], "kyc.completed", {"status": status})
+        B1.append_timeline(case_id, "credit.screened", {"decision": credit_decision})
+    if income_decision is not None and not income_delivered:
+        B1.append_timeline(case_id, "income.screened", {"decision": income_decision})
+    if income_pending:
+        # Taktile finishes income in the background and calls /callbacks/taktile/income
+        B1.append_timeline(case_id, "income.pending", {"status": status})
+        return {
+            "case_id": case_id,
+            "status": status,
+            "income_pending": True,
+            "aml_decision": aml_decision,
+            "fraud_decision": fraud_decision,
+            "provisional_tier": provisional_tier,
+            "credit_decision": credit_decision,
+            "income_decision": None,
+            "bureau_tier": bureau_tier,
+            "final_tier": final_tier,
+            "message": "Credit passed; income verification is still running and will update the case when it completes",
+        }
+    if not income_delivered:
+        B1.append_timeline(case_id, "kyc.completed", {"status": status})
 
     return {
-        "case_id": case["case_id"],
+        "case_id": case_id,
         "status": status,
         "aml_decision": aml_decision,
         "fraud_decision": fraud_decision,
@@ -116,9 +176,154 @@ def apply_kyc(intake: ApplicationIntake):
     }
 
 
+def _case_response(case_id: str) -> Dict[str, Any]:
+    """
+    Applicant-facing response from the decisions already recorded on the case.
+    """
+    case = B1.get_case(case_id) or {}
+    out = {k: case.get(k) for k in (
+        "status", "aml_decision", "fraud_decision", "provisional_tier", "credit_decision", "income_decision",
+        "bureau_tier", "final_tier",
+    )}
+    if case.get("income_pending"):
+        out["income_pending"] = True
+    return {"case_id": case_id, **out, "message": "End-to-end KYC (AML + Fraud + Credit + Income) completed for demo"}
+
+
+@app.post("/apply/prefetch")
+def apply_prefetch(partial: PrefetchIntake):
+    """
+    Called by the form while the applicant is still typing: Taktile starts the SEON calls the fields so far
+    allow and parks the results under the returned token, which the form sends with /apply/kyc.
+    Best effort: on any error the form just submits without a token.
+    """
+    # Sanitized like B1.create_case, so the final intake builds the same vendor payloads
+    intake = {k: (v.strip() if isinstance(v, str) else v) for k, v in partial.dict(exclude={"token"}, exclude_none=True).items()}
+    try:
+        return taktile.kyc_prefetch(intake, token=partial.token)
+    except Exception as e:
+        return {"token": None, "stages": {}, "error": str(e)}
+
+
+@app.post("/apply/kyc")
+def apply_kyc(intake: ApplicationIntake):
+    # B1: Create case
+    case = B1.create_case(intake.dict(exclude={"prefetch_token"}))
+    # Delegate full KYC (AML + Fraud) to Taktile (T*)
+    callback = None
+    if settings.TAKTILE_CALLBACK_URL:
+        callback = {"url": settings.TAKTILE_CALLBACK_URL, "token": secrets.token_urlsafe(24)}
+        _INCOME_CALLBACK_TOKENS[case["case_id"]] = callback["token"]
+    replay_callback = None
+    if settings.TAKTILE_REPLAY_CALLBACK_URL:
+        replay_callback = {"url": settings.TAKTILE_REPLAY_CALLBACK_URL, "token": secrets.token_urlsafe(24)}
+        _KYC_CALLBACK_TOKENS[case["case_id"]] = replay_callback["token"]
+        _CASE_UPDATE_TOKENS[case["case_id"]] = replay_callback["token"]
+    try:
+        result = taktile.kyc_full(
+            case_id=case["case_id"],
+            intake=case["intake"],
+            callback=callback,
+            prefetch_token=intake.prefetch_token,
+            replay_callback=replay_callback,
+        )
+    except Exception as e:
+        _INCOME_CALLBACK_TOKENS.pop(case["case_id"], None)
+        _KYC_CALLBACK_TOKENS.pop(case["case_id"], None)
+        _CASE_UPDATE_TOKENS.pop(case["case_id"], None)
+        # Technical failure contacting Taktile — treat as review for this stage
+        B1.update_case(case["case_id"], status="FRAUD_REVIEW")
+        B1.append_timeline(case["case_id"], "taktile.error", {"error": str(e)})
+        return {
+            "case_id": case["case_id"],
+            "status": "FRAUD_REVIEW",
+            "aml_decision": None,
+            "fraud_decision": {
+                "decision": "FRAUD_REVIEW",
+                "reasons": ["taktile_unavailable_or_error"],
+                "details": {"exception": str(e)},
+            },
+            "provisional_tier": None,
+            "message": "KYC stage failed due to technical error contacting Taktile.",
+        }
+
+    if result.get("status") == PENDING_VENDOR:
+        # Taktile queued the case during a vendor outage; the replay result arrives at /callbacks/taktile/kyc
+        with _CALLBACK_LOCK:
+            if case["case_id"] not in _KYC_CALLBACK_TOKENS:
+                # The vendor recovered and the replay (which consumes the token) was recorded first: it stands
+                return _case_response(case["case_id"])
+            B1.update_case(case["case_id"], status=PENDING_VENDOR)
+            B1.append_timeline(case["case_id"], "kyc.queued", result.get("queued"))
+        return {
+            "case_id": case["case_id"],
+            "status": PENDING_VENDOR,
+            "aml_decision": None,
+            "fraud_decision": None,
+            "provisional_tier": None,
+            "message": "A verification provider is temporarily unavailable; the application will complete automatically once it is back",
+        }
+    with _CALLBACK_LOCK:
+        if replay_callback is not None and case["case_id"] not in _KYC_CALLBACK_TOKENS:
+            # A webhook re-evaluation was delivered while Taktile was answering: it is the newer result
+            return _case_response(case["case_id"])
+        _KYC_CALLBACK_TOKENS.pop(case["case_id"], None)
+        return _record_kyc_result(case["case_id"], result)
+
+
+@app.post("/callbacks/taktile/kyc")
+def taktile_kyc_callback(result: Dict[str, Any], x_callback_token: Optional[str] = Header(default=None, alias="X-Callback-Token")):
+    """
+    Result of a case Taktile queued during a vendor outage and replayed once the vendor recovered (see apply_kyc),
+    or re-evaluated after a vendor webhook (`reevaluated_by` set; any number of times per case). The body is the
+    /workflows/kyc/full response.
+    """
+    case_id = str(result.get("case_id") or "")
+    with _CALLBACK_LOCK:
+        expected = _CASE_UPDATE_TOKENS.get(case_id)
+        if not expected or not hmac.compare_digest(expected, x_callback_token or ""):
+            raise HTTPException(status_code=403, detail="Unknown case or invalid callback token")
+        _KYC_CALLBACK_TOKENS.pop(case_id, None)
+
+        if result.get("error"):
+            B1.append_timeline(case_id, "taktile.error", {"error": result["error"]})
+        if result.get("reevaluated_by"):
+            B1.append_timeline(case_id, "kyc.reevaluated", {"event": result["reevaluated_by"], "status": result.get("status")})
+        else:
+            B1.append_timeline(case_id, "kyc.replayed", {"status": result.get("status")})
+        out = _record_kyc_result(case_id, result)
+    return {"case_id": case_id, "status": out["status"]}
+
+
+@app.post("/callbacks/taktile/income")
+def taktile_income_callback(body: IncomeCallback, x_callback_token: Optional[str] = Header(default=None, alias="X-Callback-Token")):
+    """
+    Completion of an income stage that Taktile finished in the background (see apply_kyc).
+    """
+    with _CALLBACK_LOCK:
+        expected = _INCOME_CALLBACK_TOKENS.get(body.case_id)
+        if not expected or not hmac.compare_digest(expected, x_callback_token or ""):
+            raise HTTPException(status_code=403, detail="Unknown case or invalid callback token")
+        _INCOME_CALLBACK_TOKENS.pop(body.case_id, None)
+
+        B1.update_case(
+            body.case_id,
+            status=body.status,
+            income_decision=body.income_decision,
+            income_pending=False,
+            final_tier=body.final_tier,
+        )
+    if body.error:
+        B1.append_timeline(body.case_id, "taktile.error", {"error": body.error})
+    if body.income_decision is not None:
+        B1.append_timeline(body.case_id, "income.screened", {"decision": body.income_decision})
+    B1.append_timeline(body.case_id, "kyc.completed", {"status": body.status})
+    return {"case_id": body.case_id, "status": body.status}
+
+
 @app.get("/cases/{case_id}")
 def get_case(case_id: str):
     c = B1.get_case(case_id)
     if not c:
         raise HTTPException(status_code=404, detail="Case not found")
-    return c
+    return payloads.unpack_result(c)
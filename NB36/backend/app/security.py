@@ -0,0 +1,11 @@
+from fastapi import Header, HTTPException
+
+from .config import settings
+
+
+def require_admin(x_admin_token: str | None = Header(default=None, alias="X-Admin-Token")) -> None:
+    """
+    Dependency guarding /admin/* endpoints. Admin endpoints are disabled while ADMIN_TOKEN is unset.
+    """
+    if not settings.ADMIN_TOKEN or x_admin_token != settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin token required")
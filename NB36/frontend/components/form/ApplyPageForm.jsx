@@ -2,7 +2,7 @@ import React from "react";
 import Layout from "./Layout.jsx";
 import Section from "./Section.jsx";
 import ApplyModal from "../apply/ApplyModal.jsx";
-import { runApply } from "../../lib/api/apply.js";
+import { prefetchApply, runApply } from "../../lib/api/apply.js";
 import { telemetry } from "../../lib/telemetry.js";
 import { ArrowRight } from "lucide-react";
 
@@ -51,6 +51,21 @@ export default function ApplyPageForm({ demoConfig }) {
   const [report, setReport] = React.useState(null);
   const [logs, setLogs] = React.useState({ requests: [] });
 
+  // Prefetch: once name, DOB, email and phone are in, let the backend start the SEON checks while the
+  // applicant fills in the rest; the token goes with the final submit. Re-sent (debounced) on edits.
+  const prefetchToken = React.useRef(null);
+  React.useEffect(() => {
+    if (!fullName || !dob || !email.includes("@") || !phone) return undefined;
+    const timer = setTimeout(async () => {
+      const { user_fullname, user_dob, user_country, email: em, phone_number, custom_fields } = buildPayload();
+      prefetchToken.current = await prefetchApply(
+        { user_fullname, user_dob, user_country, email: em, phone_number, custom_fields },
+        prefetchToken.current
+      );
+    }, 800);
+    return () => clearTimeout(timer);
+  }, [fullName, dob, email, phone, demoConfig?.scenario]);
+
 
   function buildPayload() {
     const address_line1 = apt ? `${street}, ${apt}` : street;
@@ -139,7 +154,7 @@ export default function ApplyPageForm({ demoConfig }) {
     telemetry.apply_opened();
     telemetry.checks_started();
 
-    const payload = buildPayload();
+    const payload = { ...buildPayload(), prefetch_token: prefetchToken.current };
 
     try {
       const { report: rep, logs: lgs } = await runApply(payload, (update) => {
@@ -23,6 +23,8 @@
 
 //const ENDPOINT = "http://localhost:9000/apply/kyc";
 const ENDPOINT = "https://nb-backend-fv6v.onrender.com/apply/kyc";
+//const PREFETCH_ENDPOINT = "http://localhost:9000/apply/prefetch";
+const PREFETCH_ENDPOINT = "https://nb-backend-fv6v.onrender.com/apply/prefetch";
 
 /**
  * Simple UUID-like generator for demo purposes.
@@ -72,6 +74,27 @@ function safeClone(obj) {
   }
 }
 
+/**
+ * Warms the SEON AML/fraud checks with the fields entered so far. Best effort: resolves to the token to
+ * send as `prefetch_token` with the final submit, or the previous token (possibly null) on any error.
+ * @param {any} partial
+ * @param {string|null} token
+ * @returns {Promise<string|null>}
+ */
+export async function prefetchApply(partial, token) {
+  try {
+    const resp = await fetch(PREFETCH_ENDPOINT, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ ...partial, token }),
+    });
+    const data = await resp.json();
+    return data?.token || token;
+  } catch {
+    return token;
+  }
+}
+
 /**
  * @param {any} payload
  * @param {(partial: CheckResult) => void} onCheckUpdate
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import json
 import logging
+import os
 from typing import Any, Dict, Optional
 
 import httpx
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI, Header, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse
 
+from . import memory, profiling
 from .auth import validate_auth
 from .pdf import generate_bank_income_pdf
 from .schemas import (
@@ -32,7 +37,7 @@ from .schemas import (
     UserCreateResponse,
 )
 from .store import store
-from .utils import extract_options, gen_request_id, now_iso, plaid_error, rng_from_key
+from .utils import extract_options, gen_request_id, now_iso, plaid_error, rng_from_key, sign_webhook
 
 app = FastAPI(title="Mock Plaid Income API", version="0.1.0")
 logger = logging.getLogger("plaid_api")
@@ -45,6 +50,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (income reports, PDFs) for clients that accept gzip
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=int(os.getenv("GZIP_MINIMUM_SIZE", "1024")),
+    compresslevel=int(os.getenv("GZIP_COMPRESSLEVEL", "6")),
+)
+
 
 @app.middleware("http")
 async def logging_middleware(request: Request, call_next):
@@ -60,6 +72,13 @@ async def logging_middleware(request: Request, call_next):
     return resp
 
 
+# On-demand request profiling (no middleware at all unless PROFILING_ENABLED)
+profiling.install(app)
+
+for _name in ("users", "link_tokens", "public_tokens", "access_tokens", "items", "webhook_log"):
+    memory.register_store(f"store.{_name}", lambda _name=_name: getattr(store, _name))
+
+
 # ----------------------------- helpers -----------------------------
 
 
@@ -77,6 +96,9 @@ def _inject_error_if_any(options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     return plaid_error(etype, ecode, msg)
 
 
+EMPLOYERS = ["Acme Corp", "Globex", "Initech", "Umbrella", "Soylent", "Stark Industries"]
+
+
 def _require_item(req: AccessTokenRequest) -> Optional[Dict[str, Any]]:
     if not (req.access_token or req.client_user_id):
         return plaid_error("INVALID_INPUT", "INVALID_ACCESS_TOKEN", "Missing access_token or client_user_id")
@@ -96,7 +118,7 @@ def _derive_payroll_income(client_user_id: str, force_mode: Optional[str]) -> Op
         force_mode = None
 
     rng = rng_from_key(f"payroll:{client_user_id}")
-    employer = rng.choice(["Acme Corp", "Globex", "Initech", "Umbrella", "Soylent", "Stark Industries"])
+    employer = rng.choice(EMPLOYERS)
     cadence = rng.choice(["WEEKLY", "BIWEEKLY", "SEMIMONTHLY", "MONTHLY"])
     base_gross = rng.uniform(1800, 3200)
     net = base_gross * rng.uniform(0.7, 0.82)
@@ -130,13 +152,17 @@ def _derive_bank_income(client_user_id: str, coverage_months: int, force_mode: O
     return None
 
 
-def _derive_employment(client_user_id: str) -> EmploymentRecord:
+def _derive_employment(client_user_id: str, profile: Optional[str]) -> EmploymentRecord:
+    # Same employer as the user's payroll income (first draw of the payroll seed), ACTIVE unless the
+    # employment_profile option asks for an "inactive" record or a "mismatch" against payroll
+    employer = rng_from_key(f"payroll:{client_user_id}").choice(EMPLOYERS)
     rng = rng_from_key(f"employment:{client_user_id}")
-    employer = rng.choice(["Acme Corp", "Globex", "Initech", "Umbrella", "Soylent", "Stark Industries"])
+    if profile == "mismatch":
+        employer = rng.choice([e for e in EMPLOYERS if e != employer])
     year = rng.randint(2017, 2023)
     month = rng.randint(1, 12)
     day = rng.randint(1, 28)
-    status = rng.choice(["ACTIVE", "INACTIVE"])
+    status = "INACTIVE" if profile == "inactive" else "ACTIVE"
     return EmploymentRecord(employer=employer, status=status, hire_date=f"{year:04d}-{month:02d}-{day:02d}")
 
 
@@ -304,12 +330,18 @@ async def employment_get(request: Request, body: AccessTokenRequest):
     if not ok:
         return err
     rid = request.state.request_id
+    opts = extract_options(body.model_dump())
+    injected = _inject_error_if_any(opts)
+    if injected:
+        injected["request_id"] = rid
+        return injected
+
     resolved = _require_item(body)
     if isinstance(resolved, dict) and "error_type" in resolved:
         resolved["request_id"] = rid
         return resolved
     client_user_id = resolved["client_user_id"]  # type: ignore
-    emp = _derive_employment(client_user_id)
+    emp = _derive_employment(client_user_id, opts.get("employment_profile"))
     return {"employment": emp.model_dump(), "request_id": rid}
 
 
@@ -332,14 +364,17 @@ async def sandbox_fire_webhook(request: Request, body: FireWebhookRequest):
         "webhook_type": "INCOME",
         "webhook_code": body.webhook_code,
         "item_id": body.item_id,
+        **({"user_id": body.user_id} if body.user_id else {}),
         "timestamp": now_iso(),
         "request_id": rid,
     }
     store.append_webhook("sent", body.target, payload)
 
+    content = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    headers = {"Content-Type": "application/json", "Plaid-Verification": sign_webhook(content)}
     try:
         async with httpx.AsyncClient(timeout=5.0) as client:
-            await client.post(body.target, json=payload)
+            await client.post(body.target, content=content, headers=headers)
     except Exception as e:
         logger.warning("Webhook POST failed: %s", e)
 
@@ -351,5 +386,47 @@ async def root():
     return {"status": "ok", "service": "mock-plaid-income"}
 
 
+@app.get("/__debug/profiles")
+async def debug_profiles(x_admin_token: Optional[str] = Header(default=None, alias="X-Admin-Token")):
+    if not profiling.is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    return {"profiles": profiling.list_profiles()}
+
+
+@app.get("/__debug/profiles/{name}")
+async def debug_profile_download(name: str, x_admin_token: Optional[str] = Header(default=None, alias="X-Admin-Token")):
+    if not profiling.is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    path = profiling.profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=name)
+
+
+@app.post("/__debug/memory/start")
+async def debug_memory_start(frames: int = 1, x_admin_token: Optional[str] = Header(default=None, alias="X-Admin-Token")):
+    if not profiling.is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    return memory.start(max(1, min(frames, 50)))
+
+
+@app.post("/__debug/memory/stop")
+async def debug_memory_stop(x_admin_token: Optional[str] = Header(default=None, alias="X-Admin-Token")):
+    if not profiling.is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    return memory.stop()
+
+
+@app.get("/__debug/memory")
+async def debug_memory(limit: int = 20, group_by: str = "lineno", x_admin_token: Optional[str] = Header(default=None, alias="X-Admin-Token")):
+    """
+    In-memory store sizes (users, tokens, items, webhook_log) and, while tracing, top allocation
+    sites plus growth since the previous call.
+    """
+    if not profiling.is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    return memory.snapshot(limit=max(1, min(limit, 500)), group_by="filename" if group_by == "filename" else "lineno")
+
+
 # UVicorn entrypoint:
 # uvicorn Plaid_API.main:app --reload
@@ -0,0 +1,109 @@
+"""
+Allocation diagnostics (tracemalloc) and in-memory store sizes, served under /__debug/memory by the mock.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import tracemalloc
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+
+_lock = threading.Lock()
+_previous: Optional[tracemalloc.Snapshot] = None
+_stores: Dict[str, Callable[[], Any]] = {}
+
+# Deep sizing walks object graphs; stop after this many objects so huge stores stay cheap to report
+_SIZEOF_MAX_OBJECTS = 200_000
+
+
+def register_store(name: str, get_container: Callable[[], Any]) -> None:
+    """
+    Register an in-memory store; `get_container` returns the dict/list/deque holding its entries.
+    """
+    _stores[name] = get_container
+
+
+def _deep_sizeof(obj: Any) -> Dict[str, Any]:
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack and len(seen) < _SIZEOF_MAX_OBJECTS:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o, 0)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            stack.extend(o)
+        elif hasattr(o, "__dict__"):
+            stack.append(vars(o))
+    return {"approx_bytes": total, "truncated": bool(stack)}
+
+
+def store_sizes() -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for name, get_container in list(_stores.items()):
+        container = get_container()
+        try:
+            entries = len(container)
+        except TypeError:
+            entries = None
+        out[name] = {"entries": entries, **_deep_sizeof(container)}
+    return out
+
+
+def _stat_row(stat: Any) -> Dict[str, Any]:
+    frame = stat.traceback[0]
+    row = {"site": f"{frame.filename}:{frame.lineno}", "size_bytes": stat.size, "count": stat.count}
+    if hasattr(stat, "size_diff"):
+        row["size_diff_bytes"] = stat.size_diff
+        row["count_diff"] = stat.count_diff
+    return row
+
+
+def snapshot(limit: int = 20, group_by: str = "lineno") -> Dict[str, Any]:
+    """
+    Top allocation sites now, and the sites that grew most since the previous call.
+    """
+    global _previous
+    out: Dict[str, Any] = {"tracing": tracemalloc.is_tracing(), "stores": store_sizes()}
+    if not tracemalloc.is_tracing():
+        return out
+    snap = tracemalloc.take_snapshot().filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ]
+    )
+    with _lock:
+        previous, _previous = _previous, snap
+    current, peak = tracemalloc.get_traced_memory()
+    out["traced_current_bytes"] = current
+    out["traced_peak_bytes"] = peak
+    out["top"] = [_stat_row(s) for s in snap.statistics(group_by)[:limit]]
+    out["growth"] = [_stat_row(s) for s in snap.compare_to(previous, group_by)[:limit]] if previous else []
+    return out
+
+
+def start(frames: int = 1) -> Dict[str, Any]:
+    global _previous
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    with _lock:
+        _previous = None
+    return {"tracing": True, "frames": tracemalloc.get_traceback_limit()}
+
+
+def stop() -> Dict[str, Any]:
+    global _previous
+    tracemalloc.stop()
+    with _lock:
+        _previous = None
+    return {"tracing": False}
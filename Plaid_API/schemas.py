@@ -12,6 +12,7 @@ class Options(BaseModel):
     coverage_months: Optional[int] = Field(default=12, ge=1, le=60)
     risk_profile: Optional[Literal["clean", "suspicious"]] = None
     inject_error: Optional[str] = None
+    employment_profile: Optional[Literal["active", "inactive", "mismatch"]] = None
 
 
 class AuthBody(BaseModel):
@@ -77,6 +78,7 @@ class FireWebhookRequest(AuthBody):
     webhook_code: str
     item_id: str
     target: str
+    user_id: Optional[str] = None  # included in the body; Taktile finds the case by it (its client_user_id)
     body: Optional[Dict[str, Any]] = None  # optional custom body override
 
 
@@ -1,6 +1,9 @@
+import base64
 import hashlib
+import hmac
 import json
 import logging
+import os
 import random
 import time
 import uuid
@@ -10,6 +13,10 @@ from fastapi import Request
 
 logger = logging.getLogger("plaid_api")
 
+# Webhooks carry a `Plaid-Verification` JWT with Plaid's claims (iat, request_body_sha256), signed HS256 with
+# PLAID_WEBHOOK_SECRET instead of ES256 with a key served by /webhook_verification_key/get
+WEBHOOK_SECRET = os.getenv("PLAID_WEBHOOK_SECRET", "plaid-webhook-secret")
+
 
 def gen_request_id() -> str:
     return str(uuid.uuid4())
@@ -39,7 +46,7 @@ def extract_options(payload: Dict[str, Any]) -> Dict[str, Any]:
     if isinstance(payload, dict):
         if isinstance(payload.get("options"), dict):
             opts.update(payload["options"])
-        for k in ("force_mode", "coverage_months", "risk_profile", "inject_error"):
+        for k in ("force_mode", "coverage_months", "risk_profile", "inject_error", "employment_profile"):
             if k in payload and k not in opts:
                 opts[k] = payload[k]
     return opts
@@ -58,3 +65,18 @@ async def get_body_json(request: Request) -> Dict[str, Any]:
 
 def now_iso() -> str:
     return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def sign_webhook(body: bytes) -> str:
+    """
+    `Plaid-Verification` header value for a webhook body.
+    """
+    header = _b64url(json.dumps({"alg": "HS256", "kid": "mock-webhook-key", "typ": "JWT"}, separators=(",", ":")).encode("utf-8"))
+    claims = {"iat": int(time.time()), "request_body_sha256": hashlib.sha256(body).hexdigest()}
+    payload = _b64url(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    signature = hmac.new(WEBHOOK_SECRET.encode("utf-8"), f"{header}.{payload}".encode("ascii"), hashlib.sha256).digest()
+    return f"{header}.{payload}.{_b64url(signature)}"
@@ -27,6 +27,16 @@ class Settings(BaseModel):
     webhook_timeout_seconds: float = Field(default=5.0)
     webhook_debug_buffer: int = Field(default=50)
 
+    # Response compression (bodies >= gzip_minimum_size bytes, when the client sends Accept-Encoding: gzip)
+    gzip_minimum_size: int = Field(default_factory=lambda: int(os.getenv("GZIP_MINIMUM_SIZE", "1024")))
+    gzip_compresslevel: int = Field(default_factory=lambda: int(os.getenv("GZIP_COMPRESSLEVEL", "6")))
+
+    # Diagnostics (profiling); disabled while admin_token is empty
+    admin_token: str = Field(default_factory=lambda: os.getenv("ADMIN_TOKEN", ""))
+    profiling_enabled: bool = Field(default_factory=lambda: os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes"))
+    profile_dir: str = Field(default_factory=lambda: os.getenv("PROFILE_DIR", "profiles"))
+    profile_interval_ms: float = Field(default_factory=lambda: float(os.getenv("PROFILE_INTERVAL_MS", "5")))
+
     model_config = {
         "frozen": True,
         "str_strip_whitespace": True,
@@ -6,6 +6,7 @@ from typing import Callable
 
 from fastapi import Depends, FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 
 from .config import settings
@@ -13,6 +14,7 @@ from .utils.errors import (
     install_exception_handlers,
     success_envelope,
 )
+from .utils import profiling
 from .utils.security import require_api_key
 from .routes import fraud as fraud_routes
 from .routes import aml as aml_routes
@@ -41,6 +43,9 @@ def create_app() -> FastAPI:
         expose_headers=["X-Request-ID"],
     )
 
+    # Compress large responses for clients that accept gzip
+    app.add_middleware(GZipMiddleware, minimum_size=settings.gzip_minimum_size, compresslevel=settings.gzip_compresslevel)
+
     # Request ID + simple timing logging
     @app.middleware("http")
     async def request_context(request: Request, call_next: Callable):
@@ -82,6 +87,9 @@ def create_app() -> FastAPI:
             headers={"X-Request-ID": req_id},
         )
 
+    # On-demand request profiling (no middleware at all unless PROFILING_ENABLED)
+    profiling.install(app)
+
     # Error/exception handlers to standardize envelopes
     install_exception_handlers(app)
 
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -159,6 +159,11 @@ class LabelItem(BaseModel):
     label: str
 
 
+class TransactionStateItem(BaseModel):
+    transaction_id: str
+    state: Literal["APPROVE", "REVIEW", "DECLINE"]
+
+
 class ExclusionIn(BaseModel):
     user_ids: Optional[List[str]] = None
     emails: Optional[List[str]] = None
@@ -2,10 +2,14 @@ from __future__ import annotations
 
 from typing import Optional
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
 
 from ..services.store import get_webhook_attempts
+from ..utils import memory
 from ..utils.errors import success_envelope
+from ..utils.profiling import list_profiles, profile_path
+from ..utils.security import require_admin_token
 
 router = APIRouter()
 
@@ -18,3 +22,48 @@ async def debug_webhook_attempts(limit: Optional[int] = Query(default=50, ge=0,
     """
     attempts = get_webhook_attempts(limit=limit)
     return success_envelope(attempts)
+
+
+@router.get("/__debug/profiles", dependencies=[Depends(require_admin_token)])
+async def debug_profiles():
+    """
+    Lists request profiles (folded stacks) captured with `X-Profile: <ADMIN_TOKEN>`.
+    Requires X-Admin-Token.
+    """
+    return success_envelope(list_profiles())
+
+
+@router.get("/__debug/profiles/{name}", dependencies=[Depends(require_admin_token)])
+async def debug_profile_download(name: str):
+    """
+    Downloads one profile in folded-stack format (flamegraph.pl / speedscope input).
+    """
+    path = profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=name)
+
+
+@router.post("/__debug/memory/start", dependencies=[Depends(require_admin_token)])
+async def debug_memory_start(frames: int = Query(default=1, ge=1, le=50)):
+    """
+    Starts tracemalloc allocation tracing (costly; stop it when done).
+    """
+    return success_envelope(memory.start(frames))
+
+
+@router.post("/__debug/memory/stop", dependencies=[Depends(require_admin_token)])
+async def debug_memory_stop():
+    return success_envelope(memory.stop())
+
+
+@router.get("/__debug/memory", dependencies=[Depends(require_admin_token)])
+async def debug_memory(
+    limit: int = Query(default=20, ge=1, le=500),
+    group_by: str = Query(default="lineno", pattern="^(lineno|filename)$"),
+):
+    """
+    Returns in-memory store sizes and, while tracing, the top allocation sites plus their growth
+    since the previous call.
+    """
+    return success_envelope(memory.snapshot(limit=limit, group_by=group_by))
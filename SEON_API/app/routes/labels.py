@@ -2,10 +2,12 @@ from __future__ import annotations
 
 from typing import List
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 
-from ..models import LabelItem
+from ..config import settings
+from ..models import LabelItem, TransactionStateItem
 from ..services.store import allowed_labels, set_labels
+from ..services.webhooks import emit_transaction_status_update
 from ..utils.errors import success_envelope
 
 router = APIRouter()
@@ -23,3 +25,19 @@ async def put_transaction_labels(items: List[LabelItem]):
 
     summary = set_labels(items)
     return success_envelope(summary)
+
+
+@router.put("/SeonRestService/fraud-api/transaction-state/v2")
+async def put_transaction_states(items: List[TransactionStateItem], request: Request):
+    """
+    Stand-in for an analyst changing transaction states in the SEON admin panel.
+    Accepts an array of { transaction_id, state: APPROVE | REVIEW | DECLINE } items and emits a signed
+    transaction:status_update webhook for each (with the transaction's label, if any) when WEBHOOK_URL is set.
+    """
+    if not items:
+        raise HTTPException(status_code=400, detail="No items provided")
+
+    request_id = getattr(request.state, "request_id", None)
+    for item in items:
+        await emit_transaction_status_update(item.transaction_id, item.state, request_id)
+    return success_envelope({"updated": [item.transaction_id for item in items], "webhook": bool(settings.webhook_url)})
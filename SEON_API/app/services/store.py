@@ -7,6 +7,7 @@ from typing import Deque, Dict, List, Optional, Set, Tuple, TypedDict
 
 from ..config import settings
 from ..models import ExclusionIn, LabelItem, ListEntryIn, ListEntryOut
+from ..utils.memory import register_store
 
 
 # ------------- In-memory stores (module-level singletons) -------------
@@ -42,6 +43,12 @@ class WebhookAttempt(TypedDict, total=False):
 
 _webhook_attempts: Deque[WebhookAttempt] = deque(maxlen=settings.webhook_debug_buffer)
 
+register_store("lists", lambda: _lists)
+register_store("labels", lambda: _labels)
+register_store("exclusion_user_ids", lambda: _exclusion_user_ids)
+register_store("exclusion_emails", lambda: _exclusion_emails)
+register_store("webhook_attempts", lambda: _webhook_attempts)
+
 
 # ------------- Helpers -------------
 
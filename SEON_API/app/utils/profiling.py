@@ -0,0 +1,110 @@
+"""
+On-demand per-request sampling profiler (see also GET /__debug/profiles).
+
+Installed only when PROFILING_ENABLED is true. Requests carrying `X-Profile: <ADMIN_TOKEN>` (or
+`?profile=<ADMIN_TOKEN>`) are sampled and written to PROFILE_DIR as folded stacks for flamegraph tools.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Request
+
+from ..config import settings
+
+
+# Leaf frames in these modules mean the thread is parked (lock wait, selector, idle pool worker)
+_IDLE_MODULES = {"threading.py", "selectors.py", "queue.py"}
+
+
+class StackSampler(threading.Thread):
+    def __init__(self, interval_seconds: float) -> None:
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            self.samples += 1
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for tid, frame in sys._current_frames().items():
+                if tid == me or os.path.basename(frame.f_code.co_filename) in _IDLE_MODULES:
+                    continue
+                stack: List[str] = []
+                f = frame
+                while f is not None:
+                    stack.append(f"{os.path.basename(f.f_code.co_filename)}:{f.f_code.co_name}")
+                    f = f.f_back
+                thread = names.get(tid) or str(tid)
+                self.stacks[";".join([thread] + stack[::-1])] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def _profile_requested(request: Request) -> bool:
+    token = settings.admin_token
+    if not token:
+        return False
+    return request.headers.get("X-Profile") == token or request.query_params.get("profile") == token
+
+
+def _write_profile(request: Request, sampler: StackSampler) -> str:
+    os.makedirs(settings.profile_dir, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", request.url.path).strip("_") or "root"
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}-{request.method.lower()}-{slug}-{uuid.uuid4().hex[:8]}.folded"
+    with open(os.path.join(settings.profile_dir, name), "w", encoding="utf-8") as fh:
+        for stack, count in sampler.stacks.most_common():
+            fh.write(f"{stack} {count}\n")
+    return name
+
+
+async def profile_middleware(request: Request, call_next):
+    if not _profile_requested(request):
+        return await call_next(request)
+    sampler = StackSampler(settings.profile_interval_ms / 1000.0)
+    sampler.start()
+    try:
+        response = await call_next(request)
+    finally:
+        # join() waits up to one sampling interval: do it (and the file write) off the event loop
+        await asyncio.to_thread(sampler.stop)
+    response.headers["X-Profile-Name"] = await asyncio.to_thread(_write_profile, request, sampler)
+    return response
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    if not os.path.isdir(settings.profile_dir):
+        return []
+    out = []
+    for name in sorted(os.listdir(settings.profile_dir), reverse=True):
+        if name.endswith(".folded"):
+            st = os.stat(os.path.join(settings.profile_dir, name))
+            out.append({"name": name, "bytes": st.st_size, "created_at": int(st.st_mtime)})
+    return out
+
+
+def profile_path(name: str) -> str | None:
+    path = os.path.join(settings.profile_dir, os.path.basename(name))
+    if not name.endswith(".folded") or not os.path.isfile(path):
+        return None
+    return path
+
+
+def install(app: FastAPI) -> None:
+    if not settings.profiling_enabled:
+        return
+    app.middleware("http")(profile_middleware)
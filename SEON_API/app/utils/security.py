@@ -19,3 +19,14 @@ async def require_api_key(x_api_key: str | None = Header(default=None, alias="X-
         raise HTTPException(status_code=401, detail="AUTH_INVALID_KEY")
     # success: return None
     return None
+
+
+async def require_admin_token(x_admin_token: str | None = Header(default=None, alias="X-Admin-Token")) -> None:
+    """
+    Dependency guarding diagnostics endpoints (/__debug/profiles, /__debug/memory).
+    They stay disabled (403) while ADMIN_TOKEN is unset.
+    """
+    from ..config import settings
+
+    if not settings.admin_token or x_admin_token != settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin token required")
@@ -0,0 +1,47 @@
+from typing import Any, Collection, Dict, Optional
+import httpx
+from Taktile.clients.experian import error_envelope, report_envelope
+from Taktile.clients.retry import TRANSIENT_STATUS_CODES, call_with_retry
+from Taktile.service import deadline
+from Taktile.service.config import settings
+
+
+class EquifaxClient:
+    """
+    Thin HTTP client for the Equifax mock (consumer credit report, Credit Profile layout).
+    Returns the same envelope as ExperianClient, decoded the same way (EXPERIAN_DECODE).
+    """
+
+    def __init__(self, base_url: Optional[str] = None, token: Optional[str] = None, timeout_seconds: Optional[float] = None) -> None:
+        self.base_url = (base_url or settings.EQUIFAX_BASE_URL).rstrip("/")
+        self.token = token or settings.EQUIFAX_TOKEN
+        self.timeout = timeout_seconds or settings.EQUIFAX_TIMEOUT_SECONDS
+        self.decode = settings.EXPERIAN_DECODE
+        self.client = httpx.Client(timeout=self.timeout, headers={"Accept-Encoding": "gzip"})
+
+    def post_credit_report(self, payload: Dict[str, Any], keep_keys: Optional[Collection[str]] = None) -> Dict[str, Any]:
+        """
+        POST {EQUIFAX_BASE_URL}/v1/consumer-credit-report
+        Headers:
+          - Authorization: Bearer <token>
+          - Accept: application/json
+          - Content-Type: application/json
+        Transient failures are retried within the workflow deadline, as for Experian.
+        """
+        url = f"{self.base_url}/v1/consumer-credit-report"
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+        }
+        try:
+            resp = call_with_retry(
+                lambda: self.client.post(url, json=payload, headers=deadline.propagate(headers), timeout=deadline.timeout(self.timeout)),
+                retry_on_result=lambda r: r.status_code in TRANSIENT_STATUS_CODES,
+                vendor="equifax",
+            )
+            return report_envelope(resp, keep_keys, self.decode)
+        except deadline.DeadlineExceeded:
+            raise
+        except Exception as e:
+            return error_envelope(e)
@@ -1,17 +1,125 @@
-from typing import Any, Dict
+import json
+import secrets
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple
 import httpx
+from Taktile.clients.retry import TRANSIENT_STATUS_CODES, call_with_retry
+from Taktile.service import deadline
 from Taktile.service.config import settings
 
 
+# Response headers worth keeping in the envelope (the rest are transport details)
+KEPT_HEADERS = ("content-type", "content-length", "date", "x-request-id")
+
+
+def projecting_hook(keys: Collection[str]) -> Callable[[List[Tuple[str, Any]]], Dict[str, Any]]:
+    """
+    json object_pairs_hook that keeps only `keys`, at every depth. Objects under dropped keys are
+    released as soon as their parent is built, so the full document is never held as Python objects.
+    """
+    keep = frozenset(keys)
+
+    def hook(pairs: List[Tuple[str, Any]]) -> Dict[str, Any]:
+        return {k: v for k, v in pairs if k in keep}
+
+    return hook
+
+
+def report_envelope(resp: httpx.Response, keep_keys: Optional[Collection[str]], decode: str) -> Dict[str, Any]:
+    """
+    The credit report envelope for a bureau response: {status, headers, data, projected, raw}.
+    `projected` is set only when `data` is a projection of a JSON body (not the synthetic INVALID_JSON error).
+    """
+    projected = keep_keys is not None and decode == "projected"
+    try:
+        if projected:
+            body = json.loads(resp.content, object_pairs_hook=projecting_hook(keep_keys))
+        else:
+            body = resp.json()
+    except Exception:
+        projected = False
+        body = {"creditProfile": [], "errors": [{"code": "INVALID_JSON", "message": "Non-JSON response", "status": str(resp.status_code)}]}
+    return {
+        "status": resp.status_code,
+        "headers": {k: resp.headers[k] for k in KEPT_HEADERS if k in resp.headers},
+        "data": body,
+        "projected": projected,
+        "raw": resp.content,
+    }
+
+
+class RawJSON(str):
+    """
+    JSON text passed through undecoded. `render_json` writes it into a response body as is; `decoded` turns
+    it into Python values where they are actually needed (callbacks, the case store with compression off).
+    """
+
+
+def decoded(value: Any) -> Any:
+    return json.loads(value) if isinstance(value, RawJSON) else value
+
+
+def full_body(envelope: Dict[str, Any]) -> Any:
+    """
+    The whole report of an envelope: `data` itself, or `raw` as RawJSON when `data` is projected.
+    A projection is only the policy's input; stored and returned reports use this. The full body is
+    never decoded on the workflow path: it is valid JSON (the projected decode parsed all of it).
+    """
+    if not envelope.get("projected") or not envelope.get("raw"):
+        return envelope.get("data") or {}
+    raw = envelope["raw"]
+    return RawJSON(raw.decode("utf-8") if isinstance(raw, bytes) else raw)
+
+
+def _mark(value: Any, token: str, raws: List[str]) -> Any:
+    if isinstance(value, RawJSON):
+        raws.append(value)
+        return f"{token}{len(raws) - 1}"
+    if isinstance(value, dict):
+        return {k: _mark(v, token, raws) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_mark(v, token, raws) for v in value]
+    return value
+
+
+def render_json(content: Any) -> bytes:
+    """
+    Compact JSON for `content` (as Starlette's JSONResponse renders it), with every RawJSON value spliced
+    in verbatim instead of being encoded as a string.
+    """
+    raws: List[str] = []
+    token = f"raw-json:{secrets.token_hex(8)}:"
+    text = json.dumps(_mark(content, token, raws), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"))
+    for i in reversed(range(len(raws))):
+        text = text.replace(f'"{token}{i}"', raws[i], 1)
+    return text.encode("utf-8")
+
+
+def error_envelope(exc: Exception) -> Dict[str, Any]:
+    """
+    A failed call surfaced as a synthetic timeout/vendor error (status 0).
+    """
+    return {
+        "status": 0,
+        "headers": {},
+        "data": {
+            "creditProfile": [],
+            "errors": [{"code": "REQUEST_EXCEPTION", "message": str(exc), "status": "0"}],
+        },
+        "projected": False,
+        "raw": b"",
+    }
+
+
 class ExperianClient:
     def __init__(self, base_url: str | None = None, token: str | None = None, client_ref: str | None = None, timeout_seconds: float | None = None) -> None:
         self.base_url = (base_url or settings.EXPERIAN_BASE_URL).rstrip("/")
         self.token = token or settings.EXPERIAN_TOKEN
         self.client_ref = client_ref or settings.EXPERIAN_CLIENT_REF
         self.timeout = timeout_seconds or settings.EXPERIAN_TIMEOUT_SECONDS
-        self.client = httpx.Client(timeout=self.timeout)
+        self.decode = settings.EXPERIAN_DECODE
+        self.client = httpx.Client(timeout=self.timeout, headers={"Accept-Encoding": "gzip"})
 
-    def post_credit_report(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def post_credit_report(self, payload: Dict[str, Any], keep_keys: Optional[Collection[str]] = None) -> Dict[str, Any]:
         """
         POST {EXPERIAN_BASE_URL}/v2/credit-report
         Headers:
@@ -20,6 +128,12 @@ class ExperianClient:
           - Accept: application/json
           - Content-Type: application/json
         Returns JSON; on non-JSON, returns an error envelope.
+        With `keep_keys` and EXPERIAN_DECODE=projected, only those keys are decoded into `data`;
+        the undecoded body is always returned as bytes in `raw` for callers that store it.
+        The call timeout is capped by the remaining workflow budget, which is also forwarded
+        to the vendor in X-Deadline-Ms.
+        Transient failures (5xx/429, timeouts, connection errors) are retried; a credit
+        report pull is a read, so repeating it is safe.
         """
         url = f"{self.base_url}/v2/credit-report"
         headers = {
@@ -29,24 +143,14 @@ class ExperianClient:
             "Content-Type": "application/json",
         }
         try:
-            resp = self.client.post(url, json=payload, headers=headers)
+            resp = call_with_retry(
+                lambda: self.client.post(url, json=payload, headers=deadline.propagate(headers), timeout=deadline.timeout(self.timeout)),
+                retry_on_result=lambda r: r.status_code in TRANSIENT_STATUS_CODES,
+                vendor="experian",
+            )
             # Do not raise; policy should interpret vendor errors/status
-            try:
-                body = resp.json()
-            except Exception:
-                body = {"creditProfile": [], "errors": [{"code": "INVALID_JSON", "message": "Non-JSON response", "status": str(resp.status_code)}]}
-            return {
-                "status": resp.status_code,
-                "headers": dict(resp.headers),
-                "data": body,
-            }
+            return report_envelope(resp, keep_keys, self.decode)
+        except deadline.DeadlineExceeded:
+            raise
         except Exception as e:
-            # Surface as synthetic timeout/vendor error
-            return {
-                "status": 0,
-                "headers": {},
-                "data": {
-                    "creditProfile": [],
-                    "errors": [{"code": "REQUEST_EXCEPTION", "message": str(e), "status": "0"}],
-                },
-            }
+            return error_envelope(e)
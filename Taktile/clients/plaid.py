@@ -1,8 +1,24 @@
 from typing import Any, Dict, Optional
 import httpx
+from Taktile.clients.retry import TRANSIENT_STATUS_CODES, call_with_retry
+from Taktile.service import deadline
 from Taktile.service.config import settings
 
 
+# Plaid error codes that describe a temporary condition on Plaid's side
+TRANSIENT_ERROR_CODES = {"INTERNAL_SERVER_ERROR", "RATE_LIMIT_EXCEEDED", "PLANNED_MAINTENANCE"}
+
+
+def _is_transient(r: httpx.Response) -> bool:
+    if r.status_code in TRANSIENT_STATUS_CODES:
+        return True
+    try:
+        body = r.json()
+    except Exception:
+        return False
+    return isinstance(body, dict) and body.get("error_code") in TRANSIENT_ERROR_CODES
+
+
 class PlaidClient:
     """
     Thin HTTP client for the Plaid mock (Income) service.
@@ -12,14 +28,26 @@ class PlaidClient:
     def __init__(self, base_url: Optional[str] = None, timeout_seconds: Optional[float] = None) -> None:
         self.base_url = (base_url or settings.PLAID_BASE_URL).rstrip("/")
         self.timeout = timeout_seconds or settings.PLAID_TIMEOUT_SECONDS
-        self.client = httpx.Client(timeout=self.timeout)
+        self.client = httpx.Client(timeout=self.timeout, headers={"Accept-Encoding": "gzip"})
 
     def _post_json(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         url = f"{self.base_url}{path}"
-        # Plaid-style: return JSON body, do not raise on non-2xx; mock always 200 anyway
+        # Plaid-style: return JSON body, do not raise on non-2xx; mock always 200 anyway.
+        # All income/employment endpoints are reads, so transient errors are retried.
         try:
-            r = self.client.post(url, json=payload, headers={"Content-Type": "application/json"})
+            r = call_with_retry(
+                lambda: self.client.post(
+                    url,
+                    json=payload,
+                    headers=deadline.propagate({"Content-Type": "application/json"}),
+                    timeout=deadline.timeout(self.timeout),
+                ),
+                retry_on_result=_is_transient,
+                vendor="plaid",
+            )
             return r.json()
+        except deadline.DeadlineExceeded:
+            raise
         except Exception as e:
             # Model an error body
             return {
@@ -0,0 +1,126 @@
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+import httpx
+
+from Taktile.service import deadline, scheduler, spend
+from Taktile.service.config import settings
+
+
+T = TypeVar("T")
+
+# HTTP statuses worth another attempt: throttling and upstream/server-side failures.
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RetryBudget:
+    """
+    Process-wide token bucket limiting retries to a fraction of first attempts.
+    Every first attempt deposits `ratio` tokens (capped at `max_tokens`); every retry
+    withdraws one. When a vendor is hard down the bucket drains and clients stop
+    retrying instead of multiplying the load on it.
+    """
+
+    def __init__(self, ratio: float, max_tokens: float) -> None:
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+            return False
+
+
+retry_budget = RetryBudget(settings.RETRY_BUDGET_RATIO, settings.RETRY_BUDGET_MAX_TOKENS)
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Exponential backoff with full jitter for the given (0-based) retry attempt.
+    """
+    cap = min(settings.RETRY_MAX_DELAY_SECONDS, settings.RETRY_BASE_DELAY_SECONDS * (2 ** attempt))
+    return random.uniform(0.0, cap)
+
+
+def is_transient_exception(exc: BaseException, idempotent: bool = True) -> bool:
+    """
+    Idempotent calls retry on any transport failure (connect, read timeout, reset) and on
+    transient HTTP statuses. Non-idempotent calls only retry when the request provably
+    never reached the vendor (connection could not be established).
+    """
+    if not idempotent:
+        return isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout))
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in TRANSIENT_STATUS_CODES
+    return False
+
+
+def call_with_retry(
+    send: Callable[[], T],
+    retry_on_result: Optional[Callable[[T], bool]] = None,
+    idempotent: bool = True,
+    max_attempts: Optional[int] = None,
+    budget: RetryBudget = retry_budget,
+    vendor: Optional[str] = None,
+) -> T:
+    """
+    Call `send()` and retry transient failures with exponential backoff and jitter.
+
+    A retry is attempted only when:
+      - the failure is transient (`retry_on_result` for returned values, transport errors for exceptions),
+      - the attempt limit (RETRY_MAX_ATTEMPTS) is not reached,
+      - the backoff plus another attempt as long as the last one fits in the workflow deadline,
+      - the workflow's spend budget can pay for another `vendor` call (spend.allow),
+      - the shared retry budget has a token left.
+    Each attempt holds a slot of the vendor's concurrency pool (scheduler.slot), queued by priority class.
+    Every attempt that reached the vendor is charged to `vendor` (connect failures are not).
+    Otherwise the last result is returned (or the last exception re-raised).
+    Raises DeadlineExceeded without calling the vendor when the workflow deadline already passed.
+    """
+    deadline.check("vendor call")
+    attempts = max_attempts or settings.RETRY_MAX_ATTEMPTS
+    budget.record_request()
+    attempt = 0
+    while True:
+        exc: Optional[BaseException] = None
+        result = None
+        # Queue for a slot in the vendor's pool by priority class; raises DeadlineExceeded if none frees up in time
+        with scheduler.slot(vendor):
+            started = time.monotonic()
+            try:
+                result = send()
+            except Exception as e:
+                exc = e
+        if vendor is not None and not isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout)):
+            spend.charge(vendor)
+        elapsed = time.monotonic() - started
+
+        if exc is not None:
+            transient = is_transient_exception(exc, idempotent=idempotent)
+        else:
+            transient = idempotent and retry_on_result is not None and retry_on_result(result)
+
+        if transient and attempt + 1 < attempts:
+            delay = backoff_delay(attempt)
+            left = deadline.remaining()
+            fits = left is None or left >= delay + elapsed
+            if fits and (vendor is None or spend.allow(vendor)) and budget.try_spend():
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+        if exc is not None:
+            raise exc
+        return result
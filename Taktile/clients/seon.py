@@ -1,5 +1,7 @@
 from typing import Any, Dict
 import httpx
+from Taktile.clients.retry import TRANSIENT_STATUS_CODES, call_with_retry
+from Taktile.service import deadline
 from Taktile.service.config import settings
 
 
@@ -7,7 +9,8 @@ class SeonClient:
     def __init__(self, base_url: str | None = None, api_key: str | None = None, timeout: float = 10.0) -> None:
         self.base_url = (base_url or settings.SEON_BASE_URL).rstrip("/")
         self.api_key = api_key or settings.API_KEY_SEON
-        self.client = httpx.Client(timeout=timeout)
+        self.timeout = timeout
+        self.client = httpx.Client(timeout=timeout, headers={"Accept-Encoding": "gzip"})
 
     def aml_screen(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         url = f"{self.base_url}/SeonRestService/aml-api/v1"
@@ -15,7 +18,12 @@ class SeonClient:
             "X-API-KEY": self.api_key,
             "Content-Type": "application/json",
         }
-        resp = self.client.post(url, json=payload, headers=headers)
+        # AML screening is a lookup: safe to retry on transient failures
+        resp = call_with_retry(
+            lambda: self.client.post(url, json=payload, headers=deadline.propagate(headers), timeout=deadline.timeout(self.timeout)),
+            retry_on_result=lambda r: r.status_code in TRANSIENT_STATUS_CODES,
+            vendor="seon_aml",
+        )
         resp.raise_for_status()
         return resp.json()
 
@@ -42,7 +50,12 @@ class SeonClient:
             "X-API-KEY": self.api_key,
             "Content-Type": "application/json",
         }
-        resp = self.client.post(url, json=payload, headers=headers)
+        # Each fraud call creates a SEON transaction, so only retry when the request never got through
+        resp = call_with_retry(
+            lambda: self.client.post(url, json=payload, headers=deadline.propagate(headers), timeout=deadline.timeout(self.timeout)),
+            idempotent=False,
+            vendor="seon_fraud",
+        )
         # Do not raise; let policy handle non-2xx and error envelopes
         try:
             return resp.json()
@@ -0,0 +1,50 @@
+from typing import Any, Collection, Dict, Optional
+import httpx
+from Taktile.clients.experian import error_envelope, report_envelope
+from Taktile.clients.retry import TRANSIENT_STATUS_CODES, call_with_retry
+from Taktile.service import deadline
+from Taktile.service.config import settings
+
+
+class TransUnionClient:
+    """
+    Thin HTTP client for the TransUnion mock (credit report, Credit Profile layout).
+    Returns the same envelope as ExperianClient, decoded the same way (EXPERIAN_DECODE).
+    """
+
+    def __init__(self, base_url: Optional[str] = None, token: Optional[str] = None, subscriber_code: Optional[str] = None, timeout_seconds: Optional[float] = None) -> None:
+        self.base_url = (base_url or settings.TRANSUNION_BASE_URL).rstrip("/")
+        self.token = token or settings.TRANSUNION_TOKEN
+        self.subscriber_code = subscriber_code or settings.TRANSUNION_SUBSCRIBER_CODE
+        self.timeout = timeout_seconds or settings.TRANSUNION_TIMEOUT_SECONDS
+        self.decode = settings.EXPERIAN_DECODE
+        self.client = httpx.Client(timeout=self.timeout, headers={"Accept-Encoding": "gzip"})
+
+    def post_credit_report(self, payload: Dict[str, Any], keep_keys: Optional[Collection[str]] = None) -> Dict[str, Any]:
+        """
+        POST {TRANSUNION_BASE_URL}/v1/credit-report
+        Headers:
+          - Authorization: Bearer <token>
+          - X-TU-Subscriber-Code: <subscriber_code>
+          - Accept: application/json
+          - Content-Type: application/json
+        Transient failures are retried within the workflow deadline, as for Experian.
+        """
+        url = f"{self.base_url}/v1/credit-report"
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "X-TU-Subscriber-Code": self.subscriber_code,
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+        }
+        try:
+            resp = call_with_retry(
+                lambda: self.client.post(url, json=payload, headers=deadline.propagate(headers), timeout=deadline.timeout(self.timeout)),
+                retry_on_result=lambda r: r.status_code in TRANSIENT_STATUS_CODES,
+                vendor="transunion",
+            )
+            return report_envelope(resp, keep_keys, self.decode)
+        except deadline.DeadlineExceeded:
+            raise
+        except Exception as e:
+            return error_envelope(e)
@@ -0,0 +1,99 @@
+"""
+Benchmark the cache backends (Taktile/service/cache.py).
+
+  python -m Taktile.runner.bench_cache [--ops 20000] [--workers 4] [--keys 2000]
+
+1) Single-process throughput of set / get (hit) / get (miss) for each backend.
+2) Multi-worker hit rate: N processes look up the same key space (as uvicorn workers would for
+   repeated vendor requests); on a miss they "call the vendor" and fill the cache. With the memory
+   backend every worker has to warm its own copy; with SQLite the first worker's fill serves all.
+"""
+import argparse
+import multiprocessing as mp
+import os
+import random
+import tempfile
+import time
+from typing import Dict, Tuple
+
+from Taktile.service.cache import CacheBackend, MemoryCache, SQLiteCache
+
+
+VALUE = {"status": 200, "data": {"fraud_score": 12.5, "state": "APPROVE", "applied_rules": [{"id": "R1", "score": 1.5}] * 5}}
+
+
+def _make(kind: str, path: str, max_entries: int) -> CacheBackend:
+    if kind == "sqlite":
+        return SQLiteCache("bench", max_entries, default_ttl=300, path=path)
+    return MemoryCache("bench", max_entries, default_ttl=300)
+
+
+def throughput(kind: str, path: str, ops: int) -> Dict[str, float]:
+    cache = _make(kind, path, max_entries=ops)
+    out: Dict[str, float] = {}
+    t0 = time.perf_counter()
+    for i in range(ops):
+        cache.set(f"k{i}", VALUE)
+    out["set/s"] = ops / (time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    for i in range(ops):
+        cache.get(f"k{i}")
+    out["get_hit/s"] = ops / (time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    for i in range(ops):
+        cache.get(f"missing{i}")
+    out["get_miss/s"] = ops / (time.perf_counter() - t0)
+    cache.clear()
+    return out
+
+
+def _worker(args: Tuple[str, str, int, int, int]) -> Tuple[int, int]:
+    kind, path, keys, lookups, seed = args
+    cache = _make(kind, path, max_entries=keys)
+    rng = random.Random(seed)
+    hits = 0
+    for _ in range(lookups):
+        k = f"case-{rng.randrange(keys)}"
+        if cache.get(k) is not None:
+            hits += 1
+        else:
+            cache.set(k, VALUE)  # stands in for a vendor call
+    return hits, lookups
+
+
+def shared_hit_rate(kind: str, path: str, workers: int, keys: int, lookups: int) -> Tuple[float, float]:
+    if kind == "sqlite":
+        _make(kind, path, keys).clear()
+    t0 = time.perf_counter()
+    with mp.Pool(workers) as pool:
+        results = pool.map(_worker, [(kind, path, keys, lookups, seed) for seed in range(workers)])
+    elapsed = time.perf_counter() - t0
+    hits = sum(h for h, _ in results)
+    total = sum(n for _, n in results)
+    return hits / total, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="bench_cache", description="Benchmark memory vs SQLite (WAL) cache backends")
+    parser.add_argument("--ops", type=int, default=20000, help="Operations per throughput phase")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes for the shared hit-rate test")
+    parser.add_argument("--keys", type=int, default=2000, help="Distinct keys in the shared hit-rate test")
+    parser.add_argument("--lookups", type=int, default=5000, help="Lookups per worker in the shared hit-rate test")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-cache-"), "cache.sqlite3")
+    print(f"{'backend':<8} {'set/s':>10} {'get_hit/s':>10} {'get_miss/s':>11}")
+    for kind in ("memory", "sqlite"):
+        r = throughput(kind, path, args.ops)
+        print(f"{kind:<8} {r['set/s']:>10.0f} {r['get_hit/s']:>10.0f} {r['get_miss/s']:>11.0f}")
+
+    print()
+    print(f"{args.workers} workers, {args.keys} keys, {args.lookups} lookups each")
+    print(f"{'backend':<8} {'hit_rate':>9} {'elapsed_s':>10}")
+    for kind in ("memory", "sqlite"):
+        rate, elapsed = shared_hit_rate(kind, path, args.workers, args.keys, args.lookups)
+        print(f"{kind:<8} {rate:>9.1%} {elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark response compression on realistic payloads.
+
+  python -m Taktile.runner.bench_compression [--levels 1,6,9] [--bandwidths-mbps 10,100,1000]
+
+Payloads:
+  - experian: Experian credit profile (Experian -> Taktile), typical and thick files
+  - workflow: /workflows/kyc/full response with vendor payloads (Taktile -> NB36)
+  - fraud: SEON fraud response (SEON -> Taktile), below/around the size threshold
+
+For each payload and gzip level it reports bytes on the wire, compress/decompress time and the modelled
+transfer latency (compress + bytes / bandwidth + decompress) next to the uncompressed transfer.
+It then sends each payload through a FastAPI app with the same GZipMiddleware settings as the services,
+to confirm which responses actually get compressed.
+"""
+import argparse
+import gzip
+import json
+import time
+from typing import Any, Dict, List
+
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.testclient import TestClient
+
+from Taktile.runner.bench_experian_decode import thick_profile
+from Taktile.service.config import settings
+
+
+def _fraud_response() -> Dict[str, Any]:
+    return {
+        "success": True,
+        "data": {
+            "id": "a1b2c3d4",
+            "state": "APPROVE",
+            "fraud_score": 22.5,
+            "ip_details": {"ip": "1.2.3.4", "score": 0, "country": "US", "ip_type": "ISP", "tor": False, "vpn": False, "proxy": False},
+            "device_details": {"os": "iOS", "browser": "Safari", "vpn": False, "proxy": False, "suspicious_flags": []},
+            "email_details": {"email": "alice@good.com", "score": 1, "deliverable": True, "breach_details": {"breaches": []}},
+            "phone_details": {"number": "+14155550123", "valid": True, "carrier": "ACME", "type": "mobile"},
+            "applied_rules": [{"id": f"P{i}", "name": f"Rule {i}", "operation": "+", "score": 0.5} for i in range(8)],
+        },
+    }
+
+
+def payloads() -> Dict[str, bytes]:
+    credit_typical = thick_profile(20)
+    credit_thick = thick_profile(300)
+    workflow = {
+        "case_id": "bench-case-0001",
+        "status": "INCOME_PASS",
+        "aml_decision": {"decision": "PROCEED", "reasons": [], "details": {"source": "aml_screening"}},
+        "fraud_decision": {"decision": "FRAUD_PASS", "provisional_tier": 7, "reasons": [], "details": {"fraud_score": 22.5}},
+        "credit_decision": {"decision": "CREDIT_PASS", "bureau_tier": 6, "final_tier": 6, "ko_reasons": [], "review_reasons": []},
+        "income_decision": {"decision": "INCOME_PASS", "metrics": {"net_monthly": 4340.0}, "income_tier": 6, "final_tier": 6},
+        "aml_raw": {"success": True, "data": {"sanction_hits": [], "pep_hits": [], "crimelist_hits": [], "adverse_media_hits": []}},
+        "fraud_raw": _fraud_response(),
+        "credit_raw": credit_typical,
+    }
+    return {
+        "fraud": json.dumps(_fraud_response()).encode("utf-8"),
+        "experian_typical": json.dumps(credit_typical).encode("utf-8"),
+        "experian_thick": json.dumps(credit_thick).encode("utf-8"),
+        "workflow": json.dumps(workflow).encode("utf-8"),
+    }
+
+
+def _timed(fn, reps: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        fn()
+    return (time.perf_counter() - t0) / reps
+
+
+def offline(bodies: Dict[str, bytes], levels: List[int], bandwidths_mbps: List[float], reps: int) -> None:
+    bw_cols = " ".join(f"{f'@{b:g}Mbps_ms':>13}" for b in bandwidths_mbps)
+    print(f"{'payload':<17} {'level':>5} {'bytes':>9} {'ratio':>6} {'comp_ms':>8} {'decomp_ms':>9} {bw_cols}")
+    for name, body in bodies.items():
+        plain = " ".join(f"{len(body) * 8 / (b * 1e6) * 1000:>13.3f}" for b in bandwidths_mbps)
+        print(f"{name:<17} {'none':>5} {len(body):>9} {1.0:>6.2f} {0.0:>8.3f} {0.0:>9.3f} {plain}")
+        for level in levels:
+            packed = gzip.compress(body, compresslevel=level)
+            comp = _timed(lambda: gzip.compress(body, compresslevel=level), reps)
+            decomp = _timed(lambda: gzip.decompress(packed), reps)
+            cols = " ".join(
+                f"{(comp + len(packed) * 8 / (b * 1e6) + decomp) * 1000:>13.3f}" for b in bandwidths_mbps
+            )
+            print(
+                f"{name:<17} {level:>5} {len(packed):>9} {len(body) / len(packed):>6.2f} "
+                f"{comp * 1000:>8.3f} {decomp * 1000:>9.3f} {cols}"
+            )
+
+
+def through_middleware(bodies: Dict[str, bytes]) -> None:
+    app = FastAPI()
+    app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE, compresslevel=settings.GZIP_COMPRESSLEVEL)
+
+    @app.get("/payload/{name}")
+    def payload(name: str):
+        return json.loads(bodies[name])
+
+    client = TestClient(app)
+    print()
+    print(f"GZipMiddleware(minimum_size={settings.GZIP_MINIMUM_SIZE}, compresslevel={settings.GZIP_COMPRESSLEVEL})")
+    print(f"{'payload':<17} {'body_bytes':>10} {'wire_bytes':>10} {'encoding':>9}")
+    for name in bodies:
+        resp = client.get(f"/payload/{name}", headers={"Accept-Encoding": "gzip"})
+        wire = resp.num_bytes_downloaded
+        print(f"{name:<17} {len(resp.content):>10} {wire:>10} {resp.headers.get('content-encoding', '-'):>9}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="bench_compression", description="Bytes-on-wire vs latency for gzip responses")
+    parser.add_argument("--levels", default="1,6,9", help="gzip levels to compare")
+    parser.add_argument("--bandwidths-mbps", default="10,100,1000", help="Link speeds for the latency model")
+    parser.add_argument("--reps", type=int, default=50)
+    args = parser.parse_args()
+
+    bodies = payloads()
+    offline(
+        bodies,
+        [int(x) for x in args.levels.split(",")],
+        [float(x) for x in args.bandwidths_mbps.split(",")],
+        args.reps,
+    )
+    through_middleware(bodies)
+
+
+if __name__ == "__main__":
+    main()
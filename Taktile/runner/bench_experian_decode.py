@@ -0,0 +1,158 @@
+"""
+Benchmark full vs projected decoding of Experian credit profiles (Taktile/clients/experian.py).
+
+  python -m Taktile.runner.bench_experian_decode [--tradelines 50,200,1000] [--reps 20]
+
+Builds synthetic thick files (many tradelines with payment history, addresses, employment, inquiries),
+then for each size reports body bytes, median decode time, tracemalloc peak during decode and the memory
+still held by the decoded result, for `json.loads` vs the projecting hook with T3.RESPONSE_KEYS. It
+also checks that T3 reaches the same decision on both.
+
+`workflow_ms` is the credit stage's whole handling of the body as the service does it with
+EXPERIAN_DECODE=full/projected: the S3 envelope, T3, and rendering `credit_raw` into the response body.
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+
+from Taktile.clients.experian import full_body, projecting_hook, render_json, report_envelope
+from Taktile.stages.T3 import RESPONSE_KEYS, evaluate_credit_policy
+
+
+def _tradeline(rng: random.Random, i: int) -> Dict[str, Any]:
+    revolving = rng.random() < 0.6
+    return {
+        "subscriberName": f"SUBSCRIBER {i:05d} NATIONAL BANK",
+        "subscriberCode": f"{rng.randrange(10**9):010d}",
+        "accountNumber": f"{rng.randrange(10**11):012d}",
+        "accountType": rng.choice(["Credit card", "Auto", "Student loan", "Mortgage", "Rental"]),
+        "revolvingOrInstallment": "R" if revolving else "I",
+        "openOrClosed": rng.choice(["O", "O", "C"]),
+        "terms": "REV" if revolving else f"{rng.choice([36, 60, 72, 360])} MONTHS",
+        "status": rng.choice(["Open", "Current", "Paid", "Inactive/Never late"]),
+        "statusDate": f"{rng.randint(1, 12):02d}{rng.randint(2015, 2024)}",
+        "openDate": f"{rng.randint(1, 12):02d}{rng.randint(2005, 2023)}",
+        "balanceAmount": str(rng.randrange(20000)),
+        "balanceDate": f"{rng.randint(1, 12):02d}01{rng.randint(2015, 2024)}",
+        "amountPastDue": "0",
+        "monthlyPaymentAmount": str(rng.randrange(1500)),
+        "amount1": str(rng.randrange(50000)),
+        "amount1Qualifier": "ORIGINAL_AMOUNT",
+        "delinquencies30Days": "0",
+        "delinquencies60Days": "0",
+        "delinquencies90to180Days": "0",
+        "enhancedPaymentData": {
+            "creditLimitAmount": str(rng.randrange(1000, 30000)) if revolving else "",
+            "highBalanceAmount": str(rng.randrange(30000)),
+            "enhancedPaymentHistory84": "C" * 84,
+            "enhancedPaymentStatus": "OK",
+            "enhancedAccountType": "18",
+            "enhancedTerms": "REV",
+        },
+        "paymentHistory": ",".join(["OK"] * 84),
+        "ecoa": "1",
+        "kob": "BC",
+        "lastPaymentDate": "05012024",
+    }
+
+
+def thick_profile(tradelines: int, seed: int = 1) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    return {
+        "creditProfile": [
+            {
+                "headerRecord": [{"reportDate": "063024", "reportTime": "120000", "preamble": "TCA1", "versionNo": "07"}],
+                "consumerIdentity": {"name": [{"firstName": f"JON{i}", "surname": "CONSUMER", "type": "A"} for i in range(5)]},
+                "addressInformation": [
+                    {"streetPrefix": str(100 + i), "streetName": "MAIN ST", "city": "ANYTOWN", "state": "TX", "zipCode": "78701",
+                     "dwellingType": "Single family", "censusGeoCode": "0-70010-17-2520", "firstReportedDate": "01012013",
+                     "lastUpdatedDate": "01012015", "timesReported": "1"}
+                    for i in range(10)
+                ],
+                "employmentInformation": [{"name": f"EMPLOYER {i}", "firstReportedDate": "01012015"} for i in range(5)],
+                "statement": [],
+                "publicRecord": [],
+                "inquiry": [
+                    {"date": f"{rng.randint(1, 12):02d}01{rng.randint(2020, 2024)}", "subscriberName": "BANK", "type": rng.choice(["SOFT", "HARD"]),
+                     "terms": "", "amount": ""}
+                    for _ in range(max(3, tradelines // 10))
+                ],
+                "riskModel": [{"modelIndicator": "V4", "score": "720", "evaluation": "OK", "scorePercentile": "61",
+                               "scoreFactors": [{"importance": "H", "code": "HIGH_UTILIZATION"}]}],
+                "fraudShield": [{"fraudShieldIndicators": {"indicator": []}, "addressCount": "2", "socialCount": "1", "text": "No alerts."}],
+                "ofac": {"messageNumber": "", "messageText": ""},
+                "tradeline": [_tradeline(rng, i) for i in range(tradelines)],
+                "endTotals": [{"totalSegments": "20", "totalLength": "5000"}],
+            }
+        ],
+        "arf": {"arfResponse": "N/A"},
+        "tty": {"ttyResponse": "N/A"},
+        "dataSource": {"dataSourceResponse": "BUREAU"},
+        "referenceIds": [],
+    }
+
+
+def _measure(decode: Callable[[bytes], Any], body: bytes, reps: int) -> Tuple[float, int, int, Any]:
+    times: List[float] = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        decode(body)
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    result = decode(body)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak, retained, result
+
+
+def _workflow(body: bytes, decode: str) -> bytes:
+    envelope = report_envelope(httpx.Response(200, content=body), RESPONSE_KEYS, decode)
+    evaluate_credit_policy(envelope["data"], 7)
+    return render_json({"credit_raw": full_body(envelope)})
+
+
+def _median_seconds(fn: Callable[[], Any], reps: int) -> float:
+    times: List[float] = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="bench_experian_decode", description="Full vs projected Experian decoding")
+    parser.add_argument("--tradelines", default="50,200,1000", help="Comma-separated tradeline counts")
+    parser.add_argument("--reps", type=int, default=20, help="Timed decodes per variant")
+    args = parser.parse_args()
+
+    hook = projecting_hook(RESPONSE_KEYS)
+    variants = {
+        "full": lambda b: json.loads(b),
+        "projected": lambda b: json.loads(b, object_pairs_hook=hook),
+    }
+    print(f"{'tradelines':>10} {'body_kb':>8} {'variant':<10} {'decode_ms':>10} {'workflow_ms':>12} {'peak_kb':>9} {'retained_kb':>12} {'same_decision':>14}")
+    for n in (int(x) for x in args.tradelines.split(",")):
+        body = json.dumps(thick_profile(n)).encode("utf-8")
+        decisions = {}
+        for name, decode in variants.items():
+            seconds, peak, retained, data = _measure(decode, body, args.reps)
+            decision = evaluate_credit_policy(data, 7)
+            decisions[name] = (decision["decision"], decision["bureau_tier"], decision["ko_reasons"], decision["review_reasons"])
+            same = decisions[name] == decisions["full"] and json.loads(_workflow(body, name))["credit_raw"] == json.loads(body)
+            workflow = _median_seconds(lambda: _workflow(body, name), args.reps)
+            print(
+                f"{n:>10} {len(body) / 1024:>8.0f} {name:<10} {seconds * 1000:>10.2f} {workflow * 1000:>12.2f} "
+                f"{peak / 1024:>9.0f} {retained / 1024:>12.0f} {str(same):>14}"
+            )
+
+
+if __name__ == "__main__":
+    main()
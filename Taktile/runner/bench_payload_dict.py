@@ -0,0 +1,155 @@
+"""
+Benchmark dictionary-trained compression of stored vendor payloads (Taktile/service/payloads.py) against gzip.
+
+  python -m Taktile.runner.bench_payload_dict [--train 64] [--test 64] [--level 6] [--dict-size 32768]
+
+For each vendor whose raw responses the case store keeps (SEON AML, SEON fraud, Experian), it generates varied
+synthetic responses, trains a dictionary on --train of them and measures --test others it has not seen.
+Per variant it reports the mean payload and compressed size, the ratio, and the median encode/decode time per
+payload: gzip, zlib without a dictionary, and zlib with the trained dictionary. The "b64" rows are the size as
+stored (base64, since cache values are JSON), for gzip and the dictionary.
+"""
+import argparse
+import base64
+import gzip
+import json
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from Taktile.runner.bench_experian_decode import thick_profile
+from Taktile.service.payloads import compress, decompress, train_dictionary
+
+
+def _aml(rng: random.Random, i: int) -> Dict[str, Any]:
+    name = f"APPLICANT {i:05d} {rng.choice(['SMITH', 'GARCIA', 'NGUYEN', 'MÜLLER'])}"
+    sanction = rng.random() < 0.2
+    pep = rng.random() < 0.1
+    result: Dict[str, Any] = {}
+    if sanction:
+        result["sanctions"] = [
+            {"list": rng.choice(["OFAC-SDN", "EU-Consolidated", "UN-Sanctions"]), "name": name,
+             "match_score": round(rng.uniform(0.85, 0.97), 2), "country": "US"},
+        ]
+    if pep:
+        result["pep"] = [{"name": name, "role": rng.choice(["Mayor", "Advisor", "Board Member"]), "tier": rng.randint(1, 4)}]
+    return {
+        "success": True,
+        "error": {},
+        "data": {
+            "has_watchlist_match": sanction and rng.random() < 0.5,
+            "has_sanction_match": sanction,
+            "has_crimelist_match": False,
+            "has_pep_match": pep,
+            "has_adversemedia_match": False,
+            "local_aml_match": {"matched": sanction or pep, "notes": None},
+            "result_payload": result,
+        },
+    }
+
+
+def _fraud(rng: random.Random, i: int) -> Dict[str, Any]:
+    state = rng.choice(["APPROVE", "APPROVE", "APPROVE", "REVIEW", "DECLINE"])
+    return {
+        "success": True,
+        "error": {},
+        "data": {
+            "id": f"{rng.getrandbits(64):016x}",
+            "state": state,
+            "fraud_score": round(rng.uniform(0, 100), 2),
+            "seon_id": rng.randrange(10**8),
+            "version": "v2",
+            "ip_details": {"ip": f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+                           "score": rng.randint(0, 20), "country": rng.choice(["US", "US", "CA", "MX"]),
+                           "state_prov": rng.choice(["TX", "CA", "NY"]), "city": rng.choice(["Austin", "Dallas", "San Jose"]),
+                           "type": rng.choice(["ISP", "MOB", "DCH"]), "tor": False, "vpn": rng.random() < 0.05,
+                           "web_proxy": False, "public_proxy": False, "spam_number": 0, "spam_urls": []},
+            "email_details": {"email": f"user{i}@{rng.choice(['gmail.com', 'yahoo.com', 'outlook.com'])}",
+                              "score": rng.randint(0, 10), "deliverable": True, "domain_details": {"registered": True, "free": True},
+                              "account_details": {"apple": {"registered": True}, "google": {"registered": rng.random() < 0.7}},
+                              "breach_details": {"haveibeenpwned_listed": rng.random() < 0.3, "number_of_breaches": rng.randint(0, 5)}},
+            "phone_details": {"number": f"+1{rng.randrange(10**10):010d}", "valid": True, "type": "MOBILE",
+                              "country": "US", "carrier": rng.choice(["AT&T", "Verizon", "T-Mobile"]), "score": 0},
+            "device_details": {"os": rng.choice(["iOS", "Android", "Windows"]), "browser": rng.choice(["Safari", "Chrome"]),
+                               "session_id": f"sess-{rng.getrandbits(48):012x}", "suspicious_flags": [], "emulator": False},
+            "geolocation_details": {"user_country": "US", "ip_country": "US", "distance_km": rng.randint(0, 400)},
+            "applied_rules": [
+                {"id": f"P{rng.randint(100, 999)}", "name": rng.choice(["IP is from a mobile network", "Email has no breaches",
+                                                                      "Phone number is valid", "Device seen before"]),
+                 "operation": rng.choice(["+", "-"]), "score": round(rng.uniform(0, 5), 1)}
+                for _ in range(rng.randint(3, 10))
+            ],
+            "calculation_time": rng.randint(150, 900),
+        },
+    }
+
+
+def _experian(rng: random.Random, i: int) -> Dict[str, Any]:
+    return thick_profile(rng.randint(3, 40), seed=i)
+
+
+VENDORS: Dict[str, Callable[[random.Random, int], Dict[str, Any]]] = {
+    "seon_aml": _aml,
+    "seon_fraud": _fraud,
+    "experian": _experian,
+}
+
+
+def _samples(make: Callable[[random.Random, int], Dict[str, Any]], start: int, n: int) -> List[bytes]:
+    return [json.dumps(make(random.Random(i), i), separators=(",", ":")).encode("utf-8") for i in range(start, start + n)]
+
+
+def _measure(encode: Callable[[bytes], bytes], decode: Callable[[bytes], bytes], bodies: List[bytes]) -> Tuple[float, float, float]:
+    sizes: List[int] = []
+    enc: List[float] = []
+    dec: List[float] = []
+    for body in bodies:
+        t0 = time.perf_counter()
+        packed = encode(body)
+        t1 = time.perf_counter()
+        out = decode(packed)
+        t2 = time.perf_counter()
+        assert out == body
+        sizes.append(len(packed))
+        enc.append(t1 - t0)
+        dec.append(t2 - t1)
+    return statistics.mean(sizes), statistics.median(enc), statistics.median(dec)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="bench_payload_dict", description="Trained-dictionary zlib vs gzip on vendor payloads")
+    parser.add_argument("--train", type=int, default=64, help="Training samples per vendor")
+    parser.add_argument("--test", type=int, default=64, help="Unseen payloads measured per vendor")
+    parser.add_argument("--level", type=int, default=6, help="Compression level for every variant")
+    parser.add_argument("--dict-size", type=int, default=32768, help="Maximum dictionary size in bytes")
+    args = parser.parse_args()
+
+    print(f"{'vendor':<11} {'variant':<14} {'raw_b':>8} {'packed_b':>9} {'ratio':>6} {'enc_us':>8} {'dec_us':>8}")
+    for vendor, make in VENDORS.items():
+        t0 = time.perf_counter()
+        zdict = train_dictionary(_samples(make, 0, args.train), args.dict_size)
+        train_ms = (time.perf_counter() - t0) * 1000
+        bodies = _samples(make, 10_000, args.test)
+        raw = statistics.mean(len(b) for b in bodies)
+        variants = {
+            "gzip": (lambda b: gzip.compress(b, compresslevel=args.level), gzip.decompress),
+            "gzip b64": (
+                lambda b: base64.b64encode(gzip.compress(b, compresslevel=args.level)),
+                lambda p: gzip.decompress(base64.b64decode(p)),
+            ),
+            "zlib": (lambda b: compress(b, None, args.level), lambda p: decompress(p, None)),
+            "zlib+dict": (lambda b: compress(b, zdict, args.level), lambda p: decompress(p, zdict)),
+            "zlib+dict b64": (
+                lambda b: base64.b64encode(compress(b, zdict, args.level)),
+                lambda p: decompress(base64.b64decode(p), zdict),
+            ),
+        }
+        for name, (encode, decode) in variants.items():
+            size, enc, dec = _measure(encode, decode, bodies)
+            print(f"{vendor:<11} {name:<14} {raw:>8.0f} {size:>9.0f} {raw / size:>6.2f} {enc * 1e6:>8.1f} {dec * 1e6:>8.1f}")
+        print(f"{vendor:<11} dictionary: {len(zdict)} bytes from {args.train} samples, trained in {train_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
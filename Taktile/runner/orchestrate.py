@@ -1,4 +1,5 @@
 import argparse
+import gzip
 import json
 import sys
 import urllib.error
@@ -10,19 +11,34 @@ DEFAULT_BASE = "https://nb-taktile.onrender.com"
 #DEFAULT_BASE = "http://localhost:9100"
 
 
-def post_json(url: str, payload: Dict[str, Any], timeout: float = 10.0) -> tuple[int, Dict[str, Any] | str]:
+def _read_body(resp: Any) -> str:
+    raw = resp.read()
+    if resp.headers.get("Content-Encoding") == "gzip":
+        raw = gzip.decompress(raw)
+    return raw.decode("utf-8", errors="replace")
+
+
+def post_json(
+    url: str, payload: Dict[str, Any], timeout: float = 10.0, priority: str = "interactive"
+) -> tuple[int, Dict[str, Any] | str]:
     data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"}, method="POST")
+    headers = {
+        "Content-Type": "application/json",
+        "Accept-Encoding": "gzip",
+        "X-Deadline-Ms": str(int(timeout * 1000)),
+        "X-Priority-Class": priority,
+    }
+    req = urllib.request.Request(url, data=data, headers=headers, method="POST")
     try:
         with urllib.request.urlopen(req, timeout=timeout) as resp:
-            body = resp.read().decode("utf-8", errors="replace")
+            body = _read_body(resp)
             try:
                 return resp.status, json.loads(body)
             except Exception:
                 return resp.status, body
     except urllib.error.HTTPError as e:
         try:
-            body = e.read().decode("utf-8", errors="replace")
+            body = _read_body(e)
             return e.code, json.loads(body)
         except Exception:
             return e.code, str(e)
@@ -68,25 +84,53 @@ def example_intake_full(scenario: Optional[str] = None, income_opts: Optional[Di
     return intake
 
 
-def run_full(base: str, case_id: str, scenario: Optional[str], income_opts: Optional[Dict[str, Any]], pretty: bool) -> None:
+def run_full(
+    base: str,
+    case_id: str,
+    scenario: Optional[str],
+    income_opts: Optional[Dict[str, Any]],
+    pretty: bool,
+    priority: str = "interactive",
+) -> None:
     intake = example_intake_full(scenario=scenario, income_opts=income_opts)
     status, resp = post_json(
         f"{base}/workflows/kyc/full",
         {"case_id": case_id, "intake": intake},
+        priority=priority,
     )
     out = {"mode": "full", "http_status": status, "response": resp}
     print(json.dumps(out, indent=2 if pretty else None))
 
 
-def run_suite(base: str, pretty: bool) -> None:
+def run_stages(
+    base: str,
+    case_id: str,
+    stages: list,
+    prior: Dict[str, Any],
+    scenario: Optional[str],
+    income_opts: Optional[Dict[str, Any]],
+    pretty: bool,
+    priority: str = "batch",
+) -> None:
+    intake = example_intake_full(scenario=scenario, income_opts=income_opts)
+    status, resp = post_json(
+        f"{base}/workflows/kyc/stages",
+        {"case_id": case_id, "intake": intake, "stages": stages, "prior": prior},
+        priority=priority,
+    )
+    out = {"mode": "stages", "stages": stages, "http_status": status, "response": resp}
+    print(json.dumps(out, indent=2 if pretty else None))
+
+
+def run_suite(base: str, pretty: bool, priority: str = "batch") -> None:
     scenarios = ["pass", "review", "ko_fraud", "ko_compliance"]
     for sc in scenarios:
-        run_full(base, f"suite-full-{sc}", sc, {}, pretty)
+        run_full(base, f"suite-full-{sc}", sc, {}, pretty, priority)
 
     # Income variations
-    run_full(base, "suite-full-income-payroll", "pass", {"income_force_mode": "payroll"}, pretty)
-    run_full(base, "suite-full-income-bank-thin", "pass", {"income_force_mode": "bank", "income_coverage_months": 2}, pretty)
-    run_full(base, "suite-full-income-error", "pass", {"income_inject_error": True}, pretty)
+    run_full(base, "suite-full-income-payroll", "pass", {"income_force_mode": "payroll"}, pretty, priority)
+    run_full(base, "suite-full-income-bank-thin", "pass", {"income_force_mode": "bank", "income_coverage_months": 2}, pretty, priority)
+    run_full(base, "suite-full-income-error", "pass", {"income_inject_error": True}, pretty, priority)
 
 
 def main() -> None:
@@ -102,10 +146,22 @@ def main() -> None:
     p_full.add_argument("--income-inject-error", action="store_true", help="Inject a Plaid error for testing")
     p_full.add_argument("--coverage-months", type=int, default=12, help="Requested coverage months (bank fallback rule)")
     p_full.add_argument("--pretty", action="store_true", help="Pretty-print JSON output")
+    p_full.add_argument("--priority", default="interactive", help="Taktile priority class (X-Priority-Class)")
+
+    p_stages = sub.add_parser("stages", help="Run a subset of stages (e.g. credit,income) with prior results")
+    p_stages.add_argument("--base", default=DEFAULT_BASE, help="Taktile base URL")
+    p_stages.add_argument("--case-id", default="demo-stages-001", help="Case ID to use")
+    p_stages.add_argument("--stages", default="credit", help="Comma-separated subset of aml,fraud,credit,income")
+    p_stages.add_argument("--scenario", default="pass", help="SEON scenario: pass|review|ko_fraud|ko_compliance")
+    p_stages.add_argument("--provisional-tier", type=int, help="Prior fraud tier (input to credit without fraud)")
+    p_stages.add_argument("--final-tier", type=int, help="Prior credit final tier (input to income without credit)")
+    p_stages.add_argument("--pretty", action="store_true", help="Pretty-print JSON output")
+    p_stages.add_argument("--priority", default="batch", help="Taktile priority class (X-Priority-Class)")
 
     p_suite = sub.add_parser("suite", help="Run a suite of scenarios across Full flow")
     p_suite.add_argument("--base", default=DEFAULT_BASE, help="Taktile base URL")
     p_suite.add_argument("--pretty", action="store_true", help="Pretty-print JSON output")
+    p_suite.add_argument("--priority", default="batch", help="Taktile priority class (X-Priority-Class)")
 
     args = parser.parse_args()
 
@@ -119,9 +175,13 @@ def main() -> None:
             opts["income_inject_error"] = True
         if args.coverage_months is not None:
             opts["income_coverage_months"] = args.coverage_months
-        run_full(args.base, args.case_id, args.scenario, opts, args.pretty)
+        run_full(args.base, args.case_id, args.scenario, opts, args.pretty, args.priority)
+    elif args.cmd == "stages":
+        prior = {k: v for k, v in (("provisional_tier", args.provisional_tier), ("final_tier", args.final_tier)) if v is not None}
+        stages = [x.strip() for x in args.stages.split(",") if x.strip()]
+        run_stages(args.base, args.case_id, stages, prior, args.scenario, {}, args.pretty, args.priority)
     elif args.cmd == "suite":
-        run_suite(args.base, args.pretty)
+        run_suite(args.base, args.pretty, args.priority)
     else:
         parser.print_help()
         sys.exit(2)
@@ -0,0 +1,348 @@
+"""
+Policy parameter sweep over historical workflow results.
+
+  # 1) extract features once from /workflows/kyc/full responses (JSONL; orchestrate output lines work too)
+  python -m Taktile.runner.sweep extract --input history.jsonl --features features.npz [--jobs 8]
+  #    or synthesize a population to size a sweep
+  python -m Taktile.runner.sweep synth --cases 1000000 --features features.npz
+
+  # 2) evaluate a grid (ranges are start:stop:step inclusive, or comma lists)
+  python -m Taktile.runner.sweep run --features features.npz --out sweep.csv \\
+      --score-floor 620:700:20 --util-max 0.7:0.95:0.05 --inquiries-max 2:5:1 \\
+      --net-monthly-min 800:1200:100 --limit-multiplier 6,8
+
+Extraction re-runs T3 once per case with the swept KO rules disabled, so each case keeps exactly what
+the swept thresholds act on (base score, revolving utilization, hard inquiries) plus whether any other
+rule would still decline or review it. Income comes from the recorded T4 result. The grid is then pure
+array arithmetic, split across processes by credit point.
+
+Per grid point the CSV has: approval rate, share of approvals per final tier, total/mean exposure
+(credit limit = net monthly x multiplier) and `income_unknown`: cases that would now clear credit but
+never reached (or never finished) the income stage historically, so their outcome cannot be replayed.
+AML and fraud outcomes do not depend on the swept values. Suspicious income never approves, so the
+suspicious-income cut-off only moves cases between decline and review and is not swept.
+"""
+import argparse
+import csv
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from Taktile.stages.T3 import _extract_cp, _num, evaluate_credit_policy
+from Taktile.stages.T3 import CONFIG as CREDIT_CONFIG
+from Taktile.stages.T4 import CONFIG as INCOME_CONFIG
+from Taktile.stages.T4 import _income_tier_from_net_monthly
+
+
+# Swept credit rules switched off during extraction
+_PERMISSIVE = {"scoreFloor": -math.inf, "revolvingUtilizationMax": math.inf, "hardInquiries6mMax": math.inf}
+
+# Suspicious flag: 0 clean, 1 suspicious, -1 unknown (T4 stopped before evaluating it)
+FIELDS = {
+    "credit_ok": np.bool_,  # reached credit and nothing but the swept rules could stop it
+    "score": np.float64,  # NaN when the report has no risk model
+    "utilization": np.float64,
+    "has_limit": np.bool_,  # open revolving limit > 0 (utilization rule applies)
+    "hard6m": np.int16,
+    "income_known": np.bool_,
+    "income_ok": np.bool_,  # no vendor error, no employment flag (T5), net > 0, coverage sufficient
+    "suspicious": np.int8,
+    "net_monthly": np.float64,
+    "tier": np.int8,  # min(fraud tier, bureau tier, income tier)
+    "historical_pass": np.bool_,
+}
+
+
+def _utilization(credit_raw: Dict[str, Any]) -> Tuple[float, bool]:
+    # Same aggregation as T3, unrounded (the scorecard rounds to 3 decimals)
+    tradelines = _extract_cp(credit_raw).get("tradeline") or []
+    open_rev = [t for t in tradelines if t.get("revolvingOrInstallment") == "R" and t.get("openOrClosed") == "O"]
+    tot_bal = sum(_num(t.get("balanceAmount")) for t in open_rev)
+    tot_lim = sum(_num((t.get("enhancedPaymentData") or {}).get("creditLimitAmount")) for t in open_rev)
+    return ((tot_bal / tot_lim) if tot_lim > 0 else 0.0), tot_lim > 0
+
+
+def extract_features(result: Dict[str, Any]) -> Tuple[Any, ...]:
+    """
+    One workflow response -> one feature row (order of FIELDS).
+    """
+    if "response" in result and "case_id" not in result:
+        result = result.get("response") or {}
+    row: Dict[str, Any] = {
+        "credit_ok": False, "score": math.nan, "utilization": 0.0, "has_limit": False, "hard6m": 0,
+        "income_known": False, "income_ok": False, "suspicious": -1, "net_monthly": 0.0, "tier": 0,
+        "historical_pass": result.get("status") == "INCOME_PASS",
+    }
+    fraud = result.get("fraud_decision") or {}
+    credit_raw = result.get("credit_raw")
+    if fraud.get("decision") != "FRAUD_PASS" or not isinstance(credit_raw, dict):
+        return tuple(row[k] for k in FIELDS)
+
+    seon_tier = fraud.get("provisional_tier")
+    credit = evaluate_credit_policy(credit_raw, seon_tier, None, config=_PERMISSIVE)
+    scorecard = credit.get("scorecard") or {}
+    row["credit_ok"] = credit.get("decision") == "CREDIT_PASS"
+    if scorecard.get("baseScore") is not None:
+        row["score"] = float(scorecard["baseScore"])
+    row["utilization"], row["has_limit"] = _utilization(credit_raw)
+    row["hard6m"] = int(scorecard.get("inquiries6m") or 0)
+
+    income = result.get("income_decision")
+    if isinstance(income, dict):
+        metrics = income.get("metrics") or {}
+        reasons = income.get("reasons") or []
+        review = income.get("review_reasons") or []
+        net = float(metrics.get("net_monthly") or 0.0)
+        coverage_short = (
+            income.get("source_used") == "bank"
+            and str(metrics.get("coverage") or "").upper() != "FULL"
+            and int(metrics.get("coverage_months") or 0) < INCOME_CONFIG["bankMinCoverageMonths"]
+        )
+        # T5 flags (inactive employment, employer mismatch) send any passing income to review
+        employment_flags = (income.get("employment") or {}).get("flags") or []
+        row["income_known"] = True
+        row["income_ok"] = "vendor_error" not in review and not employment_flags and net > 0 and not coverage_short
+        row["net_monthly"] = net
+        if "SUSPICIOUS_SIGNALS" in review or "SUSPICIOUS_AND_LOW_INCOME" in reasons:
+            row["suspicious"] = 1
+        elif not any(r in reasons for r in ("NO_INCOME", "NET_MONTHLY_LT_1000", "INSUFFICIENT_COVERAGE")):
+            row["suspicious"] = 0
+        if net > 0:
+            row["tier"] = min(int(seon_tier or 0), int(credit.get("bureau_tier") or 0), _income_tier_from_net_monthly(net))
+    return tuple(row[k] for k in FIELDS)
+
+
+def _extract_line(line: str) -> Optional[Tuple[Any, ...]]:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return extract_features(json.loads(line))
+    except ValueError:
+        return None
+
+
+def _to_arrays(rows: List[Tuple[Any, ...]]) -> Dict[str, np.ndarray]:
+    cols = list(zip(*rows)) if rows else [[] for _ in FIELDS]
+    return {name: np.asarray(col, dtype=dtype) for (name, dtype), col in zip(FIELDS.items(), cols)}
+
+
+def extract(input_path: str, jobs: int) -> Dict[str, np.ndarray]:
+    with open(input_path, "r", encoding="utf-8") as fh:
+        if jobs > 1:
+            with mp.Pool(jobs) as pool:
+                rows = [r for r in pool.imap(_extract_line, fh, chunksize=256) if r is not None]
+        else:
+            rows = [r for r in map(_extract_line, fh) if r is not None]
+    return _to_arrays(rows)
+
+
+def synthesize(cases: int, seed: int = 7) -> Dict[str, np.ndarray]:
+    """
+    Random population with roughly production-like marginals, for sizing sweeps (not for decisions).
+    """
+    rng = np.random.default_rng(seed)
+    net = np.round(rng.lognormal(mean=7.8, sigma=0.5, size=cases), 2)
+    bounds = np.asarray(INCOME_CONFIG["incomeTierBounds"][::-1])
+    income_tier = np.searchsorted(bounds, net, side="right")
+    return {
+        "credit_ok": rng.random(cases) < 0.7,
+        "score": np.where(rng.random(cases) < 0.97, np.clip(rng.normal(690, 60, cases), 300, 850).round(), np.nan),
+        "utilization": rng.beta(2, 3, cases),
+        "has_limit": rng.random(cases) < 0.85,
+        "hard6m": rng.poisson(1.5, cases).astype(np.int16),
+        "income_known": rng.random(cases) < 0.8,
+        "income_ok": rng.random(cases) < 0.9,
+        "suspicious": rng.choice(np.array([0, 1, -1], dtype=np.int8), size=cases, p=[0.85, 0.1, 0.05]),
+        "net_monthly": net,
+        "tier": np.minimum(rng.integers(0, 8, cases), income_tier).astype(np.int8),
+        "historical_pass": np.zeros(cases, dtype=np.bool_),
+    }
+
+
+def save_features(path: str, features: Dict[str, np.ndarray]) -> None:
+    np.savez(path, **features)
+
+
+def load_features(path: str) -> Dict[str, np.ndarray]:
+    with np.load(path) as data:
+        return {name: data[name] for name in FIELDS}
+
+
+# --- grid evaluation ---------------------------------------------------------------------------------
+
+_F: Dict[str, np.ndarray] = {}
+
+
+def _init_worker(features: Dict[str, np.ndarray]) -> None:
+    global _F
+    _F = features
+
+
+def evaluate_credit_point(args: Tuple[float, float, float, List[float], List[float]]) -> List[Dict[str, Any]]:
+    """
+    All (netMonthlyMin, creditLimitMultiplier) rows for one credit point.
+    """
+    floor, util_max, inq_max, net_mins, multipliers = args
+    f = _F
+    n = len(f["credit_ok"])
+    score = f["score"]
+    credit = f["credit_ok"] & (np.isnan(score) | (score >= floor))
+    credit &= ~f["has_limit"] | (f["utilization"] <= util_max)
+    credit &= f["hard6m"] <= inq_max
+
+    # Cases cleared by credit at this point; income rules only look at these
+    net = f["net_monthly"][credit]
+    known = f["income_known"][credit]
+    base_ok = known & f["income_ok"][credit]
+    clean = base_ok & (f["suspicious"][credit] == 0)
+    undetermined = base_ok & (f["suspicious"][credit] == -1)
+    tier = f["tier"][credit]
+    unreached = int((~known).sum())
+
+    rows = []
+    for net_min in net_mins:
+        enough = net >= net_min
+        approved = clean & enough
+        count = int(approved.sum())
+        tiers = np.bincount(tier[approved], minlength=8)[:8]
+        net_sum = float(net[approved].sum())
+        unknown = unreached + int((undetermined & enough).sum())
+        for mult in multipliers:
+            exposure = net_sum * mult
+            row: Dict[str, Any] = {
+                "scoreFloor": floor,
+                "revolvingUtilizationMax": util_max,
+                "hardInquiries6mMax": inq_max,
+                "netMonthlyMin": net_min,
+                "creditLimitMultiplier": mult,
+                "cases": n,
+                "approved": count,
+                "approval_rate": round(count / n, 6) if n else 0.0,
+                "income_unknown": unknown,
+                "exposure_total": round(exposure, 2),
+                "exposure_mean": round(exposure / count, 2) if count else 0.0,
+            }
+            for t in range(8):
+                row[f"tier_{t}"] = round(int(tiers[t]) / count, 6) if count else 0.0
+            rows.append(row)
+    return rows
+
+
+def run_grid(features: Dict[str, np.ndarray], grid: Dict[str, List[float]], jobs: int) -> List[Dict[str, Any]]:
+    tasks = [
+        (floor, util_max, inq_max, grid["netMonthlyMin"], grid["creditLimitMultiplier"])
+        for floor, util_max, inq_max in itertools.product(
+            grid["scoreFloor"], grid["revolvingUtilizationMax"], grid["hardInquiries6mMax"]
+        )
+    ]
+    if jobs > 1 and len(tasks) > 1:
+        with mp.Pool(jobs, initializer=_init_worker, initargs=(features,)) as pool:
+            chunks = pool.map(evaluate_credit_point, tasks)
+    else:
+        _init_worker(features)
+        chunks = [evaluate_credit_point(t) for t in tasks]
+    return [row for chunk in chunks for row in chunk]
+
+
+def _number(x: float) -> float:
+    return int(x) if float(x).is_integer() else x
+
+
+def parse_values(spec: str) -> List[float]:
+    """
+    "a,b,c" or "start:stop:step" (inclusive).
+    """
+    if ":" in spec:
+        start, stop, step = (float(x) for x in spec.split(":"))
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        return [_number(round(start + i * step, 10)) for i in range(count)]
+    return [_number(float(x)) for x in spec.split(",") if x.strip()]
+
+
+def _write_csv(rows: List[Dict[str, Any]], out: Optional[str]) -> None:
+    if not rows:
+        return
+    fh = open(out, "w", newline="", encoding="utf-8") if out else sys.stdout
+    try:
+        writer = csv.DictWriter(fh, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    finally:
+        if out:
+            fh.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="sweep", description="Sweep T3/T4 policy parameters over historical cases")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_ext = sub.add_parser("extract", help="Extract features from workflow responses (JSONL)")
+    p_ext.add_argument("--input", required=True, help="JSONL of /workflows/kyc/full responses")
+    p_ext.add_argument("--features", required=True, help="Output .npz")
+    p_ext.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+
+    p_syn = sub.add_parser("synth", help="Write a synthetic feature set")
+    p_syn.add_argument("--cases", type=int, default=1_000_000)
+    p_syn.add_argument("--features", required=True, help="Output .npz")
+    p_syn.add_argument("--seed", type=int, default=7)
+
+    p_run = sub.add_parser("run", help="Evaluate a parameter grid")
+    p_run.add_argument("--features", required=True, help="Features .npz from extract/synth")
+    p_run.add_argument("--out", help="Summary CSV (default: stdout)")
+    p_run.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    p_run.add_argument("--score-floor", default=str(CREDIT_CONFIG["scoreFloor"]))
+    p_run.add_argument("--util-max", default=str(CREDIT_CONFIG["revolvingUtilizationMax"]))
+    p_run.add_argument("--inquiries-max", default=str(CREDIT_CONFIG["hardInquiries6mMax"]))
+    p_run.add_argument("--net-monthly-min", default=str(INCOME_CONFIG["netMonthlyMin"]))
+    p_run.add_argument("--limit-multiplier", default=str(INCOME_CONFIG["creditLimitMultiplier"]))
+
+    args = parser.parse_args()
+    t0 = time.perf_counter()
+
+    if args.cmd == "extract":
+        features = extract(args.input, args.jobs)
+        save_features(args.features, features)
+        n = len(features["credit_ok"])
+        # At today's CONFIG the replay should agree with the recorded outcomes
+        replay = run_grid(features, {
+            "scoreFloor": [CREDIT_CONFIG["scoreFloor"]],
+            "revolvingUtilizationMax": [CREDIT_CONFIG["revolvingUtilizationMax"]],
+            "hardInquiries6mMax": [CREDIT_CONFIG["hardInquiries6mMax"]],
+            "netMonthlyMin": [INCOME_CONFIG["netMonthlyMin"]],
+            "creditLimitMultiplier": [INCOME_CONFIG["creditLimitMultiplier"]],
+        }, jobs=1)[0]
+        print(
+            f"{n} cases -> {args.features} in {time.perf_counter() - t0:.1f}s "
+            f"(recorded INCOME_PASS {int(features['historical_pass'].sum())}, replayed at current CONFIG {replay['approved']})",
+            file=sys.stderr,
+        )
+    elif args.cmd == "synth":
+        save_features(args.features, synthesize(args.cases, args.seed))
+        print(f"{args.cases} synthetic cases -> {args.features}", file=sys.stderr)
+    elif args.cmd == "run":
+        features = load_features(args.features)
+        grid = {
+            "scoreFloor": parse_values(args.score_floor),
+            "revolvingUtilizationMax": parse_values(args.util_max),
+            "hardInquiries6mMax": parse_values(args.inquiries_max),
+            "netMonthlyMin": parse_values(args.net_monthly_min),
+            "creditLimitMultiplier": parse_values(args.limit_multiplier),
+        }
+        rows = run_grid(features, grid, args.jobs)
+        _write_csv(rows, args.out)
+        print(
+            f"{len(rows)} grid points x {len(features['credit_ok'])} cases in {time.perf_counter() - t0:.1f}s",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
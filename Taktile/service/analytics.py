@@ -0,0 +1,187 @@
+"""
+Rolling decision analytics (per worker process).
+
+Every T1–T5 evaluation is counted by stage: decision, tier and each KO / review reason code. Counts are
+kept in fixed rings of time buckets per window (5m, 1h, 24h). Each ring also keeps a running total that
+is updated when a bucket is filled or expires, so reading a window never sums buckets or scans logs.
+Memory is (buckets x distinct keys) per window, and the key space is the policy's closed set of
+decisions, tiers and reason codes.
+
+GET /admin/analytics/decisions?window=1h — counts for one window
+GET /admin/analytics/spikes?window=5m&baseline=24h — reason codes whose rate in `window` is highest
+    relative to their rate over `baseline`
+"""
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from Taktile.service import memory
+from Taktile.service.security import require_admin
+
+
+# (stage, kind, value), e.g. ("T3", "decision", "CREDIT_REVIEW"), ("T3", "ko", "REV_UTIL_GT_90")
+Key = Tuple[str, str, str]
+
+
+class RollingWindow:
+    """
+    Counts over the last `span_seconds`, at a resolution of `span_seconds / buckets`.
+    """
+
+    def __init__(self, span_seconds: float, buckets: int) -> None:
+        self.span = span_seconds
+        self.width = span_seconds / buckets
+        self._buckets: List[Counter] = [Counter() for _ in range(buckets)]
+        self._total: Counter = Counter()
+        self._head: Optional[int] = None  # absolute index of the newest bucket
+        self._lock = threading.Lock()
+
+    def _advance(self, now: float) -> int:
+        idx = int(now // self.width)
+        n = len(self._buckets)
+        if self._head is None or idx - self._head >= n:
+            for b in self._buckets:
+                b.clear()
+            self._total.clear()
+        elif idx > self._head:
+            for i in range(self._head + 1, idx + 1):
+                expired = self._buckets[i % n]
+                if expired:
+                    self._total.subtract(expired)
+                    expired.clear()
+            self._total = +self._total  # drop zero entries
+        if self._head is None or idx > self._head:
+            self._head = idx
+        return idx
+
+    def add(self, keys: Iterable[Key], now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            bucket = self._buckets[self._advance(now) % len(self._buckets)]
+            for key in keys:
+                bucket[key] += 1
+                self._total[key] += 1
+
+    def totals(self, now: Optional[float] = None) -> Dict[Key, int]:
+        now = time.time() if now is None else now
+        with self._lock:
+            self._advance(now)
+            return dict(self._total)
+
+
+WINDOWS: Dict[str, RollingWindow] = {
+    "5m": RollingWindow(300, 60),
+    "1h": RollingWindow(3600, 60),
+    "24h": RollingWindow(86400, 96),
+}
+for _name, _window in WINDOWS.items():
+    memory.register_store(f"analytics.{_name}", lambda w=_window: w._buckets)
+
+
+def _keys(stage: str, decision: Any, tier: Any, ko: Iterable[str], review: Iterable[str]) -> List[Key]:
+    keys: List[Key] = [(stage, "decision", str(decision or "UNKNOWN"))]
+    if tier is not None:
+        keys.append((stage, "tier", str(tier)))
+    keys.extend((stage, "ko", str(r)) for r in ko or [])
+    keys.extend((stage, "review", str(r)) for r in review or [])
+    return keys
+
+
+def record(stage: str, decision: Any, tier: Any = None, ko: Iterable[str] = (), review: Iterable[str] = ()) -> None:
+    """
+    Count one stage evaluation in every window.
+    """
+    keys = _keys(stage, decision, tier, ko, review)
+    now = time.time()
+    for window in WINDOWS.values():
+        window.add(keys, now)
+
+
+def record_aml(result: Dict[str, Any]) -> None:
+    # T1 reasons explain a DECLINE; on PROCEED they are context (e.g. adverse media)
+    declined = result.get("decision") == "DECLINE"
+    reasons = result.get("reasons") or []
+    record("T1", result.get("decision"), ko=reasons if declined else (), review=() if declined else reasons)
+
+
+def record_fraud(result: Dict[str, Any]) -> None:
+    declined = result.get("decision") == "FRAUD_DECLINE"
+    reasons = result.get("reasons") or []
+    record("T2", result.get("decision"), result.get("provisional_tier"), ko=reasons if declined else (), review=() if declined else reasons)
+
+
+def record_credit(result: Dict[str, Any]) -> None:
+    tier = result.get("bureau_tier") if result.get("decision") == "CREDIT_PASS" else None
+    record("T3", result.get("decision"), tier, result.get("ko_reasons") or [], result.get("review_reasons") or [])
+
+
+def record_income(result: Dict[str, Any]) -> None:
+    record("T4", result.get("decision"), result.get("income_tier"), result.get("reasons") or [], result.get("review_reasons") or [])
+
+
+def record_employment(result: Dict[str, Any]) -> None:
+    record("T5", result.get("decision"), review=result.get("flags") or [])
+
+
+def summary(window: str) -> Dict[str, Any]:
+    w = WINDOWS[window]
+    stages: Dict[str, Dict[str, Dict[str, int]]] = {}
+    for (stage, kind, value), count in sorted(w.totals().items()):
+        if count > 0:
+            stages.setdefault(stage, {}).setdefault(kind, {})[value] = count
+    return {"window": window, "window_seconds": w.span, "bucket_seconds": w.width, "stages": stages}
+
+
+def spikes(window: str, baseline: str, min_count: int = 5, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    KO/review reasons ranked by (rate in `window`) / (rate in `baseline`). Both windows cover the recent
+    past, so a reason that only just appeared has ratio baseline_span / window_span.
+    """
+    cur_w, base_w = WINDOWS[window], WINDOWS[baseline]
+    current, base = cur_w.totals(), base_w.totals()
+    out = []
+    for key, count in current.items():
+        stage, kind, value = key
+        if kind not in ("ko", "review") or count < min_count:
+            continue
+        rate = count / cur_w.span
+        base_rate = base.get(key, count) / base_w.span
+        out.append({
+            "stage": stage,
+            "kind": kind,
+            "reason": value,
+            "count": count,
+            "baseline_count": base.get(key, 0),
+            "ratio": round(rate / base_rate, 3) if base_rate else None,
+        })
+    out.sort(key=lambda r: (r["ratio"] or 0, r["count"]), reverse=True)
+    return out[:limit]
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+def _window(name: str) -> str:
+    if name not in WINDOWS:
+        raise HTTPException(status_code=400, detail=f"window must be one of {sorted(WINDOWS)}")
+    return name
+
+
+@router.get("/admin/analytics/decisions")
+def analytics_decisions(window: str = Query(default="1h")) -> Dict[str, Any]:
+    return summary(_window(window))
+
+
+@router.get("/admin/analytics/spikes")
+def analytics_spikes(
+    window: str = Query(default="5m"),
+    baseline: str = Query(default="24h"),
+    min_count: int = Query(default=5, ge=1),
+    limit: int = Query(default=20, ge=1, le=200),
+) -> Dict[str, Any]:
+    _window(window)
+    _window(baseline)
+    return {"window": window, "baseline": baseline, "spikes": spikes(window, baseline, min_count, limit)}
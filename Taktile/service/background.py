@@ -0,0 +1,86 @@
+"""
+Background completion of workflow stages that overrun their latency budget.
+
+`submit()` runs a stage on a bounded pool (BACKGROUND_WORKERS), outside the request context: the caller's
+deadline does not apply, so the stage gets the vendor client's full timeout and retries. `result()` waits
+for it with the latency budget counted from when a worker starts it, not from when it was queued. When
+the request gives up waiting, `on_done()` attaches a callback delivery: the result is POSTed to the
+caller-registered URL with its token in `X-Callback-Token`. Deliveries run on their own pool
+(CALLBACK_WORKERS), so they never queue behind stages.
+"""
+import contextvars
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict
+
+import httpx
+
+from Taktile.clients.retry import TRANSIENT_STATUS_CODES, call_with_retry
+from Taktile.service import deadline
+from Taktile.service.config import settings
+
+
+logger = logging.getLogger("taktile.background")
+
+_executor = ThreadPoolExecutor(max_workers=settings.BACKGROUND_WORKERS, thread_name_prefix="taktile-bg")
+_deliveries = ThreadPoolExecutor(max_workers=settings.CALLBACK_WORKERS, thread_name_prefix="taktile-callback")
+_client = httpx.Client(timeout=settings.CALLBACK_TIMEOUT_SECONDS)
+
+
+def submit(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """
+    Run `fn` on the background pool. The future's `started` event is set once a worker picks it up.
+    """
+    started = threading.Event()
+
+    def run() -> Any:
+        started.set()
+        return fn(*args, **kwargs)
+
+    future = _executor.submit(run)
+    future.started = started  # type: ignore[attr-defined]
+    return future
+
+
+def result(future: Future, budget: float) -> Any:
+    """
+    The result of a submitted stage, allowing it `budget` seconds once it runs: time queued for a worker is
+    bounded by the workflow deadline only, not charged to the budget. Raises concurrent.futures.TimeoutError
+    when either runs out (the stage keeps running).
+    """
+    if not future.started.wait(deadline.timeout(settings.WORKFLOW_TIMEOUT_SECONDS)):  # type: ignore[attr-defined]
+        raise FutureTimeout()
+    return future.result(timeout=deadline.timeout(budget))
+
+
+def _deliver(url: str, token: str, payload: Dict[str, Any]) -> bool:
+    try:
+        resp = call_with_retry(
+            lambda: _client.post(url, json=payload, headers={"X-Callback-Token": token}),
+            retry_on_result=lambda r: r.status_code in TRANSIENT_STATUS_CODES,
+        )
+    except Exception as e:
+        logger.warning("callback %s for case %s failed: %s", url, payload.get("case_id"), e)
+        return False
+    if resp.status_code >= 400:
+        logger.warning("callback %s for case %s rejected: %s", url, payload.get("case_id"), resp.status_code)
+        return False
+    return True
+
+
+def deliver_callback(url: str, token: str, payload: Dict[str, Any]) -> bool:
+    """
+    POST the payload to the callback URL; transient failures are retried like vendor calls. Returns whether the
+    receiver accepted it. Runs in an empty context: the deadline, spend ledger and priority class of a workflow
+    that ran earlier on the same thread do not apply to the delivery.
+    """
+    return contextvars.Context().run(_deliver, url, token, payload)
+
+
+def on_done(future: Future, build_payload: Callable[[Future], Dict[str, Any]], url: str, token: str) -> None:
+    """
+    Deliver `build_payload(future)` to the callback once the background stage finishes. Delivery always
+    runs on the delivery pool, even when the future is already done (add_done_callback would run it inline).
+    """
+    future.add_done_callback(lambda f: _deliveries.submit(deliver_callback, url, token, build_payload(f)))
@@ -0,0 +1,275 @@
+"""
+Cache / state backends shared by Taktile features (idempotency tables, short-lived tokens, caches).
+
+Two implementations with the same semantics:
+  - MemoryCache: per-process OrderedDict (fastest, but every uvicorn worker has its own copy)
+  - SQLiteCache: one SQLite file in WAL mode shared by every worker process on the host
+
+Semantics (identical in both):
+  - values must be JSON-serializable; get() returns a copy, so mutating it never changes the stored value
+  - TTL is absolute wall-clock expiry (`time.time()`); expired entries are never returned and are
+    dropped lazily on access or by `purge_expired()`
+  - capacity is `max_entries` per namespace; inserting beyond it evicts the least recently used
+    entries (reads and writes both count as use; SQLite records a read at most once per
+    CACHE_TOUCH_INTERVAL_SECONDS per entry, so hits stay read-only)
+  - `add()` is set-if-absent (an expired entry counts as absent), the building block for idempotency
+
+Use `get_cache(namespace, ...)`; CACHE_BACKEND selects the implementation.
+"""
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from Taktile.service import memory
+from Taktile.service.config import settings
+
+
+class CacheBackend(ABC):
+    def __init__(self, namespace: str, max_entries: int, default_ttl: Optional[float] = None) -> None:
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+
+    def _expiry(self, ttl: Optional[float]) -> Optional[float]:
+        ttl = self.default_ttl if ttl is None else ttl
+        return (time.time() + ttl) if ttl else None
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+class MemoryCache(CacheBackend):
+    def __init__(self, namespace: str, max_entries: int, default_ttl: Optional[float] = None) -> None:
+        super().__init__(namespace, max_entries, default_ttl)
+        # key -> (expires_at, value); order is recency of use (last = most recent)
+        self._data: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        memory.register_store(f"cache.{namespace}", lambda: self._data)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return copy.deepcopy(value)
+
+    def _put(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        # Stored and returned as copies, like SQLiteCache: callers never share the stored object
+        self._data[key] = (expires_at, copy.deepcopy(value))
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._put(key, value, self._expiry(ttl))
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and (item[0] is None or item[0] > time.time()):
+                return False
+            self._put(key, value, self._expiry(ttl))
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [k for k, (exp, _) in self._data.items() if exp is not None and exp <= now]
+            for k in expired:
+                del self._data[k]
+        return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    ns TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (ns, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_entries_lru ON cache_entries (ns, last_used);
+CREATE TABLE IF NOT EXISTS cache_counts (ns TEXT PRIMARY KEY, n INTEGER NOT NULL);
+CREATE TRIGGER IF NOT EXISTS cache_entries_ins AFTER INSERT ON cache_entries BEGIN
+    INSERT INTO cache_counts (ns, n) VALUES (NEW.ns, 1) ON CONFLICT (ns) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_entries_del AFTER DELETE ON cache_entries BEGIN
+    UPDATE cache_counts SET n = n - 1 WHERE ns = OLD.ns;
+END;
+"""
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Cross-process backend: every worker opens the same SQLite file (WAL mode, so readers never block
+    the writer). One connection per thread; writes run in IMMEDIATE transactions so the size check and
+    eviction are atomic across processes. Entry counts are kept by triggers so the capacity check does
+    not scan the table.
+    """
+
+    def __init__(self, namespace: str, max_entries: int, default_ttl: Optional[float] = None, path: Optional[str] = None) -> None:
+        super().__init__(namespace, max_entries, default_ttl)
+        self.path = path or settings.CACHE_SQLITE_PATH
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, expires_at, last_used FROM cache_entries WHERE ns = ? AND key = ?", (self.namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] is not None and row[1] <= now:
+            conn.execute("DELETE FROM cache_entries WHERE ns = ? AND key = ? AND expires_at <= ?", (self.namespace, key, now))
+            return None
+        # A hit only writes (and takes the WAL write lock) when its recency is stale by more than the interval
+        if now - row[2] >= settings.CACHE_TOUCH_INTERVAL_SECONDS:
+            conn.execute("UPDATE cache_entries SET last_used = ? WHERE ns = ? AND key = ?", (now, self.namespace, key))
+        return json.loads(row[0])
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        row = conn.execute("SELECT n FROM cache_counts WHERE ns = ?", (self.namespace,)).fetchone()
+        over = (row[0] if row else 0) - self.max_entries
+        if over > 0:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE ns = ? AND key IN "
+                "(SELECT key FROM cache_entries WHERE ns = ? ORDER BY last_used LIMIT ?)",
+                (self.namespace, self.namespace, over),
+            )
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        conn = self._conn()
+        payload = json.dumps(value, separators=(",", ":"))
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO cache_entries (ns, key, value, expires_at, last_used) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (ns, key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at, last_used = excluded.last_used",
+                (self.namespace, key, payload, self._expiry(ttl), time.time()),
+            )
+            self._evict(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        conn = self._conn()
+        payload = json.dumps(value, separators=(",", ":"))
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cur = conn.execute(
+                "INSERT INTO cache_entries (ns, key, value, expires_at, last_used) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (ns, key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at, last_used = excluded.last_used "
+                "WHERE cache_entries.expires_at IS NOT NULL AND cache_entries.expires_at <= ?",
+                (self.namespace, key, payload, self._expiry(ttl), now, now),
+            )
+            added = cur.rowcount > 0
+            if added:
+                self._evict(conn)
+            conn.execute("COMMIT")
+            return added
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM cache_entries WHERE ns = ? AND key = ?", (self.namespace, key))
+
+    def purge_expired(self) -> int:
+        cur = self._conn().execute(
+            "DELETE FROM cache_entries WHERE ns = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+            (self.namespace, time.time()),
+        )
+        return cur.rowcount
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM cache_entries WHERE ns = ?", (self.namespace,))
+
+    def __len__(self) -> int:
+        row = self._conn().execute("SELECT n FROM cache_counts WHERE ns = ?", (self.namespace,)).fetchone()
+        return int(row[0]) if row else 0
+
+
+_caches: Dict[str, CacheBackend] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace: str, max_entries: int = 10_000, default_ttl: Optional[float] = None, backend: Optional[str] = None) -> CacheBackend:
+    """
+    Return the process-wide cache for `namespace`, creating it on first use.
+    `backend` overrides CACHE_BACKEND ("memory" | "sqlite").
+    """
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            kind = (backend or settings.CACHE_BACKEND).lower()
+            if kind == "sqlite":
+                os.makedirs(os.path.dirname(os.path.abspath(settings.CACHE_SQLITE_PATH)), exist_ok=True)
+                cache = SQLiteCache(namespace, max_entries, default_ttl)
+            else:
+                cache = MemoryCache(namespace, max_entries, default_ttl)
+            _caches[namespace] = cache
+        return cache
@@ -0,0 +1,276 @@
+"""
+Per-stage results of each case, so a case can be resumed from a stage instead of re-run from AML.
+
+Every stage that /workflows/kyc/full, /workflows/kyc/stages or /workflows/kyc/resume runs stores its result under
+the case id. The record holds the stage output with its raw vendor payload, the time it ran, and a fingerprint of the
+intake fields that stage reads. The intake of the last run is stored too, reduced to the fields some stage reads.
+Its SSN and date of birth are encrypted with CASE_STORE_KEY (see sealing); without the key they are not stored,
+and a resume that would re-run AML, fraud or credit on the stored intake needs the intake passed again. The raw
+vendor payloads of a result (*_raw: the SEON responses, and the credit report with its consumerIdentity block) are
+compressed with the vendor's trained dictionary (see payloads.py), then encrypted with CASE_STORE_KEY as well;
+without the key they are not stored, and a reused stage returns them as null. The case's
+SEON transaction id and Plaid user (client_user_id) are stored so vendor webhooks can find it, and so is the
+`replay_callback` of its /workflows/kyc/full request, where webhook-driven results are delivered. Entries live in the shared cache backend
+(namespace "cases") for CASE_STORE_TTL_SECONDS.
+
+`/workflows/kyc/resume` re-runs a case from a named stage onward and reuses the stored results of the stages before
+it. A stored result is reused only when it is fresh:
+  - it is younger than the stage's maximum age (CASE_STAGE_MAX_AGE, "stage:seconds,...");
+  - the intake fields the stage reads are unchanged. Custom fields that only income and employment read
+    (income_*, employment_*) are left out, so new income options never invalidate AML, fraud or credit.
+The resume starts at the first stage that is missing, expired or changed, even if an earlier stage than the
+one requested.
+
+GET /admin/cases/{case_id} — stored stages of a case: age, decision and whether they are still fresh for its intake
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from Taktile.service import payloads, sealing
+from Taktile.service.cache import get_cache
+from Taktile.service.config import settings
+from Taktile.service.security import require_admin
+from Taktile.stages.S1 import build_aml_payload
+from Taktile.stages.S2 import build_fraud_payload
+from Taktile.stages.S3 import build_experian_payload
+
+
+logger = logging.getLogger("taktile.cases")
+
+STAGES = ("aml", "fraud", "credit", "income")
+
+# Intake fields some stage reads (S1-S5 payloads, the Plaid user); the stored intake keeps nothing else
+_STORED_FIELDS = (
+    "user_fullname", "user_dob", "user_country", "email", "phone_number", "ip", "session", "ssn",
+    "address_line1", "address_city", "address_state", "address_zip", "client_user_id", "custom_fields",
+)
+# Identity fields stored only encrypted with CASE_STORE_KEY
+SEALED_FIELDS = ("ssn", "user_dob")
+_PURPOSE = "case-intake"
+_PAYLOAD_PURPOSE = "case-payload"
+# Stored-intake keys: the sealed fields, and the ones left out for want of a key
+_SEALED_KEY = "_sealed"
+_WITHHELD_KEY = "_withheld"
+
+# Custom fields read only by the income stage (S4/S5); they do not make earlier stages stale
+_LATE_FIELD_PREFIXES = ("income_", "employment_")
+
+
+def _income_inputs(intake: Dict[str, Any]) -> Dict[str, Any]:
+    cf = intake.get("custom_fields") or {}
+    return {
+        "client_user_id": intake.get("client_user_id"),
+        "custom_fields": {k: v for k, v in cf.items() if str(k).startswith(_LATE_FIELD_PREFIXES)},
+    }
+
+
+# Stage -> what the stage reads from the intake (the vendor payload, or the income options)
+_INPUTS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "aml": build_aml_payload,
+    "fraud": build_fraud_payload,
+    "credit": build_experian_payload,
+    "income": _income_inputs,
+}
+
+_store = get_cache("cases", max_entries=settings.CASE_STORE_MAX_ENTRIES, default_ttl=settings.CASE_STORE_TTL_SECONDS)
+_counters: Counter = Counter()
+
+if settings.CASE_STORE_ENABLED and not sealing.usable(settings.CASE_STORE_KEY):
+    logger.warning(
+        "CASE_STORE_KEY is not set; stored intakes keep no SSN or date of birth, so resumes that re-run AML, fraud or credit "
+        "need the intake, and stored results keep no raw vendor payloads"
+    )
+
+
+def max_ages() -> Dict[str, float]:
+    """
+    "aml:86400,credit:604800" -> {"aml": 86400.0, "credit": 604800.0}
+    """
+    out: Dict[str, float] = {}
+    for part in settings.CASE_STAGE_MAX_AGE.split(","):
+        name, _, seconds = part.strip().partition(":")
+        if name and seconds:
+            out[name.strip()] = float(seconds)
+    return out
+
+
+def without_late_fields(intake: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The intake without the custom fields only income and employment read (income_*, employment_*).
+    """
+    cf = intake.get("custom_fields") or {}
+    return {**intake, "custom_fields": {k: v for k, v in cf.items() if not str(k).startswith(_LATE_FIELD_PREFIXES)}}
+
+
+def fingerprint(stage: str, intake: Dict[str, Any]) -> str:
+    if stage != "income":
+        intake = without_late_fields(intake)
+    inputs = _INPUTS[stage](intake)
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _minimal(intake: Dict[str, Any]) -> Dict[str, Any]:
+    kept = {k: v for k, v in intake.items() if k in _STORED_FIELDS and k not in SEALED_FIELDS}
+    secret = {k: intake[k] for k in SEALED_FIELDS if intake.get(k) is not None}
+    # An intake read back without its sealed fields stays marked as such when stored again
+    left_out = set(intake.get(_WITHHELD_KEY) or ()) - set(secret)
+    if secret and sealing.usable(settings.CASE_STORE_KEY):
+        kept[_SEALED_KEY] = sealing.seal(secret, settings.CASE_STORE_KEY, _PURPOSE)
+    else:
+        left_out |= set(secret)
+    if left_out:
+        kept[_WITHHELD_KEY] = sorted(left_out)
+    return kept
+
+
+def _pack(result: Dict[str, Any]) -> Dict[str, Any]:
+    if not sealing.usable(settings.CASE_STORE_KEY):
+        return payloads.pack_result({k: (None if k in payloads.RAW_FIELDS else v) for k, v in result.items()})
+    packed = payloads.pack_result(result)
+    for field in payloads.RAW_FIELDS:
+        if packed.get(field) is not None:
+            packed[field] = {_SEALED_KEY: sealing.seal(packed[field], settings.CASE_STORE_KEY, _PAYLOAD_PURPOSE)}
+    return packed
+
+
+def _unpack(result: Dict[str, Any], case_id: str) -> Dict[str, Any]:
+    out = dict(result)
+    for field in payloads.RAW_FIELDS:
+        value = out.get(field)
+        if isinstance(value, dict) and _SEALED_KEY in value:
+            try:
+                out[field] = sealing.unseal(value[_SEALED_KEY], settings.CASE_STORE_KEY, _PAYLOAD_PURPOSE)
+            except ValueError:
+                logger.warning("sealed %s of case %s cannot be decrypted with CASE_STORE_KEY", field, case_id)
+                out[field] = None
+    return payloads.unpack_result(out)
+
+
+def save(case_id: str, stage: str, intake: Dict[str, Any], result: Dict[str, Any]) -> None:
+    if not settings.CASE_STORE_ENABLED:
+        return
+    _store.set(f"{case_id}:intake", _minimal(intake))
+    _store.set(f"{case_id}:{stage}", {"at": time.time(), "fingerprint": fingerprint(stage, intake), "result": _pack(result)})
+    if stage == "fraud":
+        transaction_id = ((result.get("fraud_raw") or {}).get("data") or {}).get("id")
+        if transaction_id:
+            _store.set(f"txn:{transaction_id}", case_id)
+    elif stage == "income":
+        _store.set(f"plaid_user:{intake.get('client_user_id') or case_id}", case_id)
+
+
+def set_callback(case_id: str, callback: Dict[str, Any]) -> None:
+    if settings.CASE_STORE_ENABLED:
+        _store.set(f"{case_id}:callback", {"url": callback.get("url"), "token": callback.get("token", "")})
+
+
+def callback(case_id: str) -> Optional[Dict[str, Any]]:
+    """
+    {url, token} the case's results are delivered to outside a request (webhook re-evaluations), if any.
+    """
+    return _store.get(f"{case_id}:callback")
+
+
+def forget_from(case_id: str, stage: str) -> None:
+    """
+    Drop the stored results of `stage` and every later stage (they are about to be re-run).
+    """
+    for later in STAGES[STAGES.index(stage):]:
+        _store.delete(f"{case_id}:{later}")
+
+
+def intake(case_id: str) -> Optional[Dict[str, Any]]:
+    """
+    The stored intake with its sealed fields decrypted. Fields it lacks (no CASE_STORE_KEY when it was stored, or
+    a key rotated since) are listed by `withheld`.
+    """
+    stored = _store.get(f"{case_id}:intake")
+    if stored is None:
+        return None
+    blob = stored.pop(_SEALED_KEY, None)
+    if blob is not None:
+        try:
+            stored.update(sealing.unseal(blob, settings.CASE_STORE_KEY, _PURPOSE))
+        except ValueError:
+            logger.warning("sealed intake fields of case %s cannot be decrypted with CASE_STORE_KEY", case_id)
+            stored[_WITHHELD_KEY] = list(SEALED_FIELDS)
+    return stored
+
+
+def withheld(intake: Dict[str, Any]) -> List[str]:
+    """
+    Sealed fields an intake read back from the store lacks; stages reading them cannot re-run on it.
+    """
+    return list(intake.get(_WITHHELD_KEY) or ())
+
+
+def stored(case_id: str, stage: str) -> Optional[Dict[str, Any]]:
+    """
+    The stage's stored result, fresh or not.
+    """
+    entry = _store.get(f"{case_id}:{stage}")
+    return _unpack(entry["result"], case_id) if entry is not None else None
+
+
+def case_for_transaction(transaction_id: str) -> Optional[str]:
+    return _store.get(f"txn:{transaction_id}")
+
+
+def case_for_plaid_user(client_user_id: str) -> Optional[str]:
+    return _store.get(f"plaid_user:{client_user_id}")
+
+
+def _check(entry: Optional[Dict[str, Any]], stage: str, intake: Dict[str, Any]) -> str:
+    if entry is None:
+        return "missing"
+    max_age = max_ages().get(stage)
+    if max_age is not None and time.time() - entry["at"] > max_age:
+        return "expired"
+    # A stored intake missing its sealed fields is the one the stage ran on, but cannot be fingerprinted again
+    if entry["fingerprint"] != fingerprint(stage, intake) and not withheld(intake):
+        return "changed"
+    return "fresh"
+
+
+def reusable(case_id: str, stage: str, intake: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    (stored result, "fresh") when the stage's stored result can be reused for `intake`, else (None, reason):
+    missing | expired | changed.
+    """
+    entry = _store.get(f"{case_id}:{stage}")
+    state = _check(entry, stage, intake)
+    _counters[f"{stage}_{'reused' if state == 'fresh' else state}"] += 1
+    return (_unpack(entry["result"], case_id) if state == "fresh" else None), state
+
+
+def _decision(result: Dict[str, Any]) -> Optional[str]:
+    for key in ("aml_decision", "fraud_decision", "credit_decision", "income_decision"):
+        if isinstance(result.get(key), dict):
+            return result[key].get("decision")
+    return None
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/admin/cases/{case_id}")
+def case_state(case_id: str) -> Dict[str, Any]:
+    current = intake(case_id)
+    if current is None:
+        raise HTTPException(status_code=404, detail="Unknown case")
+    stages: Dict[str, Any] = {}
+    for stage in STAGES:
+        entry = _store.get(f"{case_id}:{stage}")
+        if entry is not None:
+            stages[stage] = {
+                "age_seconds": round(time.time() - entry["at"], 1),
+                "decision": _decision(entry["result"]),
+                "state": _check(entry, stage, current),
+            }
+    return {"case_id": case_id, "stages": stages, "counters": dict(_counters)}
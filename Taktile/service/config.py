@@ -13,12 +13,166 @@ class Settings(BaseModel):
     #EXPERIAN_BASE_URL: str = os.getenv("EXPERIAN_BASE_URL", "http://localhost:8000")
     EXPERIAN_TOKEN: str = os.getenv("EXPERIAN_TOKEN", "sandbox-token")
     EXPERIAN_CLIENT_REF: str = os.getenv("EXPERIAN_CLIENT_REF", "SBMYSQL")
+    # "projected": decode only the fields T3 reads (raw body kept as bytes); "full": decode everything
+    EXPERIAN_DECODE: str = os.getenv("EXPERIAN_DECODE", "projected")
     EXPERIAN_TIMEOUT_SECONDS: float = float(os.getenv("EXPERIAN_TIMEOUT_SECONDS", "8.0"))
 
+    # Further bureau mocks (same Credit Profile layout) for the multi-bureau credit pull
+    EQUIFAX_BASE_URL: str = os.getenv("EQUIFAX_BASE_URL", "http://localhost:8300")
+    EQUIFAX_TOKEN: str = os.getenv("EQUIFAX_TOKEN", "equifax-sandbox-token")
+    EQUIFAX_TIMEOUT_SECONDS: float = float(os.getenv("EQUIFAX_TIMEOUT_SECONDS", "4.0"))
+    TRANSUNION_BASE_URL: str = os.getenv("TRANSUNION_BASE_URL", "http://localhost:8400")
+    TRANSUNION_TOKEN: str = os.getenv("TRANSUNION_TOKEN", "tu-sandbox-token")
+    TRANSUNION_SUBSCRIBER_CODE: str = os.getenv("TRANSUNION_SUBSCRIBER_CODE", "SBTU01")
+    TRANSUNION_TIMEOUT_SECONDS: float = float(os.getenv("TRANSUNION_TIMEOUT_SECONDS", "4.0"))
+    # Bureaus S3 pulls, in priority order (the first is primary), and how their reports are merged for T3:
+    # "first_good" (first usable report to arrive), "lowest_score" or "tri_merge" (deduped tradelines, middle score)
+    CREDIT_BUREAUS: str = os.getenv("CREDIT_BUREAUS", "experian")
+    CREDIT_MERGE_STRATEGY: str = os.getenv("CREDIT_MERGE_STRATEGY", "tri_merge")
+    CREDIT_FANOUT_WORKERS: int = int(os.getenv("CREDIT_FANOUT_WORKERS", "24"))
+
     # Plaid mock (Income) configuration
     PLAID_BASE_URL: str = os.getenv("PLAID_BASE_URL", "https://nb-plaid-api.onrender.com")
     #PLAID_BASE_URL: str = os.getenv("PLAID_BASE_URL", "http://localhost:8200")
     PLAID_TIMEOUT_SECONDS: float = float(os.getenv("PLAID_TIMEOUT_SECONDS", "8.0"))
+    # Employment check (S5/T5), run alongside the income calls. Once income is evaluated it waits at most
+    # EMPLOYMENT_GRACE_SECONDS more for the employment record; a later one leaves employment unverified
+    EMPLOYMENT_CHECK_ENABLED: bool = os.getenv("EMPLOYMENT_CHECK_ENABLED", "true").lower() in ("1", "true", "yes")
+    EMPLOYMENT_GRACE_SECONDS: float = float(os.getenv("EMPLOYMENT_GRACE_SECONDS", "0"))
+    EMPLOYMENT_WORKERS: int = int(os.getenv("EMPLOYMENT_WORKERS", "16"))
+
+    # Overall budget for one workflow run; no vendor retry starts unless it can finish inside it
+    WORKFLOW_TIMEOUT_SECONDS: float = float(os.getenv("WORKFLOW_TIMEOUT_SECONDS", "10.0"))
+
+    # Joint applications run both applicants' workflows at once on this many threads (two per case)
+    JOINT_WORKERS: int = int(os.getenv("JOINT_WORKERS", "16"))
+
+    # Partial decisions: when > 0 and the caller registers a callback, income may take at most this long
+    # before a provisional CREDIT_PASS (income_pending) is returned; income then completes in the
+    # background and its result is POSTed to the callback
+    INCOME_LATENCY_BUDGET_SECONDS: float = float(os.getenv("INCOME_LATENCY_BUDGET_SECONDS", "0"))
+    # Background stages: one worker per request thread (the server runs at most 40 sync requests at once),
+    # so a case's income does not queue behind other cases' income
+    BACKGROUND_WORKERS: int = int(os.getenv("BACKGROUND_WORKERS", "40"))
+    # Callback deliveries have their own pool, so a backlog of deliveries never delays a stage and vice versa
+    CALLBACK_WORKERS: int = int(os.getenv("CALLBACK_WORKERS", "4"))
+    CALLBACK_TIMEOUT_SECONDS: float = float(os.getenv("CALLBACK_TIMEOUT_SECONDS", "5.0"))
+
+    # Smoothing of the per-gate decline/review rate, latency and cost stats (GET /admin/ordering)
+    ORDERING_EWMA_ALPHA: float = float(os.getenv("ORDERING_EWMA_ALPHA", "0.05"))
+
+    # Vendor price per call (USD); every attempt that reaches the vendor is charged, retries included
+    VENDOR_COST_SEON_AML: float = float(os.getenv("VENDOR_COST_SEON_AML", "0.05"))
+    VENDOR_COST_SEON_FRAUD: float = float(os.getenv("VENDOR_COST_SEON_FRAUD", "0.10"))
+    VENDOR_COST_EXPERIAN: float = float(os.getenv("VENDOR_COST_EXPERIAN", "1.50"))
+    VENDOR_COST_EQUIFAX: float = float(os.getenv("VENDOR_COST_EQUIFAX", "1.50"))
+    VENDOR_COST_TRANSUNION: float = float(os.getenv("VENDOR_COST_TRANSUNION", "1.50"))
+    VENDOR_COST_PLAID: float = float(os.getenv("VENDOR_COST_PLAID", "0.30"))
+    # Per-case spend cap (USD) for optional vendor work (retries, speculative or hedged calls); 0 = no cap
+    CASE_SPEND_BUDGET: float = float(os.getenv("CASE_SPEND_BUDGET", "5.0"))
+
+    # Vendor concurrency per pool (0 = unlimited) and priority lanes: queued calls are served by weighted fair
+    # queueing across PRIORITY_CLASSES ("name:weight[:max_share]", max_share = fraction of a pool's slots)
+    VENDOR_CONCURRENCY_SEON: int = int(os.getenv("VENDOR_CONCURRENCY_SEON", "16"))
+    VENDOR_CONCURRENCY_EXPERIAN: int = int(os.getenv("VENDOR_CONCURRENCY_EXPERIAN", "8"))
+    VENDOR_CONCURRENCY_EQUIFAX: int = int(os.getenv("VENDOR_CONCURRENCY_EQUIFAX", "8"))
+    VENDOR_CONCURRENCY_TRANSUNION: int = int(os.getenv("VENDOR_CONCURRENCY_TRANSUNION", "8"))
+    VENDOR_CONCURRENCY_PLAID: int = int(os.getenv("VENDOR_CONCURRENCY_PLAID", "16"))
+    PRIORITY_CLASSES: str = os.getenv("PRIORITY_CLASSES", "interactive:8,batch:1:0.75")
+    PRIORITY_DEFAULT_CLASS: str = os.getenv("PRIORITY_DEFAULT_CLASS", "interactive")
+
+    # Vendor retries (transient errors only): exponential backoff with full jitter
+    RETRY_MAX_ATTEMPTS: int = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+    RETRY_BASE_DELAY_SECONDS: float = float(os.getenv("RETRY_BASE_DELAY_SECONDS", "0.1"))
+    RETRY_MAX_DELAY_SECONDS: float = float(os.getenv("RETRY_MAX_DELAY_SECONDS", "1.0"))
+    # Global retry budget: each first attempt earns RETRY_BUDGET_RATIO tokens, each retry costs one
+    RETRY_BUDGET_RATIO: float = float(os.getenv("RETRY_BUDGET_RATIO", "0.1"))
+    RETRY_BUDGET_MAX_TOKENS: float = float(os.getenv("RETRY_BUDGET_MAX_TOKENS", "10"))
+
+    # Admin endpoints (/admin/*) and on-demand profiling; both are off while ADMIN_TOKEN is empty
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_INTERVAL_MS: float = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    # Per-rule instrumentation of T1–T4: share of evaluations whose rules are timed and counted (0 disables it)
+    RULE_SAMPLE_RATE: float = float(os.getenv("RULE_SAMPLE_RATE", "0.01"))
+
+    # Shared cache/state backend: "memory" (per process) or "sqlite" (one WAL-mode file shared by all workers)
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_SQLITE_PATH: str = os.getenv("CACHE_SQLITE_PATH", "taktile_cache.sqlite3")
+    # SQLite: a cache hit refreshes the entry's LRU position at most once per interval (other hits are read-only)
+    CACHE_TOUCH_INTERVAL_SECONDS: float = float(os.getenv("CACHE_TOUCH_INTERVAL_SECONDS", "30"))
+
+    # Negative cache of recent hard declines (AML/fraud) and SEON fraud labels, keyed by HMAC'd identifiers.
+    # Mode "exact" uses the cache backend; "bloom" a generational Bloom filter sized for BLOOM_CAPACITY at BLOOM_FP_RATE
+    NEGATIVE_CACHE_ENABLED: bool = os.getenv("NEGATIVE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    NEGATIVE_CACHE_MODE: str = os.getenv("NEGATIVE_CACHE_MODE", "exact")
+    NEGATIVE_CACHE_TTL_SECONDS: float = float(os.getenv("NEGATIVE_CACHE_TTL_SECONDS", "86400"))
+    NEGATIVE_CACHE_MAX_ENTRIES: int = int(os.getenv("NEGATIVE_CACHE_MAX_ENTRIES", "100000"))
+    NEGATIVE_CACHE_IDENTIFIERS: str = os.getenv("NEGATIVE_CACHE_IDENTIFIERS", "ssn,email,phone,device,gov_id")
+    NEGATIVE_CACHE_LABELS: str = os.getenv("NEGATIVE_CACHE_LABELS", "fraud_confirmed")
+    # HMAC key for the identifiers; the negative cache stays off while it is empty (or the old "change-me")
+    NEGATIVE_CACHE_KEY: str = os.getenv("NEGATIVE_CACHE_KEY", "")
+    NEGATIVE_CACHE_BLOOM_CAPACITY: int = int(os.getenv("NEGATIVE_CACHE_BLOOM_CAPACITY", "1000000"))
+    NEGATIVE_CACHE_BLOOM_FP_RATE: float = float(os.getenv("NEGATIVE_CACHE_BLOOM_FP_RATE", "0.000001"))
+
+    # Prefetch of S1/S2 from a partial intake while the applicant is still typing; results live PREFETCH_TTL_SECONDS
+    PREFETCH_ENABLED: bool = os.getenv("PREFETCH_ENABLED", "true").lower() in ("1", "true", "yes")
+    PREFETCH_TTL_SECONDS: float = float(os.getenv("PREFETCH_TTL_SECONDS", "300"))
+    PREFETCH_MAX_ENTRIES: int = int(os.getenv("PREFETCH_MAX_ENTRIES", "10000"))
+    PREFETCH_WORKERS: int = int(os.getenv("PREFETCH_WORKERS", "8"))
+    # Speculative calls per prefetch token (each also has to fit in CASE_SPEND_BUDGET)
+    PREFETCH_MAX_CALLS: int = int(os.getenv("PREFETCH_MAX_CALLS", "4"))
+
+    # Degraded mode: workflows with a replay_callback that hit a SEON/Experian outage are queued in SQLite and
+    # replayed (OUTAGE_REPLAY_RATE per second) once the vendor's health check passes again
+    OUTAGE_QUEUE_ENABLED: bool = os.getenv("OUTAGE_QUEUE_ENABLED", "true").lower() in ("1", "true", "yes")
+    OUTAGE_QUEUE_VENDORS: str = os.getenv("OUTAGE_QUEUE_VENDORS", "seon,experian")
+    OUTAGE_QUEUE_PATH: str = os.getenv("OUTAGE_QUEUE_PATH", "taktile_outage_queue.sqlite3")
+    # Encrypts the queued requests (they carry the intake); degraded mode stays off while it is empty (or "change-me")
+    OUTAGE_QUEUE_KEY: str = os.getenv("OUTAGE_QUEUE_KEY", "")
+    OUTAGE_QUEUE_MAX_AGE_SECONDS: float = float(os.getenv("OUTAGE_QUEUE_MAX_AGE_SECONDS", "86400"))
+    OUTAGE_HEALTH_INTERVAL_SECONDS: float = float(os.getenv("OUTAGE_HEALTH_INTERVAL_SECONDS", "5"))
+    OUTAGE_HEALTH_TIMEOUT_SECONDS: float = float(os.getenv("OUTAGE_HEALTH_TIMEOUT_SECONDS", "2"))
+    OUTAGE_REPLAY_RATE: float = float(os.getenv("OUTAGE_REPLAY_RATE", "2"))
+    OUTAGE_REPLAY_PRIORITY: str = os.getenv("OUTAGE_REPLAY_PRIORITY", "batch")
+
+    # Per-stage results of each case (for /workflows/kyc/resume), kept CASE_STORE_TTL_SECONDS in the cache backend.
+    # A stored stage is reused only while younger than its CASE_STAGE_MAX_AGE ("stage:seconds,...")
+    CASE_STORE_ENABLED: bool = os.getenv("CASE_STORE_ENABLED", "true").lower() in ("1", "true", "yes")
+    CASE_STORE_TTL_SECONDS: float = float(os.getenv("CASE_STORE_TTL_SECONDS", "2592000"))
+    CASE_STORE_MAX_ENTRIES: int = int(os.getenv("CASE_STORE_MAX_ENTRIES", "50000"))
+    # Encrypts the SSN and date of birth of stored intakes; while empty (or "change-me") they are not stored
+    CASE_STORE_KEY: str = os.getenv("CASE_STORE_KEY", "")
+    CASE_STAGE_MAX_AGE: str = os.getenv("CASE_STAGE_MAX_AGE", "aml:86400,fraud:86400,credit:2592000,income:86400")
+    # Raw vendor payloads in the case store are zlib-compressed with a dictionary trained per vendor. Dictionaries are
+    # versioned files in PAYLOAD_DICT_DIR; the first one is trained once PAYLOAD_DICT_SAMPLES payloads have been seen
+    PAYLOAD_COMPRESSION: bool = os.getenv("PAYLOAD_COMPRESSION", "true").lower() in ("1", "true", "yes")
+    PAYLOAD_COMPRESSLEVEL: int = int(os.getenv("PAYLOAD_COMPRESSLEVEL", "6"))
+    PAYLOAD_DICT_DIR: str = os.getenv("PAYLOAD_DICT_DIR", "payload_dicts")
+    PAYLOAD_DICT_SIZE: int = int(os.getenv("PAYLOAD_DICT_SIZE", "32768"))
+    PAYLOAD_DICT_SAMPLES: int = int(os.getenv("PAYLOAD_DICT_SAMPLES", "64"))
+    PAYLOAD_DICT_RESCAN_SECONDS: float = float(os.getenv("PAYLOAD_DICT_RESCAN_SECONDS", "60"))
+
+    # Vendor webhooks: POST /webhooks/seon (HMAC with SEON's SECRET_KEY) and /webhooks/plaid (Plaid-Verification JWT).
+    # Each receiver is off while its secret is empty. Events are queued and applied in batches of WEBHOOK_BATCH_SIZE
+    SEON_WEBHOOK_SECRET: str = os.getenv("SEON_WEBHOOK_SECRET", "")
+    PLAID_WEBHOOK_SECRET: str = os.getenv("PLAID_WEBHOOK_SECRET", "")
+    PLAID_WEBHOOK_MAX_AGE_SECONDS: float = float(os.getenv("PLAID_WEBHOOK_MAX_AGE_SECONDS", "300"))
+    WEBHOOK_QUEUE_MAX: int = int(os.getenv("WEBHOOK_QUEUE_MAX", "10000"))
+    WEBHOOK_BATCH_SIZE: int = int(os.getenv("WEBHOOK_BATCH_SIZE", "100"))
+    WEBHOOK_BATCH_WAIT_SECONDS: float = float(os.getenv("WEBHOOK_BATCH_WAIT_SECONDS", "0.5"))
+    WEBHOOK_DEDUP_TTL_SECONDS: float = float(os.getenv("WEBHOOK_DEDUP_TTL_SECONDS", "86400"))
+    WEBHOOK_PRIORITY: str = os.getenv("WEBHOOK_PRIORITY", "batch")
+
+    # Response compression: gzip bodies of at least GZIP_MINIMUM_SIZE bytes when the client accepts it
+    GZIP_MINIMUM_SIZE: int = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+    GZIP_COMPRESSLEVEL: int = int(os.getenv("GZIP_COMPRESSLEVEL", "6"))
+
+    # Score drift sketches: window length, intervals per window, KLL accuracy parameter (~3k floats per interval)
+    DRIFT_WINDOW_SECONDS: float = float(os.getenv("DRIFT_WINDOW_SECONDS", "3600"))
+    DRIFT_WINDOW_BUCKETS: int = int(os.getenv("DRIFT_WINDOW_BUCKETS", "6"))
+    DRIFT_SKETCH_K: int = int(os.getenv("DRIFT_SKETCH_K", "100"))
 
 
 settings = Settings()
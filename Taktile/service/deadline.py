@@ -0,0 +1,83 @@
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+
+# Absolute deadline (time.monotonic()) of the workflow currently running in this context.
+_deadline: ContextVar[Optional[float]] = ContextVar("taktile_workflow_deadline", default=None)
+
+
+def start(budget_seconds: float) -> None:
+    """
+    Start a workflow deadline `budget_seconds` from now for the current context.
+    """
+    _deadline.set(time.monotonic() + max(0.0, float(budget_seconds)))
+
+
+def clear() -> None:
+    _deadline.set(None)
+
+
+def remaining() -> Optional[float]:
+    """
+    Seconds left before the workflow deadline, or None when no deadline is set.
+    Never negative.
+    """
+    d = _deadline.get()
+    if d is None:
+        return None
+    return max(0.0, d - time.monotonic())
+
+
+def expired() -> bool:
+    r = remaining()
+    return r is not None and r <= 0.0
+
+
+# Relative budget (milliseconds) the caller is still willing to wait. Relative rather than an
+# absolute timestamp so clock skew between hosts does not matter.
+HEADER = "X-Deadline-Ms"
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def budget_from_header(value: Optional[str], default_seconds: float) -> float:
+    """
+    Budget in seconds for a request carrying `X-Deadline-Ms: value`, never more than our own default.
+    Missing or malformed headers fall back to the default.
+    """
+    try:
+        budget = float(value) / 1000.0 if value is not None else default_seconds
+    except (TypeError, ValueError):
+        budget = default_seconds
+    return min(max(0.0, budget), default_seconds)
+
+
+def timeout(default_seconds: float) -> float:
+    """
+    Per-call timeout: the configured default, shrunk to what is left of the workflow budget.
+    """
+    r = remaining()
+    return default_seconds if r is None else min(default_seconds, r)
+
+
+def check(where: str) -> None:
+    if expired():
+        raise DeadlineExceeded(f"deadline exceeded before {where}")
+
+
+def header_value() -> Optional[str]:
+    r = remaining()
+    return None if r is None else str(int(r * 1000))
+
+
+def propagate(headers: Dict[str, str]) -> Dict[str, str]:
+    """
+    Add the remaining budget to outgoing vendor headers (no-op without a deadline).
+    """
+    v = header_value()
+    if v is not None:
+        headers[HEADER] = v
+    return headers
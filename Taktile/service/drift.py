@@ -0,0 +1,136 @@
+"""
+Score drift detection from streaming quantile sketches (per worker process).
+
+The workflow feeds numeric signals to `observe(signal, value)`:
+  seon.fraud_score, experian.risk_score, t3.contribution_score, t4.net_monthly
+Each signal keeps a SlidingSketch: KLL sketches for DRIFT_WINDOW_SECONDS split into DRIFT_WINDOW_BUCKETS
+intervals. It covers the current window and the one before it, so memory per signal is bounded by
+2 x buckets x ~3·DRIFT_SKETCH_K floats whatever the traffic.
+
+GET  /admin/drift                       — tracked signals and their current window size
+GET  /admin/drift/{signal}?reference=previous|pinned
+                                        — current window vs reference: quantiles, KS distance, PSI
+POST /admin/drift/reference             — pin every signal's current window as the reference
+"""
+import math
+import threading
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from Taktile.service import memory
+from Taktile.service.config import settings
+from Taktile.service.security import require_admin
+from Taktile.service.sketch import KLLSketch, SlidingSketch, cdf_at
+
+
+QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+_signals: Dict[str, SlidingSketch] = {}
+_pinned: Dict[str, KLLSketch] = {}
+_lock = threading.Lock()
+
+memory.register_store("drift.signals", lambda: _signals)
+memory.register_store("drift.pinned", lambda: _pinned)
+
+
+def observe(signal: str, value: Any) -> None:
+    if value is None:
+        return
+    try:
+        v = float(value)
+    except (TypeError, ValueError):
+        return
+    if math.isnan(v):
+        return
+    sketch = _signals.get(signal)
+    if sketch is None:
+        with _lock:
+            sketch = _signals.setdefault(
+                signal, SlidingSketch(settings.DRIFT_WINDOW_SECONDS, settings.DRIFT_WINDOW_BUCKETS, settings.DRIFT_SKETCH_K)
+            )
+    sketch.update(v)
+
+
+def _describe(sketch: KLLSketch) -> Dict[str, Any]:
+    return {"n": sketch.n, "quantiles": dict(zip((f"p{int(q * 100):02d}" for q in QUANTILES), sketch.quantiles(QUANTILES)))}
+
+
+def _ks(current: KLLSketch, reference: KLLSketch) -> Optional[float]:
+    a, b = current.sorted_view(), reference.sorted_view()
+    if not a[0] or not b[0]:
+        return None
+    return round(max(abs(cdf_at(a, x) - cdf_at(b, x)) for x in a[0] + b[0]), 4)
+
+
+def _psi(current: KLLSketch, reference: KLLSketch, bins: int = 10) -> Optional[float]:
+    # Population stability index over the reference's deciles
+    a, b = current.sorted_view(), reference.sorted_view()
+    if not a[0] or not b[0]:
+        return None
+    edges = sorted(set(reference.quantiles([i / bins for i in range(1, bins)])))
+    eps = 1e-4
+    psi = 0.0
+    prev_a = prev_b = 0.0
+    for x in edges + [math.inf]:
+        ca = 1.0 if x == math.inf else cdf_at(a, x)
+        cb = 1.0 if x == math.inf else cdf_at(b, x)
+        pa, pb = max(ca - prev_a, eps), max(cb - prev_b, eps)
+        psi += (pa - pb) * math.log(pa / pb)
+        prev_a, prev_b = ca, cb
+    return round(psi, 4)
+
+
+def compare(signal: str, reference: str = "previous") -> Dict[str, Any]:
+    sliding = _signals[signal]
+    current = sliding.window()
+    if reference == "pinned":
+        ref = _pinned.get(signal)
+        if ref is None:
+            raise KeyError(signal)
+    else:
+        ref = sliding.window(previous=True)
+    return {
+        "signal": signal,
+        "window_seconds": sliding.span,
+        "reference": reference,
+        "current": _describe(current),
+        "baseline": _describe(ref),
+        "ks": _ks(current, ref),
+        "psi": _psi(current, ref),
+    }
+
+
+def pin_reference() -> List[str]:
+    pinned = {name: sliding.window() for name, sliding in list(_signals.items())}
+    _pinned.update(pinned)
+    return sorted(pinned)
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/admin/drift")
+def drift_signals() -> Dict[str, Any]:
+    return {
+        "window_seconds": settings.DRIFT_WINDOW_SECONDS,
+        "signals": {
+            name: {"n": sliding.window().n, "sketch_items": sliding.items(), "pinned": name in _pinned}
+            for name, sliding in sorted(_signals.items())
+        },
+    }
+
+
+@router.post("/admin/drift/reference")
+def drift_pin_reference() -> Dict[str, Any]:
+    return {"pinned": pin_reference()}
+
+
+@router.get("/admin/drift/{signal}")
+def drift_compare(signal: str, reference: str = Query(default="previous", pattern="^(previous|pinned)$")) -> Dict[str, Any]:
+    if signal not in _signals:
+        raise HTTPException(status_code=404, detail="Unknown signal")
+    try:
+        return compare(signal, reference)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="No pinned reference for this signal; POST /admin/drift/reference first")
@@ -1,27 +1,348 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
-from typing import Any, Dict
+import contextvars
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Dict, List, Literal, Optional
 
+from Taktile.clients.experian import decoded, full_body, render_json
+from Taktile.service import analytics, background, cases, deadline, drift, memory, negative_cache, ordering, outage, payloads, prefetch, profiling, rules, scheduler, spend, webhooks
+from Taktile.service.config import settings
 from Taktile.stages.S1 import run_aml
 from Taktile.stages.S2 import run_fraud
 from Taktile.stages.S3 import get_credit_report
 from Taktile.stages.S4 import build_income_options_from_intake, get_income_bundle
+from Taktile.stages.S5 import build_employment_options_from_intake, start_employment
 from Taktile.stages.T1 import evaluate_aml
 from Taktile.stages.T2 import evaluate_fraud
 from Taktile.stages.T3 import evaluate_credit_policy
 from Taktile.stages.T4 import evaluate_income
+from Taktile.stages.T5 import apply_employment, evaluate_employment
+from Taktile.stages.joint import combine_joint
 
 
-app = FastAPI(title="Taktile Orchestrator (S*/T*)", version="1.0.0")
+class WorkflowResponse(JSONResponse):
+    """
+    JSON response in which a full credit report kept as RawJSON (`credit_raw`) is written out as received.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
+
+
+app = FastAPI(title="Taktile Orchestrator (S*/T*)", version="1.0.0", default_response_class=WorkflowResponse)
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE, compresslevel=settings.GZIP_COMPRESSLEVEL)
+profiling.install(app)
+app.include_router(profiling.router)
+app.include_router(memory.router)
+app.include_router(analytics.router)
+app.include_router(drift.router)
+app.include_router(ordering.router)
+app.include_router(spend.router)
+app.include_router(scheduler.router)
+app.include_router(negative_cache.router)
+app.include_router(prefetch.router)
+app.include_router(outage.router)
+app.include_router(cases.router)
+app.include_router(rules.router)
+app.include_router(webhooks.router)
+app.include_router(payloads.router)
+
+
+class CallbackIn(BaseModel):
+    url: str
+    token: str = ""  # echoed in X-Callback-Token so the receiver can authenticate the delivery
 
 
 class FullKycIn(BaseModel):
     case_id: str
     intake: Dict[str, Any] = Field(default_factory=dict)
+    # Where to deliver the income result if it overruns INCOME_LATENCY_BUDGET_SECONDS (partial decisions)
+    callback: Optional[CallbackIn] = None
+    # Vendor spend cap for optional work (retries, speculative calls) on this case; default CASE_SPEND_BUDGET
+    spend_budget: Optional[float] = None
+    # Where to deliver the result if the workflow is queued during a SEON/Experian outage (degraded mode)
+    replay_callback: Optional[CallbackIn] = None
+    # Token from /workflows/kyc/prefetch: S1/S2 results already fetched for this intake are reused
+    prefetch_token: Optional[str] = None
+
+
+class PrefetchIn(BaseModel):
+    # Partial intake: whatever the applicant has entered so far
+    intake: Dict[str, Any] = Field(default_factory=dict)
+    # Token of an earlier prefetch for the same application; only stages whose payload changed are re-run
+    token: Optional[str] = None
+
+
+Stage = Literal["aml", "fraud", "credit", "income"]
+STAGES = ("aml", "fraud", "credit", "income")
+
+
+class PriorIn(BaseModel):
+    # Results of earlier runs, used when the stage that produces them is not in the subset
+    provisional_tier: Optional[int] = None  # T2 tier from the last fraud run; caps the credit final tier (T3)
+    final_tier: Optional[int] = None  # current credit final tier; caps the income final tier (T4)
+
+
+class StageIn(BaseModel):
+    case_id: str
+    intake: Dict[str, Any] = Field(default_factory=dict)
+    prior: PriorIn = Field(default_factory=PriorIn)
+    spend_budget: Optional[float] = None
+
+
+class StagesIn(StageIn):
+    stages: List[Stage] = Field(min_length=1)
+    # Stop at the first stage that does not pass, like the full flow; False runs every requested stage
+    stop_on_fail: bool = True
+
+
+class ResumeIn(BaseModel):
+    case_id: str
+    from_stage: Stage
+    # Updated intake; default: the intake of the case's last run
+    intake: Optional[Dict[str, Any]] = None
+    spend_budget: Optional[float] = None
+
+
+class JointKycIn(BaseModel):
+    case_id: str
+    primary: Dict[str, Any] = Field(default_factory=dict)  # intake of each applicant
+    co_applicant: Dict[str, Any] = Field(default_factory=dict)
+    # Spend cap for optional work, per applicant; default CASE_SPEND_BUDGET
+    spend_budget: Optional[float] = None
+
+
+JOINT_ROLES = ("primary", "co_applicant")
+# Both applicants of a joint case run at once; vendor clients (and their connection pools) are shared
+_joint_executor = ThreadPoolExecutor(max_workers=settings.JOINT_WORKERS, thread_name_prefix="taktile-joint")
+
+
+def _stage_error(stage: str, e: Exception) -> HTTPException:
+    # Past the caller's deadline nobody is waiting for the answer: report it as a gateway timeout
+    if isinstance(e, deadline.DeadlineExceeded):
+        return HTTPException(status_code=504, detail=f"{stage} orchestration abandoned: {e}")
+    return HTTPException(status_code=502, detail=f"{stage} orchestration error: {e}")
+
+
+def _outage(input: "FullKycIn", stage: str, e: Optional[Exception], stage_order: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Degraded mode for a stage whose vendor is down (`e` None) or just failed with `e`: the queued response, or
+    None when the workflow is not queued (no replay callback, another vendor, not an outage). During a replay
+    the outage is re-raised for the queue instead.
+    """
+    vendor = outage.stage_vendor(stage)
+    if vendor is None or not outage.armed() or (e is not None and not outage.unreachable(e)):
+        return None
+    if e is not None:
+        outage.mark_down(vendor)
+    if outage.replaying():
+        raise outage.VendorUnavailable(vendor, str(e or "marked down"))
+    queue_id = outage.enqueue(input.case_id, vendor, stage, input.model_dump())
+    return outage.queued_response(input.case_id, vendor, stage, queue_id, stage_order)
+
+
+def _run_aml(case_id: str, intake: Dict[str, Any], prefetched: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    AML stage: S1 (request, or the `prefetched` S1 response) -> T1 (evaluate).
+    """
+    aml_raw = prefetched["raw"] if prefetched is not None else run_aml(case_id=case_id, intake=intake).get("aml_raw")
+    aml_decision = evaluate_aml(aml_raw)
+    analytics.record_aml(aml_decision)
+    return {"aml_decision": aml_decision, "aml_raw": aml_raw}
+
+
+def _run_fraud(case_id: str, intake: Dict[str, Any], prefetched: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Fraud stage: S2 (request, or the `prefetched` S2 response) -> T2 (evaluate).
+    """
+    fraud_raw = prefetched["raw"] if prefetched is not None else run_fraud(case_id=case_id, intake=intake).get("fraud_raw")
+    fraud_decision = evaluate_fraud(fraud_raw)
+    analytics.record_fraud(fraud_decision)
+    drift.observe("seon.fraud_score", (fraud_decision.get("details") or {}).get("fraud_score"))
+    return {"fraud_decision": fraud_decision, "fraud_raw": fraud_raw}
+
+
+def _run_credit(intake: Dict[str, Any], provisional_tier: Optional[int]) -> Dict[str, Any]:
+    """
+    Credit stage: S3 (request) -> T3 (evaluate).
+    """
+    envelope = get_credit_report(intake)
+    if outage.armed() and outage.envelope_unreachable(envelope):
+        # Unreachable bureau: queue the workflow rather than decide on an empty report
+        raise outage.VendorUnavailable(outage.STAGE_VENDORS["credit"], str(envelope.get("status")))
+    # T3 reads the (possibly projected) data; the stored and returned report is the full body, passed through undecoded
+    credit_eval = evaluate_credit_policy(envelope.get("data") or {}, provisional_tier, None)
+    analytics.record_credit(credit_eval)
+    scorecard = credit_eval.get("scorecard") or {}
+    drift.observe("experian.risk_score", scorecard.get("baseScore"))
+    drift.observe("t3.contribution_score", scorecard.get("contributionScore"))
+
+    credit_status_map = {
+        "CREDIT_DECLINE": "CREDIT_DECLINE",
+        "CREDIT_REVIEW": "CREDIT_REVIEW",
+        "CREDIT_PASS": "CREDIT_PASS",
+    }
+    credit_status = credit_status_map.get(credit_eval.get("decision") or "", "CREDIT_REVIEW")
+    credit_decision = {
+        "decision": credit_status,
+        "bureau_tier": credit_eval.get("bureau_tier"),
+        "final_tier": credit_eval.get("final_tier"),
+        "ko_reasons": credit_eval.get("ko_reasons", []),
+        "review_reasons": credit_eval.get("review_reasons", []),
+        "scorecard": credit_eval.get("scorecard", {}),
+    }
+    if "bureaus" in envelope:
+        credit_decision["bureaus"] = envelope["bureaus"]
+        credit_decision["merge_strategy"] = envelope["strategy"]
+    return {"credit_decision": credit_decision, "credit_raw": full_body(envelope)}
+
+
+def _run_income(case_id: str, intake: Dict[str, Any], credit_final_tier: Optional[int]) -> Dict[str, Any]:
+    """
+    Income stage: S4 (request) -> T4 (evaluate), with the S5 -> T5 employment check alongside.
+    """
+    options = build_income_options_from_intake(intake)
+
+    # Use client_user_id if present; else derive a stable key from case_id
+    client_user_id = str(intake.get("client_user_id") or case_id)
+
+    # S5 runs next to S4 and is only collected once income is evaluated, so it adds no wall time
+    employment = start_employment(client_user_id, build_employment_options_from_intake(intake)) if settings.EMPLOYMENT_CHECK_ENABLED else None
+    bundle = get_income_bundle(client_user_id, options=options)
+
+    income_eval = evaluate_income(
+        payroll_resp=bundle.get("payroll_resp"),
+        bank_resp=bundle.get("bank_resp"),
+        risk_resp=bundle.get("risk_resp"),
+        coverage_months=int(options.get("coverage_months") or 12),
+        credit_final_tier=credit_final_tier,
+    )
+    if employment is not None:
+        try:
+            employment_resp = employment.result(timeout=settings.EMPLOYMENT_GRACE_SECONDS)
+        except Exception:
+            employment_resp = None  # still running (or failed): unverified
+        employment_eval = evaluate_employment(employment_resp, bundle.get("payroll_resp"))
+        if employment_resp is None:
+            employment_eval["late"] = not employment.done()
+        analytics.record_employment(employment_eval)
+        income_eval = apply_employment(income_eval, employment_eval)
+    analytics.record_income(income_eval)
+    drift.observe("t4.net_monthly", (income_eval.get("metrics") or {}).get("net_monthly"))
+    return income_eval
+
+
+def _income_callback_payload(case_id: str, future: Future) -> Dict[str, Any]:
+    try:
+        income_eval = future.result()
+    except Exception as e:
+        return {"case_id": case_id, "status": "INCOME_REVIEW", "income_decision": None, "final_tier": None, "error": f"Income orchestration error: {e}"}
+    return {
+        "case_id": case_id,
+        "status": income_eval.get("decision") or "INCOME_REVIEW",
+        "income_decision": income_eval,
+        "final_tier": income_eval.get("final_tier"),
+    }
+
+
+def _finish_income(case_id: str, intake: Dict[str, Any], future: Future, started: float, ledger: spend.Ledger, spent: float) -> Dict[str, Any]:
+    """
+    Callback payload of an income stage finished in the background, which is also stored on the case and
+    counted for ordering, like an income stage that finished in time.
+    """
+    payload = _income_callback_payload(case_id, future)
+    if payload.get("income_decision") is not None:
+        result = {"income_decision": payload["income_decision"]}
+        cases.save(case_id, "income", intake, result)
+        ordering.record("income", _result("income", result), time.perf_counter() - started, ledger.total - spent)
+    return payload
+
+
+def _result(stage: str, result: Dict[str, Any]) -> str:
+    if stage == "fraud":
+        decision = result["fraud_decision"].get("decision")
+    elif stage == "credit":
+        decision = result["credit_decision"]["decision"]
+    else:
+        decision = result["income_decision"].get("decision")
+    if decision and decision.endswith("_PASS"):
+        return ordering.PASS
+    return ordering.DECLINE if decision and decision.endswith("_DECLINE") else ordering.REVIEW
+
+
+def _reconcile_tiers(results: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Recompute final tiers when a gate ran before the one whose tier it caps (credit before fraud, income
+    before credit), so they match the fixed order: credit = min(provisional, bureau), income = min(credit, income).
+    """
+    provisional_tier = (results.get("fraud") or {}).get("fraud_decision", {}).get("provisional_tier")
+    credit_final = None
+    credit = results.get("credit")
+    if credit is not None:
+        decision = credit["credit_decision"]
+        if decision["decision"] == "CREDIT_PASS":
+            decision["final_tier"] = credit_final = min(int(provisional_tier or 0), int(decision["bureau_tier"]))
+    income = results.get("income")
+    if income is not None and income["income_decision"].get("decision") == "INCOME_PASS":
+        income_tier = income["income_decision"].get("income_tier")
+        income["income_decision"]["final_tier"] = min(int(credit_final), int(income_tier)) if credit_final is not None else None
+
+
+def _kyc_response(
+    case_id: str,
+    aml_decision: Dict[str, Any],
+    aml_raw: Any,
+    results: Dict[str, Dict[str, Any]],
+    status_stage: Optional[str],
+    stage_order: List[str],
+) -> Dict[str, Any]:
+    """
+    Response for the gate whose decision is the status (`status_stage`, None: all passed). The gates after
+    it did not run; their fields are left out.
+    """
+    fraud = results.get("fraud") or {}
+    credit = results.get("credit")
+    income = results.get("income")
+    fraud_decision = fraud.get("fraud_decision")
+    credit_decision = credit["credit_decision"] if credit else None
+    income_decision = income["income_decision"] if income else None
+
+    out: Dict[str, Any] = {"case_id": case_id}
+    if status_stage == "fraud":
+        out["status"] = fraud_decision.get("decision") or "FRAUD_REVIEW"  # FRAUD_DECLINE | FRAUD_REVIEW
+    elif status_stage == "credit":
+        out["status"] = credit_decision["decision"]  # CREDIT_DECLINE | CREDIT_REVIEW
+    else:
+        out["status"] = income_decision.get("decision") or "INCOME_REVIEW"  # INCOME_DECLINE | INCOME_REVIEW | INCOME_PASS
+    out["aml_decision"] = aml_decision
+    out["fraud_decision"] = fraud_decision
+    if status_stage != "fraud":
+        out["credit_decision"] = credit_decision
+    if status_stage not in ("fraud", "credit"):
+        out["income_decision"] = income_decision
+    out["provisional_tier"] = (fraud_decision or {}).get("provisional_tier")
+    if status_stage != "fraud":
+        out["bureau_tier"] = (credit_decision or {}).get("bureau_tier")
+        final = income_decision if status_stage not in ("fraud", "credit") else credit_decision
+        out["final_tier"] = (final or {}).get("final_tier")
+    out["aml_raw"] = aml_raw
+    out["fraud_raw"] = fraud.get("fraud_raw")
+    if status_stage != "fraud":
+        out["credit_raw"] = credit["credit_raw"] if credit else None
+    out["stage_order"] = stage_order
+    return out
 
 
 @app.post("/workflows/kyc/full")
-def kyc_full(input: FullKycIn):
+def kyc_full(
+    input: FullKycIn,
+    x_deadline_ms: Optional[str] = Header(default=None, alias=deadline.HEADER),
+    x_priority_class: Optional[str] = Header(default=None, alias=scheduler.HEADER),
+):
     """
     Orchestrates full KYC flow:
       - AML: S1 (request) -> T1 (evaluate)
@@ -30,16 +351,78 @@ def kyc_full(input: FullKycIn):
       - Credit: S3 (request) -> T3 (evaluate)
       - Income: S4 (request) -> T4 (evaluate)
     Returns combined summary + raw vendor payloads for transparency.
+
+    Fraud, credit and income run in that fixed order, and the first gate that does not pass (REVIEW or
+    DECLINE) ends the case; the gates run are returned as `stage_order`. Reordering them could not save
+    vendor calls without changing decisions (see ordering).
+
+    The caller's X-Deadline-Ms (capped at WORKFLOW_TIMEOUT_SECONDS) bounds the whole run: every vendor
+    call gets only the remaining budget as its timeout, and once it is spent the workflow is abandoned
+    with a 504 instead of starting the next stage.
+
+    Vendor calls are charged to a per-case ledger returned as `spend` ({total, budget, calls, by_vendor,
+    denied}). Once the case has spent its budget (`spend_budget`, default CASE_SPEND_BUDGET), optional
+    work such as retries is refused; required calls still go out.
+
+    Identifiers with a recent AML/fraud decline or a negative SEON label are answered from the negative cache
+    before S1, with no vendor calls (see negative_cache).
+
+    With `prefetch_token` from /workflows/kyc/prefetch, S1/S2 responses prefetched for this exact intake are
+    used instead of calling SEON again (waiting for a prefetch still in flight); `prefetched` lists them.
+
+    X-Priority-Class (interactive | batch, see PRIORITY_CLASSES) picks the lane this case's vendor calls
+    queue in when a vendor pool is saturated.
+
+    Degraded mode: with a `replay_callback`, a SEON or Experian outage (or a vendor already marked down) queues
+    the workflow durably instead of failing with 502. The response is `status: PENDING_VENDOR` with `queued`,
+    and the result of the replay, once the vendor is healthy again, is POSTed to the callback (see outage).
+
+    Partial decisions: with INCOME_LATENCY_BUDGET_SECONDS > 0 and a `callback` in the request, the income
+    stage (reached once fraud and credit passed) runs in the background. If it has not finished within
+    the budget (counted from when a background worker starts it), the response is the provisional
+    CREDIT_PASS with `income_pending: true`. The income result is POSTed to `callback.url` when it
+    completes: {case_id, status, income_decision, final_tier}.
     """
+    deadline.start(deadline.budget_from_header(x_deadline_ms, settings.WORKFLOW_TIMEOUT_SECONDS))
+    ledger = spend.start(input.spend_budget)
+    priority = scheduler.set_class(x_priority_class)
+    outage.arm(input.replay_callback is not None)
+    if input.replay_callback is not None:
+        # Webhook re-evaluations of the case are delivered there too (see webhooks)
+        cases.set_callback(input.case_id, input.replay_callback.model_dump())
+
+    # Repeat bad actors: a recent hard decline or fraud label for any identifier answers without vendor calls
+    hit = negative_cache.check(input.intake)
+    if hit is not None:
+        out = negative_cache.cached_response(input.case_id, hit)
+        analytics.record("CACHE", out["status"], ko=[f"match_{hit.get('matched')}"])
+        out["stage_order"] = []
+        out["spend"] = ledger.summary()
+        return out
+
+    prefetched: List[str] = []
+    queued = _outage(input, "aml", None, []) if outage.is_down(outage.stage_vendor("aml")) else None
+    if queued is not None:
+        queued["spend"] = ledger.summary()
+        return queued
     try:
         # AML stage
-        aml_out = run_aml(case_id=input.case_id, intake=input.intake)
-        aml_raw = aml_out.get("aml_raw")
-        aml_decision = evaluate_aml(aml_raw)
+        pre = prefetch.take(input.prefetch_token, "aml", input.intake)
+        if pre is not None:
+            prefetch.absorb(ledger, pre)
+            prefetched.append("aml")
+        aml = _run_aml(input.case_id, input.intake, pre)
+        aml_decision, aml_raw = aml["aml_decision"], aml["aml_raw"]
+        cases.save(input.case_id, "aml", input.intake, aml)
     except Exception as e:
-        raise HTTPException(status_code=502, detail=f"AML orchestration error: {e}")
+        queued = _outage(input, "aml", e, ["aml"])
+        if queued is None:
+            raise _stage_error("AML", e)
+        queued["spend"] = ledger.summary()
+        return queued
 
     if aml_decision.get("decision") == "DECLINE":
+        negative_cache.record_decline(input.case_id, input.intake, "AML_DECLINE", aml_decision.get("reasons") or [])
         return {
             "case_id": input.case_id,
             "status": "AML_DECLINE",
@@ -48,104 +431,348 @@ def kyc_full(input: FullKycIn):
             "provisional_tier": None,
             "aml_raw": aml_raw,
             "fraud_raw": None,
+            "stage_order": ["aml"],
+            "prefetched": prefetched,
+            "spend": ledger.summary(),
         }
 
-    # Fraud stage (only when AML passed)
-    try:
-        fraud_out = run_fraud(case_id=input.case_id, intake=input.intake)
-        fraud_raw = fraud_out.get("fraud_raw")
-        fraud_decision = evaluate_fraud(fraud_raw)
-    except Exception as e:
-        # If fraud stage fails technically, surface as Taktile error (backend may map to review/decline)
-        raise HTTPException(status_code=502, detail=f"Fraud orchestration error: {e}")
+    # Fraud / credit / income gates (only when AML passed)
+    stage_order = ["aml"]
+    results: Dict[str, Dict[str, Any]] = {}
+    outcomes: Dict[str, str] = {}  # gate -> pass | review | decline
+    stage = ordering.next_stage(outcomes)
+    while stage is not None:
+        queued = _outage(input, stage, None, stage_order) if outage.is_down(outage.stage_vendor(stage)) else None
+        if queued is not None:
+            queued["spend"] = ledger.summary()
+            return queued
+        stage_order.append(stage)
+        try:
+            deadline.check(f"{stage} stage")
+            started, spent = time.perf_counter(), ledger.total
+            if stage == "fraud":
+                pre = prefetch.take(input.prefetch_token, "fraud", input.intake)
+                if pre is not None:
+                    # The gate's latency and cost in the gate stats are those of the prefetched call
+                    started -= pre["seconds"]
+                    prefetch.absorb(ledger, pre)
+                    prefetched.append("fraud")
+                result = _run_fraud(input.case_id, input.intake, pre)
+            elif stage == "credit":
+                provisional_tier = (results.get("fraud") or {}).get("fraud_decision", {}).get("provisional_tier")
+                result = _run_credit(input.intake, provisional_tier)
+            else:
+                _reconcile_tiers(results)
+                credit_final = (results.get("credit") or {}).get("credit_decision", {}).get("final_tier")
+                budget = settings.INCOME_LATENCY_BUDGET_SECONDS
+                if budget > 0 and input.callback is not None:
+                    future = background.submit(spend.bound(ledger, scheduler.bound(priority, _run_income)), input.case_id, input.intake, credit_final)
+                    try:
+                        result = {"income_decision": background.result(future, budget)}
+                    except FutureTimeout:
+                        background.on_done(
+                            future,
+                            lambda f: _finish_income(input.case_id, input.intake, f, started, ledger, spent),
+                            input.callback.url,
+                            input.callback.token,
+                        )
+                        out = _kyc_response(input.case_id, aml_decision, aml_raw, results, "credit", stage_order)
+                        out["income_pending"] = True
+                        out["income_decision"] = None  # final_tier is provisional until income completes
+                        out["prefetched"] = prefetched
+                        out["spend"] = ledger.summary()  # so far; income keeps charging the ledger in the background
+                        return out
+                else:
+                    result = {"income_decision": _run_income(input.case_id, input.intake, credit_final)}
+        except Exception as e:
+            queued = _outage(input, stage, e, stage_order)
+            if queued is None:
+                # If a stage fails technically, surface as Taktile error (backend may map to review/decline)
+                raise _stage_error(stage.capitalize(), e)
+            queued["spend"] = ledger.summary()
+            return queued
 
-    fraud_status = fraud_decision.get("decision") or "FRAUD_REVIEW"
-    provisional_tier = fraud_decision.get("provisional_tier")
+        results[stage] = result
+        cases.save(input.case_id, stage, input.intake, result)
+        if stage == "fraud":
+            # SEON labels arrive per transaction; keep the link to this applicant's identifiers
+            negative_cache.remember_transaction(((result["fraud_raw"] or {}).get("data") or {}).get("id"), input.case_id, input.intake)
+        outcomes[stage] = _result(stage, result)
+        ordering.record(stage, outcomes[stage], time.perf_counter() - started, ledger.total - spent)
+        stage = ordering.next_stage(outcomes)
 
-    # If Fraud did not PASS, return here
-    if fraud_status != "FRAUD_PASS":
-        return {
-            "case_id": input.case_id,
-            "status": fraud_status,  # FRAUD_DECLINE | FRAUD_REVIEW
-            "aml_decision": aml_decision,
-            "fraud_decision": fraud_decision,
-            "provisional_tier": provisional_tier,
-            "aml_raw": aml_raw,
-            "fraud_raw": fraud_raw,
-        }
+    _reconcile_tiers(results)
+    if outcomes.get("fraud") == ordering.DECLINE:
+        negative_cache.record_decline(input.case_id, input.intake, "FRAUD_DECLINE", results["fraud"]["fraud_decision"].get("reasons") or [])
+    out = _kyc_response(input.case_id, aml_decision, aml_raw, results, ordering.outcome(outcomes), stage_order)
+    out["prefetched"] = prefetched
+    out["spend"] = ledger.summary()
+    return out
 
-    # Credit stage (S3 -> T3), only when Fraud PASS
-    try:
-        envelope = get_credit_report(input.intake)
-        credit_raw = envelope.get("data") or {}
-        credit_eval = evaluate_credit_policy(credit_raw, provisional_tier, None)
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Credit orchestration error: {e}")
 
-    credit_status_map = {
-        "CREDIT_DECLINE": "CREDIT_DECLINE",
-        "CREDIT_REVIEW": "CREDIT_REVIEW",
-        "CREDIT_PASS": "CREDIT_PASS",
-    }
-    credit_status = credit_status_map.get(credit_eval.get("decision") or "", "CREDIT_REVIEW")
+def _delivered(out: Dict[str, Any]) -> Dict[str, Any]:
+    # A callback body is re-encoded by the delivery (and sealed by the outage queue): decode the raw report here
+    return jsonable_encoder({k: decoded(v) for k, v in out.items()})
 
-    credit_decision = {
-        "decision": credit_status,
-        "bureau_tier": credit_eval.get("bureau_tier"),
-        "final_tier": credit_eval.get("final_tier"),
-        "ko_reasons": credit_eval.get("ko_reasons", []),
-        "review_reasons": credit_eval.get("review_reasons", []),
-        "scorecard": credit_eval.get("scorecard", {}),
-    }
 
-    # If credit did not PASS, return here
-    if credit_status != "CREDIT_PASS":
-        return {
+def _replay(request: Dict[str, Any]) -> Dict[str, Any]:
+    return _delivered(kyc_full(FullKycIn(**request), None, settings.OUTAGE_REPLAY_PRIORITY))
+
+
+outage.set_replayer(_replay)
+
+
+@app.post("/workflows/kyc/prefetch")
+def kyc_prefetch(input: PrefetchIn, x_priority_class: Optional[str] = Header(default=None, alias=scheduler.HEADER)):
+    """
+    Starts S1 (AML) and S2 (fraud) in the background for a partial intake, as soon as the fields each one
+    needs are present, and returns at once: {token, stages: {aml, fraud: started | unchanged | ineligible |
+    skipped}, expires_in}. Pass the token as `prefetch_token` to /workflows/kyc/full (see prefetch).
+    """
+    if not settings.PREFETCH_ENABLED:
+        raise HTTPException(status_code=404, detail="Prefetch is disabled")
+    scheduler.set_class(x_priority_class)
+    return prefetch.start(input.intake, input.token)
+
+
+@app.post("/workflows/kyc/stages")
+def kyc_stages(
+    input: StagesIn,
+    x_deadline_ms: Optional[str] = Header(default=None, alias=deadline.HEADER),
+    x_priority_class: Optional[str] = Header(default=None, alias=scheduler.HEADER),
+):
+    """
+    Runs a subset of the KYC stages (aml, fraud, credit, income), in that order, for re-screens, credit-line
+    increases and income refreshes. Inputs normally produced by a skipped stage come from `prior`: credit
+    uses `prior.provisional_tier` without fraud, income uses `prior.final_tier` without credit.
+
+    With `stop_on_fail` (default) the run stops at the first stage that does not pass (AML DECLINE,
+    *_DECLINE, *_REVIEW). `status` is that stage's decision, or the last stage's when all passed:
+    AML_DECLINE | AML_PROCEED | FRAUD_* | CREDIT_* | INCOME_*. Only the stages run appear in the response,
+    with their raw payloads, `stages_run`, the tiers and `spend`. Deadline, priority class and spend
+    budget apply as in /workflows/kyc/full; the negative cache is not consulted.
+    """
+    deadline.start(deadline.budget_from_header(x_deadline_ms, settings.WORKFLOW_TIMEOUT_SECONDS))
+    ledger = spend.start(input.spend_budget)
+    scheduler.set_class(x_priority_class)
+
+    provisional_tier = input.prior.provisional_tier
+    credit_final = input.prior.final_tier
+    out: Dict[str, Any] = {"case_id": input.case_id, "status": None, "stages_run": []}
+    for stage in (s for s in STAGES if s in input.stages):
+        try:
+            deadline.check(f"{stage} stage")
+            if stage == "aml":
+                result = _run_aml(input.case_id, input.intake)
+                decision = result["aml_decision"].get("decision")
+                status = "AML_DECLINE" if decision == "DECLINE" else "AML_PROCEED"
+                passed = decision != "DECLINE"
+                if not passed:
+                    negative_cache.record_decline(input.case_id, input.intake, "AML_DECLINE", result["aml_decision"].get("reasons") or [])
+            elif stage == "fraud":
+                result = _run_fraud(input.case_id, input.intake)
+                status = result["fraud_decision"].get("decision") or "FRAUD_REVIEW"
+                passed = status == "FRAUD_PASS"
+                provisional_tier = result["fraud_decision"].get("provisional_tier")
+                if status == "FRAUD_DECLINE":
+                    negative_cache.record_decline(input.case_id, input.intake, status, result["fraud_decision"].get("reasons") or [])
+            elif stage == "credit":
+                result = _run_credit(input.intake, provisional_tier)
+                status = result["credit_decision"]["decision"]
+                passed = status == "CREDIT_PASS"
+                credit_final = result["credit_decision"].get("final_tier")
+                out["bureau_tier"] = result["credit_decision"].get("bureau_tier")
+            else:
+                result = {"income_decision": _run_income(input.case_id, input.intake, credit_final)}
+                status = result["income_decision"].get("decision") or "INCOME_REVIEW"
+                passed = status == "INCOME_PASS"
+        except Exception as e:
+            raise _stage_error("AML" if stage == "aml" else stage.capitalize(), e)
+
+        cases.save(input.case_id, stage, input.intake, result)
+        out["stages_run"].append(stage)
+        out["status"] = status
+        out.update(result)
+        if not passed and input.stop_on_fail:
+            break
+
+    out["provisional_tier"] = provisional_tier
+    if "credit" in out["stages_run"] or "income" in out["stages_run"]:
+        tiered = out.get("income_decision") or out.get("credit_decision") or {}
+        out["final_tier"] = tiered.get("final_tier")
+    out["spend"] = ledger.summary()
+    return out
+
+
+@app.post("/workflows/kyc/stages/{stage}")
+def kyc_single_stage(
+    stage: Stage,
+    input: StageIn,
+    x_deadline_ms: Optional[str] = Header(default=None, alias=deadline.HEADER),
+    x_priority_class: Optional[str] = Header(default=None, alias=scheduler.HEADER),
+):
+    """
+    One stage only: /workflows/kyc/stages/credit is /workflows/kyc/stages with "stages": ["credit"].
+    """
+    return kyc_stages(StagesIn(**input.model_dump(), stages=[stage]), x_deadline_ms, x_priority_class)
+
+
+@app.post("/workflows/kyc/resume")
+def kyc_resume(
+    input: ResumeIn,
+    x_deadline_ms: Optional[str] = Header(default=None, alias=deadline.HEADER),
+    x_priority_class: Optional[str] = Header(default=None, alias=scheduler.HEADER),
+):
+    """
+    Re-evaluates an existing case from `from_stage` onward, reusing the stored results of the stages before it
+    (see cases). A stored stage that is missing, older than its CASE_STAGE_MAX_AGE or whose intake fields
+    changed is re-run too, and so is everything after it: `rerun_from` is where the run actually started and
+    `stale` says why ({stage: missing | expired | changed}). A reused stage that did not pass is a 409, since
+    the case never got past it; resume from that stage instead.
+
+    The intake is `intake` when given (e.g. new income options) and is stored for later resumes, else the
+    case's last one. A stored intake keeps its SSN and date of birth only with CASE_STORE_KEY set; without them,
+    re-running AML, fraud or credit is a 409 unless `intake` is given. Stages run in the fixed order (aml, fraud, credit, income) and stop at the first that
+    does not pass; the response is shaped like /workflows/kyc/full's plus `reused`, `rerun`, `rerun_from`,
+    `stale` and `spend` (for the re-run stages only). Deadline, priority class and spend budget apply as in
+    /workflows/kyc/full; the negative cache is not consulted, but AML/fraud declines are recorded in it.
+    """
+    intake = input.intake if input.intake is not None else cases.intake(input.case_id)
+    if intake is None:
+        raise HTTPException(status_code=404, detail="Unknown case (no stored intake); run /workflows/kyc/full first")
+    deadline.start(deadline.budget_from_header(x_deadline_ms, settings.WORKFLOW_TIMEOUT_SECONDS))
+    ledger = spend.start(input.spend_budget)
+    scheduler.set_class(x_priority_class)
+
+    start = input.from_stage
+    stale: Dict[str, str] = {}
+    stored: Dict[str, Dict[str, Any]] = {}
+    for stage in STAGES[: STAGES.index(input.from_stage)]:
+        result, state = cases.reusable(input.case_id, stage, intake)
+        if result is None:
+            start = stage
+            stale[stage] = state
+            break
+        stored[stage] = result
+    reused = list(STAGES[: STAGES.index(start)])
+    for stage in reused:
+        result = stored[stage]
+        passed = result["aml_decision"].get("decision") != "DECLINE" if stage == "aml" else _result(stage, result) == ordering.PASS
+        if not passed:
+            raise HTTPException(status_code=409, detail=f"Stored {stage} result did not pass; resume from {stage}")
+
+    missing = cases.withheld(intake)
+    if missing and start != "income":
+        raise HTTPException(
+            status_code=409,
+            detail=f"The stored intake holds no {', '.join(missing)} (CASE_STORE_KEY unset when stored); pass intake to re-run {start}",
+        )
+    cases.forget_from(input.case_id, start)
+    results = {s: stored[s] for s in reused if s != "aml"}
+    aml = stored.get("aml")
+    rerun: List[str] = []
+    status_stage: Optional[str] = None
+    for stage in STAGES[STAGES.index(start):]:
+        try:
+            deadline.check(f"{stage} stage")
+            if stage == "aml":
+                result = _run_aml(input.case_id, intake)
+            elif stage == "fraud":
+                result = _run_fraud(input.case_id, intake)
+            elif stage == "credit":
+                provisional_tier = (results.get("fraud") or {}).get("fraud_decision", {}).get("provisional_tier")
+                result = _run_credit(intake, provisional_tier)
+            else:
+                _reconcile_tiers(results)
+                credit_final = (results.get("credit") or {}).get("credit_decision", {}).get("final_tier")
+                result = {"income_decision": _run_income(input.case_id, intake, credit_final)}
+        except Exception as e:
+            raise _stage_error("AML" if stage == "aml" else stage.capitalize(), e)
+        cases.save(input.case_id, stage, intake, result)
+        rerun.append(stage)
+        if stage == "aml":
+            aml = result
+            if result["aml_decision"].get("decision") == "DECLINE":
+                negative_cache.record_decline(input.case_id, intake, "AML_DECLINE", result["aml_decision"].get("reasons") or [])
+                status_stage = "aml"
+                break
+            continue
+        results[stage] = result
+        if _result(stage, result) != ordering.PASS:
+            if stage == "fraud" and _result(stage, result) == ordering.DECLINE:
+                negative_cache.record_decline(input.case_id, intake, "FRAUD_DECLINE", result["fraud_decision"].get("reasons") or [])
+            status_stage = stage
+            break
+
+    if status_stage == "aml":
+        out = {
             "case_id": input.case_id,
-            "status": credit_status,  # CREDIT_DECLINE | CREDIT_REVIEW
-            "aml_decision": aml_decision,
-            "fraud_decision": fraud_decision,
-            "credit_decision": credit_decision,
-            "provisional_tier": provisional_tier,  # from fraud
-            "bureau_tier": credit_eval.get("bureau_tier"),
-            "final_tier": credit_eval.get("final_tier"),
-            "aml_raw": aml_raw,
-            "fraud_raw": fraud_raw,
-            "credit_raw": credit_raw,
+            "status": "AML_DECLINE",
+            "aml_decision": aml["aml_decision"],
+            "fraud_decision": None,
+            "provisional_tier": None,
+            "aml_raw": aml["aml_raw"],
+            "fraud_raw": None,
+            "stage_order": ["aml"],
         }
+    else:
+        _reconcile_tiers(results)
+        out = _kyc_response(input.case_id, aml["aml_decision"], aml["aml_raw"], results, status_stage, ["aml", *results])
+    out["reused"] = reused
+    out["rerun"] = rerun
+    out["rerun_from"] = start
+    out["stale"] = stale
+    out["spend"] = ledger.summary()
+    return out
 
-    # Income stage (Plaid mock) — run only after CREDIT_PASS
-    try:
-        options = build_income_options_from_intake(input.intake)
 
-        # Use client_user_id if present; else derive a stable key from case_id
-        client_user_id = str(input.intake.get("client_user_id") or input.case_id)
+def _resume(case_id: str, stage: str) -> Dict[str, Any]:
+    return _delivered(kyc_resume(ResumeIn(case_id=case_id, from_stage=stage), None, settings.WEBHOOK_PRIORITY))
 
-        bundle = get_income_bundle(client_user_id, options=options)
 
-        income_eval = evaluate_income(
-            payroll_resp=bundle.get("payroll_resp"),
-            bank_resp=bundle.get("bank_resp"),
-            risk_resp=bundle.get("risk_resp"),
-            coverage_months=int(options.get("coverage_months") or 12),
-            credit_final_tier=credit_decision.get("final_tier"),
-        )
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Income orchestration error: {e}")
+webhooks.set_resumer(_resume)
 
-    income_status = income_eval.get("decision") or "INCOME_REVIEW"
 
+@app.post("/workflows/kyc/joint")
+def kyc_joint(
+    input: JointKycIn,
+    x_deadline_ms: Optional[str] = Header(default=None, alias=deadline.HEADER),
+    x_priority_class: Optional[str] = Header(default=None, alias=scheduler.HEADER),
+):
+    """
+    Joint application: the full KYC flow for the primary applicant and the co-applicant, run concurrently.
+    Each applicant runs as /workflows/kyc/full with case id `{case_id}:{role}`, under the same deadline and
+    priority class and with its own spend ledger. Their calls share the vendor clients, connection pools and
+    concurrency pools, so a joint case takes about as long as its slower applicant.
+
+    The results are combined by `stages.joint.combine_joint`: either applicant's decline declines, either's
+    review sends to review; when both pass, `final_tier` and `credit_limit` come from the weaker credit tier
+    and the combined income. `status` is JOINT_PASS | JOINT_REVIEW | JOINT_DECLINE; each applicant's full
+    response is in `applicants`. Callbacks, prefetch and degraded mode are not available for joint cases;
+    a technical failure of either applicant fails the request as in /workflows/kyc/full.
+    """
+    futures = {
+        role: _joint_executor.submit(
+            contextvars.copy_context().run,
+            kyc_full,
+            FullKycIn(case_id=f"{input.case_id}:{role}", intake=getattr(input, role), spend_budget=input.spend_budget),
+            x_deadline_ms,
+            x_priority_class,
+        )
+        for role in JOINT_ROLES
+    }
+    results = {role: future.result() for role, future in futures.items()}
+    joint = combine_joint(results)
+    analytics.record("JOINT", joint["decision"], joint["final_tier"], joint["declined_by"], joint["review_by"])
     return {
         "case_id": input.case_id,
-        "status": income_status,  # INCOME_DECLINE | INCOME_REVIEW | INCOME_PASS
-        "aml_decision": aml_decision,
-        "fraud_decision": fraud_decision,
-        "credit_decision": credit_decision,
-        "income_decision": income_eval,
-        "provisional_tier": provisional_tier,  # from fraud
-        "bureau_tier": credit_eval.get("bureau_tier"),
-        "final_tier": income_eval.get("final_tier"),
-        "aml_raw": aml_raw,
-        "fraud_raw": fraud_raw,
-        "credit_raw": credit_raw,
+        "status": joint["decision"],
+        "joint_decision": joint,
+        "final_tier": joint["final_tier"],
+        "credit_limit": joint["credit_limit"],
+        "applicants": results,
+        "spend": {
+            "total": round(sum(r["spend"]["total"] for r in results.values()), 4),
+            "by_applicant": {role: r["spend"] for role, r in results.items()},
+        },
     }
@@ -0,0 +1,298 @@
+"""
+Negative cache: recent hard declines and fraud labels, keyed by hashed identifiers.
+
+Repeat applications after an AML_DECLINE or FRAUD_DECLINE, or from identifiers SEON labelled `fraud_confirmed`,
+are answered before S1 without any vendor call. Identifiers (NEGATIVE_CACHE_IDENTIFIERS: ssn, email, phone,
+device, gov_id) are normalized and HMAC-SHA256'd with NEGATIVE_CACHE_KEY, so the store never holds raw PII and
+the hashes cannot be reversed by hashing candidate SSNs without the key. Any matching identifier is a hit.
+The cache stays off while NEGATIVE_CACHE_KEY is unset or the old "change-me" placeholder: with a known key,
+SSNs, phones and emails could be brute-forced from their hashes.
+
+Storage, with every entry expiring after NEGATIVE_CACHE_TTL_SECONDS:
+  - mode "exact" (default): entries live in the shared cache backend (namespace "negative"), so with
+    CACHE_BACKEND=sqlite every worker on the host sees them. Capacity is bounded by NEGATIVE_CACHE_MAX_ENTRIES (LRU).
+  - mode "bloom": membership is a generational Bloom filter sized for NEGATIVE_CACHE_BLOOM_CAPACITY identifiers
+    at NEGATIVE_CACHE_BLOOM_FP_RATE. Memory stays constant at any cardinality, at the cost of that false-positive
+    rate. The filter is per worker process. Details for the response are looked up best-effort in the exact
+    store.
+
+Only policy declines are cached. Technical AML failures (technical_error_or_timeout) and credit/income declines
+are not. A `not_fraud` label clears the identifiers of that SEON transaction, tombstoning them in bloom mode.
+Labels arrive through the admin endpoint below or in SEON status update webhooks (see webhooks).
+
+GET  /admin/negative-cache         — mode, size, filter fill and hit/miss counters
+POST /admin/negative-cache/labels  — [{transaction_id, label}] as sent to SEON's label API
+"""
+import hashlib
+import hmac
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+
+from Taktile.service import memory
+from Taktile.service.cache import get_cache
+from Taktile.service.config import settings
+from Taktile.service.security import require_admin
+
+
+# SEON session placeholder sent when the intake has none: shared by everyone, never an identifier
+_PLACEHOLDER_SESSIONS = {"", "mock-session"}
+
+
+def _digits(value: Any) -> str:
+    return re.sub(r"\D", "", str(value or ""))
+
+
+def _kinds() -> List[str]:
+    return [k.strip() for k in settings.NEGATIVE_CACHE_IDENTIFIERS.split(",") if k.strip()]
+
+
+def identifiers(intake: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Normalized identifier values by kind (only the kinds in NEGATIVE_CACHE_IDENTIFIERS, only when present).
+    """
+    values = {
+        "ssn": _digits(intake.get("ssn")),
+        "email": str(intake.get("email") or "").strip().lower(),
+        "phone": _digits(intake.get("phone_number")),
+        "device": "" if str(intake.get("session") or "") in _PLACEHOLDER_SESSIONS else str(intake.get("session")),
+        "gov_id": (
+            f"{str(intake.get('gov_id_type') or '').upper()}:{str(intake.get('gov_id_number') or '').upper()}"
+            if intake.get("gov_id_number")
+            else ""
+        ),
+    }
+    return {k: values[k] for k in _kinds() if values.get(k)}
+
+
+def hashed(intake: Dict[str, Any]) -> Dict[str, str]:
+    key = settings.NEGATIVE_CACHE_KEY.encode("utf-8")
+    return {kind: hmac.new(key, f"{kind}:{value}".encode("utf-8"), hashlib.sha256).hexdigest() for kind, value in identifiers(intake).items()}
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, fp_rate: float) -> None:
+        self.bits = max(64, int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))))
+        self.hashes = max(1, int(round(self.bits / capacity * math.log(2))))
+        self._array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest: str) -> List[int]:
+        # Double hashing from the (already uniform) HMAC digest
+        h1, h2 = int(digest[:16], 16), int(digest[16:32], 16) | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, digest: str) -> None:
+        for p in self._positions(digest):
+            self._array[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def __contains__(self, digest: str) -> bool:
+        return all(self._array[p >> 3] & (1 << (p & 7)) for p in self._positions(digest))
+
+    def fill(self) -> float:
+        return sum(bin(b).count("1") for b in self._array) / self.bits
+
+
+class GenerationalBloom:
+    """
+    Bloom filters rotated every ttl / (generations - 1) seconds. An identifier stays a member for at least
+    `ttl` seconds (at most ttl x generations / (generations - 1)).
+    """
+
+    def __init__(self, ttl: float, capacity: int, fp_rate: float, generations: int = 4) -> None:
+        self.width = ttl / (generations - 1)
+        self.generations = generations
+        # The false-positive rate compounds across generations; each is sized for its share of the capacity
+        self._capacity = max(1, capacity // (generations - 1))
+        self._fp = fp_rate / generations
+        self._ring: Dict[int, BloomFilter] = {}
+        self._lock = threading.Lock()
+
+    def _current(self, now: float) -> BloomFilter:
+        idx = int(now // self.width)
+        f = self._ring.get(idx)
+        if f is None:
+            for old in [i for i in self._ring if i <= idx - self.generations]:
+                del self._ring[old]
+            f = self._ring[idx] = BloomFilter(self._capacity, self._fp)
+        return f
+
+    def add(self, digest: str) -> None:
+        with self._lock:
+            self._current(time.time()).add(digest)
+
+    def __contains__(self, digest: str) -> bool:
+        oldest = int(time.time() // self.width) - self.generations + 1
+        return any(digest in f for i, f in list(self._ring.items()) if i >= oldest)
+
+    def describe(self) -> Dict[str, Any]:
+        filters = list(self._ring.values())
+        return {
+            "generations": len(filters),
+            "bytes": sum(len(f._array) for f in filters),
+            "hashes": filters[0].hashes if filters else None,
+            "inserted": sum(f.count for f in filters),
+            "fill": [round(f.fill(), 4) for f in filters],
+        }
+
+
+logger = logging.getLogger("taktile.negative_cache")
+
+# Keys that are public knowledge: the cache refuses to run with them
+_PLACEHOLDER_KEYS = ("", "change-me")
+
+
+def enabled() -> bool:
+    return settings.NEGATIVE_CACHE_ENABLED and settings.NEGATIVE_CACHE_KEY not in _PLACEHOLDER_KEYS
+
+
+if settings.NEGATIVE_CACHE_ENABLED and not enabled():
+    logger.warning("negative cache disabled: set NEGATIVE_CACHE_KEY to a secret value to enable it")
+
+_store = get_cache("negative", max_entries=settings.NEGATIVE_CACHE_MAX_ENTRIES, default_ttl=settings.NEGATIVE_CACHE_TTL_SECONDS)
+_bloom = (
+    GenerationalBloom(settings.NEGATIVE_CACHE_TTL_SECONDS, settings.NEGATIVE_CACHE_BLOOM_CAPACITY, settings.NEGATIVE_CACHE_BLOOM_FP_RATE)
+    if settings.NEGATIVE_CACHE_MODE == "bloom"
+    else None
+)
+_counters: Counter = Counter()
+
+memory.register_store("negative_cache.bloom", lambda: _bloom._ring if _bloom is not None else {})
+
+
+def _negative_labels() -> List[str]:
+    return [x.strip() for x in settings.NEGATIVE_CACHE_LABELS.split(",") if x.strip()]
+
+
+def _put(hashes: Dict[str, str], entry: Dict[str, Any]) -> None:
+    for digest in hashes.values():
+        _store.set(f"id:{digest}", entry)
+        _store.delete(f"clear:{digest}")
+        if _bloom is not None:
+            _bloom.add(digest)
+
+
+def check(intake: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    The cached decline for any of the intake's identifiers, or None. Costs one HMAC per identifier plus a
+    store lookup (exact) or a few bit tests (bloom).
+    """
+    if not enabled():
+        return None
+    for kind, digest in hashed(intake).items():
+        if _bloom is not None:
+            if digest not in _bloom or _store.get(f"clear:{digest}") is not None:
+                continue
+            entry = _store.get(f"id:{digest}") or {"status": "FRAUD_DECLINE", "reason": "negative_cache_filter", "source": "filter"}
+        else:
+            entry = _store.get(f"id:{digest}")
+            if entry is None:
+                continue
+        _counters["hits"] += 1
+        return {**entry, "matched": kind}
+    _counters["misses"] += 1
+    return None
+
+
+def record_decline(case_id: str, intake: Dict[str, Any], status: str, reasons: List[str]) -> None:
+    """
+    Remember a hard AML/fraud decline for this intake's identifiers.
+    """
+    if not enabled() or "technical_error_or_timeout" in reasons:
+        return
+    hashes = hashed(intake)
+    if hashes:
+        _put(hashes, {"status": status, "reason": ",".join(reasons) or status.lower(), "source": "decline", "case_id": case_id, "at": time.time()})
+        _counters["declines_recorded"] += 1
+
+
+def remember_transaction(transaction_id: Optional[str], case_id: str, intake: Dict[str, Any]) -> None:
+    """
+    Map a SEON fraud transaction to the identifier hashes, so labels arriving later can be applied.
+    """
+    if enabled() and transaction_id:
+        _store.set(f"txn:{transaction_id}", {"case_id": case_id, "hashes": hashed(intake)})
+
+
+def apply_label(transaction_id: str, label: str) -> str:
+    """
+    Apply a SEON label: negative labels (NEGATIVE_CACHE_LABELS) add the transaction's identifiers, `not_fraud`
+    clears them. Returns "added", "cleared", "ignored" or "unknown_transaction".
+    """
+    txn = _store.get(f"txn:{transaction_id}")
+    if txn is None:
+        return "unknown_transaction"
+    hashes: Dict[str, str] = txn.get("hashes") or {}
+    if label in _negative_labels():
+        _put(hashes, {"status": "FRAUD_DECLINE", "reason": f"label:{label}", "source": "label", "case_id": txn.get("case_id"), "at": time.time()})
+        _counters["labels_applied"] += 1
+        return "added"
+    if label == "not_fraud":
+        for digest in hashes.values():
+            _store.delete(f"id:{digest}")
+            _store.set(f"clear:{digest}", True)
+        _counters["labels_cleared"] += 1
+        return "cleared"
+    return "ignored"
+
+
+def cached_response(case_id: str, hit: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Workflow response for a negative-cache hit, shaped like the AML or fraud decline it stands for.
+    """
+    reasons = [f"negative_cache:{hit.get('reason')}"]
+    details = {"source": "negative_cache", "matched": hit.get("matched"), "original_case_id": hit.get("case_id"), "cached_at": hit.get("at")}
+    if hit.get("status") == "AML_DECLINE":
+        return {
+            "case_id": case_id,
+            "status": "AML_DECLINE",
+            "aml_decision": {"decision": "DECLINE", "reasons": reasons, "details": details},
+            "fraud_decision": None,
+            "provisional_tier": None,
+            "aml_raw": None,
+            "fraud_raw": None,
+        }
+    return {
+        "case_id": case_id,
+        "status": "FRAUD_DECLINE",
+        "aml_decision": None,
+        "fraud_decision": {"decision": "FRAUD_DECLINE", "provisional_tier": None, "reasons": reasons, "details": details},
+        "provisional_tier": None,
+        "aml_raw": None,
+        "fraud_raw": None,
+    }
+
+
+class LabelIn(BaseModel):
+    transaction_id: str
+    label: str
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/admin/negative-cache")
+def negative_cache_state() -> Dict[str, Any]:
+    return {
+        "enabled": enabled(),
+        "mode": settings.NEGATIVE_CACHE_MODE,
+        "ttl_seconds": settings.NEGATIVE_CACHE_TTL_SECONDS,
+        "identifiers": _kinds(),
+        "store_entries": len(_store),
+        "bloom": _bloom.describe() if _bloom is not None else None,
+        "counters": dict(_counters),
+    }
+
+
+@router.post("/admin/negative-cache/labels")
+def negative_cache_labels(items: List[LabelIn]) -> Dict[str, Any]:
+    results = {item.transaction_id: apply_label(item.transaction_id, item.label) for item in items}
+    return {"results": results}
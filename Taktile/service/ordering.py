@@ -0,0 +1,128 @@
+"""
+Fixed order of the independent KYC gates, and per-gate statistics (per worker process).
+
+AML always runs first, then fraud -> credit -> income. A case is approved only if all three pass; otherwise
+the first gate in that order that does not pass decides the case (`outcome()`), and the gates after it are
+not run (`next_stage()`).
+
+Reordering the gates cannot save vendor calls under this rule. A REVIEW or DECLINE may only decide the case
+once every gate before it in the fixed order has passed, so any other order still runs every gate the fixed
+order runs, plus possibly some after the deciding one: for every combination of outcomes, the fixed order
+runs the fewest gates. An order could only be cheaper if a DECLINE from any gate ended the case, and that
+changes decisions: a fraud REVIEW with a credit DECLINE is a review today, it would become a decline when
+credit ran first. Approvals, statuses, tiers and limits are kept, so the order is kept too.
+
+Each gate keeps an EWMA (ORDERING_EWMA_ALPHA) of its decline rate, review rate, latency and cost, for
+monitoring. Cost is what the gate's vendor calls were charged in the workflow's spend ledger, retries
+included; before the first observation the nominal price of STAGE_VENDOR_CALLS is shown.
+
+GET /admin/ordering — stats per gate
+"""
+import threading
+from typing import Any, Dict, Mapping, Optional
+
+from fastapi import APIRouter, Depends
+
+from Taktile.service import spend
+from Taktile.service.config import settings
+from Taktile.service.security import require_admin
+from Taktile.stages.S3 import bureaus
+
+
+CANONICAL = ("fraud", "credit", "income")
+PASS, REVIEW, DECLINE = "pass", "review", "decline"
+
+# Vendor calls per gate run (credit: one pull per configured bureau; Plaid: payroll income + risk signals +
+# employment, bank income only as a fallback)
+STAGE_VENDOR_CALLS: Dict[str, Dict[str, int]] = {
+    "fraud": {"seon_fraud": 1},
+    "credit": {bureau: 1 for bureau in bureaus()},
+    "income": {"plaid": 3 if settings.EMPLOYMENT_CHECK_ENABLED else 2},
+}
+
+
+def stage_cost(stage: str) -> float:
+    """
+    Nominal cost of one gate run at list prices.
+    """
+    return sum(spend.unit_cost(vendor) * calls for vendor, calls in STAGE_VENDOR_CALLS[stage].items())
+
+
+class StageStats:
+    def __init__(self) -> None:
+        self.n = 0
+        self.decline_rate = 0.0
+        self.review_rate = 0.0
+        self.latency = 0.0  # seconds
+        self.cost = 0.0
+
+    def update(self, result: str, seconds: float, cost: float, alpha: float) -> None:
+        declined = 1.0 if result == DECLINE else 0.0
+        reviewed = 1.0 if result == REVIEW else 0.0
+        if self.n == 0:
+            self.decline_rate, self.review_rate, self.latency, self.cost = declined, reviewed, seconds, cost
+        else:
+            self.decline_rate += alpha * (declined - self.decline_rate)
+            self.review_rate += alpha * (reviewed - self.review_rate)
+            self.latency += alpha * (seconds - self.latency)
+            self.cost += alpha * (cost - self.cost)
+        self.n += 1
+
+    def copy(self) -> "StageStats":
+        out = StageStats()
+        out.n, out.decline_rate, out.review_rate = self.n, self.decline_rate, self.review_rate
+        out.latency, out.cost = self.latency, self.cost
+        return out
+
+
+_stats: Dict[str, StageStats] = {stage: StageStats() for stage in CANONICAL}
+_lock = threading.Lock()
+
+
+def record(stage: str, result: str, seconds: float, cost: float) -> None:
+    with _lock:
+        _stats[stage].update(result, seconds, cost, settings.ORDERING_EWMA_ALPHA)
+
+
+def _snapshot() -> Dict[str, StageStats]:
+    with _lock:
+        return {s: st.copy() for s, st in _stats.items()}
+
+
+def next_stage(results: Mapping[str, str]) -> Optional[str]:
+    """
+    The next gate to run given the results so far (gate -> pass|review|decline), or None once the outcome
+    is settled.
+    """
+    if outcome(results) is not None:
+        return None
+    return next((s for s in CANONICAL if s not in results), None)
+
+
+def outcome(results: Mapping[str, str]) -> Optional[str]:
+    """
+    The gate whose decision is the workflow status: the first gate in the fixed order that did not pass, or None
+    when all passed.
+    """
+    return next((s for s in CANONICAL if results.get(s) in (REVIEW, DECLINE)), None)
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/admin/ordering")
+def ordering_stats() -> Dict[str, Any]:
+    snapshot = _snapshot()
+    return {
+        "order": ["aml", *CANONICAL],
+        "stages": {
+            s: {
+                "n": st.n,
+                "decline_rate": round(st.decline_rate, 4),
+                "review_rate": round(st.review_rate, 4),
+                "latency_ms": round(st.latency * 1000, 1),
+                "cost": round(st.cost if st.n else stage_cost(s), 4),
+            }
+            for s, st in snapshot.items()
+        },
+    }
@@ -0,0 +1,408 @@
+"""
+Degraded mode: workflows that hit a vendor outage are queued durably and replayed once the vendor recovers.
+
+A vendor (OUTAGE_QUEUE_VENDORS: seon for AML/fraud, the primary credit bureau, experian by default, for credit)
+counts as unreachable when a call fails to connect, times out (connect, read, write or pool), or answers
+502/503/504 after retries. Experian reports these as a status-0 or 5xx envelope rather than an exception. When
+`/workflows/kyc/full` carries a `replay_callback`, such a failure marks the vendor down and queues the request
+instead of returning a 502. The case is answered with `status: PENDING_VENDOR`. While a vendor is down, new
+workflows that need it are queued before their stage runs, with no vendor call.
+
+The queue is a SQLite table (OUTAGE_QUEUE_PATH, WAL mode), so it survives restarts and is shared by every
+worker on the host. Rows are claimed atomically, so each is replayed once. A row holds the request encrypted with
+OUTAGE_QUEUE_KEY (the intake includes SSN and DOB) and is deleted once its result is delivered; the queue stays off
+while the key is unset or the "change-me" placeholder. A monitor thread per worker probes the health URL of each
+vendor marked down every OUTAGE_HEALTH_INTERVAL_SECONDS. Once every vendor a row waits for is back, the row is
+replayed as a full workflow in the OUTAGE_REPLAY_PRIORITY lane, at most OUTAGE_REPLAY_RATE per second and oldest
+first. The result goes to the row's `replay_callback`. A replay that hits the outage again goes back to the queue.
+Rows older than OUTAGE_QUEUE_MAX_AGE_SECONDS are delivered as a review with `error: vendor_unavailable`. Each
+replay runs in a copy of the monitor's context, so its workflow deadline does not outlive it, and the callback is
+POSTed without any deadline. A result the callback does not accept stays in the row, encrypted, and is redelivered
+every 30 s; rows still undelivered at twice OUTAGE_QUEUE_MAX_AGE_SECONDS are dropped with an error log.
+
+Vendor up/down state is per worker; the queue is not.
+
+GET /admin/outage — vendors marked down (seconds down), queue rows by state and vendor, replay counters
+"""
+import contextvars
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from fastapi import APIRouter, Depends
+
+from Taktile.service import background, sealing
+from Taktile.service.config import settings
+from Taktile.service.security import require_admin
+from Taktile.stages.S3 import bureaus
+
+
+logger = logging.getLogger("taktile.outage")
+
+STATUS = "PENDING_VENDOR"
+
+# Stage -> vendor whose outage queues the workflow (credit: the primary bureau; with several bureaus,
+# S3 only reports an unreachable envelope when none of them answered)
+STAGE_VENDORS = {"aml": "seon", "fraud": "seon", "credit": bureaus()[0]}
+HEALTH_URLS = {
+    "seon": f"{settings.SEON_BASE_URL.rstrip('/')}/__health",
+    "experian": f"{settings.EXPERIAN_BASE_URL.rstrip('/')}/",
+    "equifax": f"{settings.EQUIFAX_BASE_URL.rstrip('/')}/",
+    "transunion": f"{settings.TRANSUNION_BASE_URL.rstrip('/')}/",
+}
+OUTAGE_STATUS_CODES = {502, 503, 504}
+
+# A claimed row whose worker died mid-replay is released after this long
+_CLAIM_TIMEOUT_SECONDS = 300.0
+# A result the callback did not accept stays queued (encrypted) and is redelivered this often
+_DELIVERY_RETRY_SECONDS = 30.0
+
+_PURPOSE = "outage-queue"
+# Request fields a replay does not use: prefetched S1/S2 results are not reused after an outage
+_UNSTORED_FIELDS = ("prefetch_token",)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outage_queue (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    case_id TEXT NOT NULL,
+    vendor TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    request TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'queued',
+    claimed_at REAL,
+    result TEXT,
+    not_before REAL
+);
+CREATE INDEX IF NOT EXISTS outage_queue_state ON outage_queue (state, id);
+"""
+# Columns added after the first release, for queue files created before them
+_ADDED_COLUMNS = ("result TEXT", "not_before REAL")
+
+
+class VendorUnavailable(Exception):
+    def __init__(self, vendor: str, detail: str = "") -> None:
+        super().__init__(f"{vendor} unavailable{': ' + detail if detail else ''}")
+        self.vendor = vendor
+
+
+def vendors() -> List[str]:
+    return [v.strip() for v in settings.OUTAGE_QUEUE_VENDORS.split(",") if v.strip()]
+
+
+def stage_vendor(stage: str) -> Optional[str]:
+    vendor = STAGE_VENDORS.get(stage)
+    return vendor if vendor in vendors() else None
+
+
+def unreachable(exc: BaseException) -> bool:
+    """
+    Whether `exc` (or what caused it) means the vendor could not be reached at all.
+    """
+    seen = 0
+    e: Optional[BaseException] = exc
+    while e is not None and seen < 5:
+        # TimeoutException covers connect, read, write and pool timeouts: a vendor that stops answering is down too
+        if isinstance(e, (VendorUnavailable, httpx.ConnectError, httpx.TimeoutException)):
+            return True
+        if isinstance(e, httpx.HTTPStatusError) and e.response.status_code in OUTAGE_STATUS_CODES:
+            return True
+        e, seen = e.__cause__ or e.__context__, seen + 1
+    return False
+
+
+def envelope_unreachable(envelope: Dict[str, Any]) -> bool:
+    """
+    Whether an Experian envelope is a transport failure (status 0) or a gateway error.
+    """
+    status = envelope.get("status")
+    return status == 0 or status in OUTAGE_STATUS_CODES
+
+
+def enabled() -> bool:
+    """
+    Whether workflows are queued: OUTAGE_QUEUE_ENABLED, and a real OUTAGE_QUEUE_KEY to encrypt the queued requests.
+    """
+    return settings.OUTAGE_QUEUE_ENABLED and sealing.usable(settings.OUTAGE_QUEUE_KEY)
+
+
+if settings.OUTAGE_QUEUE_ENABLED and not enabled():
+    logger.warning("OUTAGE_QUEUE_KEY is not set; degraded mode is off and vendor outages fail with a 502")
+
+
+def seal(request: Dict[str, Any]) -> str:
+    """
+    Encrypt a request for the queue with OUTAGE_QUEUE_KEY (see sealing), without the fields a replay does not use.
+    """
+    return sealing.seal({k: v for k, v in request.items() if k not in _UNSTORED_FIELDS}, settings.OUTAGE_QUEUE_KEY, _PURPOSE)
+
+
+def unseal(blob: str) -> Dict[str, Any]:
+    """
+    Decrypt a queued request; ValueError if it was not sealed with the current OUTAGE_QUEUE_KEY or was altered.
+    """
+    return sealing.unseal(blob, settings.OUTAGE_QUEUE_KEY, _PURPOSE)
+
+
+# Whether the workflow in this context queues on outage (it has a replay callback); set by kyc_full
+_armed: ContextVar[bool] = ContextVar("taktile_outage_armed", default=False)
+_replaying: ContextVar[bool] = ContextVar("taktile_outage_replaying", default=False)
+
+
+def arm(requested: bool) -> None:
+    _armed.set(bool(requested) and enabled())
+
+
+def armed() -> bool:
+    return _armed.get()
+
+
+def replaying() -> bool:
+    return _replaying.get()
+
+
+_down: Dict[str, float] = {}
+_counters: Counter = Counter()
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def _conn() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(settings.OUTAGE_QUEUE_PATH, timeout=5.0, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        for column in _ADDED_COLUMNS:
+            try:
+                conn.execute(f"ALTER TABLE outage_queue ADD COLUMN {column}")
+            except sqlite3.OperationalError:
+                pass  # already there
+        _local.conn = conn
+    return conn
+
+
+def mark_down(vendor: str) -> None:
+    with _lock:
+        if vendor not in _down:
+            _down[vendor] = time.time()
+            _counters[f"{vendor}_outages"] += 1
+            logger.warning("vendor %s marked down; queueing workflows that need it", vendor)
+    ensure_monitor()
+
+
+def is_down(vendor: Optional[str]) -> bool:
+    return vendor is not None and vendor in _down
+
+
+def enqueue(case_id: str, vendor: str, stage: str, request: Dict[str, Any]) -> int:
+    cur = _conn().execute(
+        "INSERT INTO outage_queue (case_id, vendor, stage, request, enqueued_at) VALUES (?, ?, ?, ?, ?)",
+        (case_id, vendor, stage, seal(request), time.time()),
+    )
+    _counters["queued"] += 1
+    ensure_monitor()
+    return int(cur.lastrowid)
+
+
+def queued_response(case_id: str, vendor: str, stage: str, queue_id: int, stage_order: List[str]) -> Dict[str, Any]:
+    return {
+        "case_id": case_id,
+        "status": STATUS,
+        "queued": {"id": queue_id, "vendor": vendor, "stage": stage},
+        "aml_decision": None,
+        "fraud_decision": None,
+        "provisional_tier": None,
+        "aml_raw": None,
+        "fraud_raw": None,
+        "stage_order": stage_order,
+    }
+
+
+def _probe(vendor: str) -> bool:
+    try:
+        return httpx.get(HEALTH_URLS[vendor], timeout=settings.OUTAGE_HEALTH_TIMEOUT_SECONDS).status_code < 500
+    except httpx.HTTPError:
+        return False
+
+
+def _claim(exclude: List[str]) -> Optional[tuple]:
+    conn = _conn()
+    marks = ",".join("?" * len(exclude))
+    # A row holding an undelivered result waits for its redelivery time, not for its vendor
+    where = "state = 'queued' AND (not_before IS NULL OR not_before <= ?)"
+    if exclude:
+        where += f" AND (result IS NOT NULL OR vendor NOT IN ({marks}))"
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "UPDATE outage_queue SET state = 'queued', claimed_at = NULL WHERE state = 'replaying' AND claimed_at < ?",
+            (now - _CLAIM_TIMEOUT_SECONDS,),
+        )
+        row = conn.execute(
+            f"SELECT id, case_id, vendor, stage, request, enqueued_at, attempts, result FROM outage_queue WHERE {where} ORDER BY id LIMIT 1",
+            [now, *exclude],
+        ).fetchone()
+        if row is not None:
+            conn.execute("UPDATE outage_queue SET state = 'replaying', claimed_at = ?, attempts = attempts + 1 WHERE id = ?", (now, row[0]))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return row
+
+
+def _expired_payload(case_id: str, stage: str) -> Dict[str, Any]:
+    return {
+        "case_id": case_id,
+        "status": "CREDIT_REVIEW" if stage == "credit" else "FRAUD_REVIEW",
+        "error": "vendor_unavailable",
+        "stage_order": [],
+    }
+
+
+_replayer: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+
+
+def set_replayer(fn: Callable[[Dict[str, Any]], Dict[str, Any]]) -> None:
+    """
+    Register the function that re-runs a queued request body and returns the workflow response.
+    """
+    global _replayer
+    _replayer = fn
+    # Rows left by a previous run are replayed without waiting for a new outage
+    if enabled() and os.path.exists(settings.OUTAGE_QUEUE_PATH) and _pending():
+        ensure_monitor()
+
+
+def _run_replay(request: Dict[str, Any]) -> Dict[str, Any]:
+    _replaying.set(True)
+    return _replayer(request)
+
+
+def _deliver(queue_id: int, case_id: str, enqueued_at: float, callback: Dict[str, Any], result: Dict[str, Any], outcome: str) -> None:
+    """
+    Deliver a row's result and delete the row; a result the callback did not accept is kept for redelivery.
+    """
+    conn = _conn()
+    if background.deliver_callback(callback.get("url"), callback.get("token", ""), result):
+        conn.execute("DELETE FROM outage_queue WHERE id = ?", (queue_id,))
+        _counters[outcome] += 1
+        return
+    if time.time() - enqueued_at > 2 * settings.OUTAGE_QUEUE_MAX_AGE_SECONDS:
+        logger.error("result of case %s (outage queue row %s) was never accepted by its callback; dropped", case_id, queue_id)
+        conn.execute("DELETE FROM outage_queue WHERE id = ?", (queue_id,))
+        _counters["undeliverable"] += 1
+        return
+    conn.execute(
+        "UPDATE outage_queue SET state = 'queued', claimed_at = NULL, result = ?, not_before = ? WHERE id = ?",
+        (sealing.seal(result, settings.OUTAGE_QUEUE_KEY, _PURPOSE), time.time() + _DELIVERY_RETRY_SECONDS, queue_id),
+    )
+    _counters["delivery_retries"] += 1
+
+
+def _replay_one(row: Any) -> None:
+    queue_id, case_id, vendor, stage, sealed, enqueued_at, _, sealed_result = row[:8]
+    conn = _conn()
+    try:
+        request = unseal(sealed)
+        result = sealing.unseal(sealed_result, settings.OUTAGE_QUEUE_KEY, _PURPOSE) if sealed_result else None
+    except ValueError:
+        # Sealed under another key (rotated since): the callback cannot even be addressed
+        logger.error("outage queue row %s (case %s) cannot be decrypted; dropped", queue_id, case_id)
+        conn.execute("DELETE FROM outage_queue WHERE id = ?", (queue_id,))
+        _counters["undecryptable"] += 1
+        return
+    callback = request.get("replay_callback") or {}
+    if result is not None:
+        _deliver(queue_id, case_id, enqueued_at, callback, result, "redelivered")
+        return
+    if time.time() - enqueued_at > settings.OUTAGE_QUEUE_MAX_AGE_SECONDS:
+        _deliver(queue_id, case_id, enqueued_at, callback, _expired_payload(case_id, stage), "expired")
+        return
+    try:
+        # In a copy of the monitor's context: the workflow's deadline, spend ledger and priority class end with it
+        result = contextvars.copy_context().run(_run_replay, request)
+    except VendorUnavailable as e:
+        mark_down(e.vendor)
+        conn.execute("UPDATE outage_queue SET state = 'queued', claimed_at = NULL, vendor = ? WHERE id = ?", (e.vendor, queue_id))
+        _counters["requeued"] += 1
+        return
+    except Exception as e:
+        result = {**_expired_payload(case_id, stage), "error": f"replay failed: {e}"}
+        _counters["replay_errors"] += 1
+    _deliver(queue_id, case_id, enqueued_at, callback, result, "replayed")
+
+
+def run_monitor_once() -> int:
+    """
+    One monitor pass: probe vendors marked down, then replay queued rows whose vendor is up. Returns rows handled.
+    """
+    for vendor in list(_down):
+        if _probe(vendor):
+            with _lock:
+                since = _down.pop(vendor, None)
+            if since is not None:
+                logger.warning("vendor %s healthy again after %.0fs", vendor, time.time() - since)
+    handled = 0
+    interval = 1.0 / settings.OUTAGE_REPLAY_RATE if settings.OUTAGE_REPLAY_RATE > 0 else 0.0
+    while _replayer is not None:
+        row = _claim(list(_down))
+        if row is None:
+            break
+        started = time.monotonic()
+        _replay_one(row)
+        handled += 1
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    return handled
+
+
+def _monitor() -> None:
+    while True:
+        try:
+            run_monitor_once()
+        except Exception:
+            logger.exception("outage monitor pass failed")
+        time.sleep(settings.OUTAGE_HEALTH_INTERVAL_SECONDS)
+
+
+_monitor_thread: Optional[threading.Thread] = None
+
+
+def ensure_monitor() -> None:
+    global _monitor_thread
+    with _lock:
+        if _monitor_thread is None and enabled():
+            _monitor_thread = threading.Thread(target=_monitor, name="taktile-outage", daemon=True)
+            _monitor_thread.start()
+
+
+def _pending() -> int:
+    return int(_conn().execute("SELECT COUNT(*) FROM outage_queue WHERE state IN ('queued', 'replaying')").fetchone()[0])
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/admin/outage")
+def outage_state() -> Dict[str, Any]:
+    rows = _conn().execute("SELECT state, vendor, COUNT(*) FROM outage_queue GROUP BY state, vendor").fetchall()
+    queue: Dict[str, Dict[str, int]] = {}
+    for state, vendor, n in rows:
+        queue.setdefault(state, {})[vendor] = n
+    return {
+        "enabled": enabled(),
+        "down": {vendor: round(time.time() - since, 1) for vendor, since in dict(_down).items()},
+        "queue": queue,
+        "replay_rate": settings.OUTAGE_REPLAY_RATE,
+        "counters": dict(_counters),
+    }
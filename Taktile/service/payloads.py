@@ -0,0 +1,311 @@
+"""
+Compression of stored vendor payloads with a dictionary trained per vendor (zlib `zdict`).
+
+Raw SEON and Experian responses repeat the same keys, enum values and nesting from case to case, but a single
+payload is too short for zlib to learn much of that from the payload alone. A preset dictionary holding the
+fragments that recur across a vendor's responses lets even the first bytes of a payload be coded as back-references.
+
+`pack(vendor, payload)` turns a JSON payload into "zd1:<vendor>:<version>:<base64 zlib>", so it is still a JSON value
+for the cache backend; `unpack` reverses it and passes any other value through (payloads stored before compression,
+or while PAYLOAD_COMPRESSION is off). `pack_result` / `unpack_result` do that for the *_raw fields of a stage result.
+
+Dictionaries are versioned: PAYLOAD_DICT_DIR/<vendor>.v<version>.zdict. New blobs use the highest version; older
+files are kept so the blobs written with them still decode (zlib also checks the dictionary's checksum).
+Version 0 is plain zlib, used until a vendor's first dictionary exists. Every packed payload is kept as a training
+sample (the last PAYLOAD_DICT_SAMPLES per vendor). The first dictionary is trained automatically once that many
+are held, on a background thread: the request that collects the last sample is not held up, and payloads keep
+being written as v0 until the dictionary is stored. `train(vendor)` trains the next version from the current
+samples (e.g. after a vendor changes its response format). Workers sharing PAYLOAD_DICT_DIR pick up new versions within PAYLOAD_DICT_RESCAN_SECONDS.
+
+`python -m Taktile.runner.bench_payload_dict` compares the ratio and encode/decode cost with plain gzip.
+
+GET /admin/payloads — per vendor: dictionary versions, samples held, bytes before/after and encode/decode time
+POST /admin/payloads/train?vendor=seon_fraud — train and store the next dictionary version from the held samples
+"""
+import base64
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from Taktile.clients.experian import RawJSON, decoded
+from Taktile.service import memory
+from Taktile.service.config import settings
+from Taktile.service.security import require_admin
+
+
+logger = logging.getLogger("taktile.payloads")
+
+# Stage result field -> vendor whose response it holds (credit_raw is a bureau report in Experian's layout)
+RAW_FIELDS = {"aml_raw": "seon_aml", "fraud_raw": "seon_fraud", "credit_raw": "experian"}
+
+_PREFIX = "zd1:"
+_FILE = re.compile(r"^([a-z0-9_]+)\.v(\d+)\.zdict$")
+
+# JSON text split into string literals (a key keeps its colon) and the runs of numbers/punctuation between them
+_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*":?|[^"]+')
+# Longest fragment considered, in tokens: `"key":"value",` pairs and short runs of them
+_MAX_NGRAM = 4
+# A fragment must occur in at least this share of the samples to enter a dictionary
+_MIN_SHARE = 0.2
+
+
+def _serialize(payload: Any) -> bytes:
+    if isinstance(payload, RawJSON):
+        return payload.encode("utf-8")  # already JSON text (a full report passed through undecoded)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def train_dictionary(samples: Iterable[bytes], size: int) -> bytes:
+    """
+    Build a zlib preset dictionary of at most `size` bytes from serialized payloads.
+
+    Fragments (1 to _MAX_NGRAM consecutive tokens) are scored by the number of samples they occur in times their
+    length, i.e. the bytes they would save. The best ones are taken until the dictionary is full, skipping
+    fragments already contained in it, and written best-last: zlib reaches the end of the dictionary with the
+    shortest distances.
+    """
+    samples = list(samples)
+    if len(samples) < 2:
+        raise ValueError("at least 2 samples are needed to train a dictionary")
+    seen_in: Counter = Counter()
+    for sample in samples:
+        tokens = _TOKEN.findall(sample.decode("utf-8"))
+        fragments = set()
+        for n in range(1, _MAX_NGRAM + 1):
+            for i in range(len(tokens) - n + 1):
+                fragments.add("".join(tokens[i:i + n]))
+        seen_in.update(fragments)
+    min_count = max(2, int(len(samples) * _MIN_SHARE))
+    ranked = sorted(
+        ((count * len(f), f) for f, count in seen_in.items() if count >= min_count and len(f) > 3),
+        reverse=True,
+    )
+    chosen: List[str] = []
+    text = ""
+    used = 0
+    for _, fragment in ranked:
+        n = len(fragment.encode("utf-8"))
+        if used + n > size:
+            continue
+        if fragment in text:
+            continue
+        chosen.append(fragment)
+        text += fragment
+        used += n
+    return "".join(reversed(chosen)).encode("utf-8")
+
+
+def compress(raw: bytes, zdict: Optional[bytes], level: int) -> bytes:
+    c = zlib.compressobj(level, zdict=zdict) if zdict else zlib.compressobj(level)
+    return c.compress(raw) + c.flush()
+
+
+def decompress(data: bytes, zdict: Optional[bytes]) -> bytes:
+    d = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    return d.decompress(data) + d.flush()
+
+
+class DictionaryStore:
+    """
+    Versioned dictionaries of each vendor on disk, cached in memory, plus the vendor's training samples.
+    """
+
+    def __init__(self, directory: str, max_samples: int) -> None:
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._dicts: Dict[Tuple[str, int], bytes] = {}
+        self._latest: Dict[str, int] = {}
+        self._scanned_at = 0.0
+        self.samples: Dict[str, Deque[bytes]] = {}
+        self._max_samples = max_samples
+
+    def _scan(self) -> None:
+        latest: Dict[str, int] = {}
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                m = _FILE.match(name)
+                if m:
+                    latest[m.group(1)] = max(latest.get(m.group(1), 0), int(m.group(2)))
+        self._latest = latest
+        self._scanned_at = time.time()
+
+    def _path(self, vendor: str, version: int) -> str:
+        return os.path.join(self.directory, f"{vendor}.v{version}.zdict")
+
+    def get(self, vendor: str, version: int) -> Optional[bytes]:
+        """
+        Dictionary `version` of `vendor` (None for version 0); KeyError if no such file exists.
+        """
+        if version == 0:
+            return None
+        with self._lock:
+            zdict = self._dicts.get((vendor, version))
+            if zdict is None:
+                try:
+                    with open(self._path(vendor, version), "rb") as f:
+                        zdict = f.read()
+                except FileNotFoundError:
+                    raise KeyError(f"{vendor} dictionary v{version}") from None
+                self._dicts[(vendor, version)] = zdict
+            return zdict
+
+    def current(self, vendor: str) -> Tuple[int, Optional[bytes]]:
+        with self._lock:
+            if time.time() - self._scanned_at > settings.PAYLOAD_DICT_RESCAN_SECONDS:
+                self._scan()
+            version = self._latest.get(vendor, 0)
+        return version, self.get(vendor, version)
+
+    def versions(self) -> Dict[str, int]:
+        with self._lock:
+            self._scan()
+            return dict(self._latest)
+
+    def add_sample(self, vendor: str, raw: bytes) -> int:
+        with self._lock:
+            held = self.samples.get(vendor)
+            if held is None:
+                held = self.samples[vendor] = deque(maxlen=self._max_samples)
+            held.append(raw)
+            return len(held)
+
+    def train(self, vendor: str, size: int) -> int:
+        """
+        Train the next dictionary version of `vendor` from its samples and store it. Returns the new version.
+        """
+        with self._lock:
+            samples = list(self.samples.get(vendor) or ())
+        zdict = train_dictionary(samples, size)
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            self._scan()
+            version = self._latest.get(vendor, 0) + 1
+            while True:
+                try:
+                    # Exclusive create: another worker training at the same time takes the next number instead
+                    with open(self._path(vendor, version), "xb") as f:
+                        f.write(zdict)
+                    break
+                except FileExistsError:
+                    version += 1
+            self._dicts[(vendor, version)] = zdict
+            self._latest[vendor] = version
+        return version
+
+
+_store = DictionaryStore(settings.PAYLOAD_DICT_DIR, settings.PAYLOAD_DICT_SAMPLES)
+_stats_lock = threading.Lock()
+# vendor -> packed, unpacked, raw_bytes, stored_bytes, pack_seconds, unpack_seconds
+_stats: Dict[str, Counter] = {}
+memory.register_store("payloads.samples", lambda: _store.samples)
+
+
+# Automatic first dictionaries are trained here, one at a time, off the request path
+_trainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="taktile-payload-dict")
+_training: set = set()  # vendors whose automatic training is queued or running
+
+
+def _count(vendor: str, **values: float) -> None:
+    with _stats_lock:
+        _stats.setdefault(vendor, Counter()).update(values)
+
+
+def train(vendor: str) -> int:
+    return _store.train(vendor, settings.PAYLOAD_DICT_SIZE)
+
+
+def _auto_train(vendor: str) -> None:
+    try:
+        # Unless another worker has written a first dictionary since the last rescan
+        if not _store.versions().get(vendor):
+            train(vendor)
+    except Exception:
+        logger.exception("automatic %s dictionary training failed", vendor)
+    finally:
+        with _stats_lock:
+            _training.discard(vendor)
+
+
+def _train_in_background(vendor: str) -> None:
+    with _stats_lock:
+        if vendor in _training:
+            return
+        _training.add(vendor)
+    _trainer.submit(_auto_train, vendor)
+
+
+def pack(vendor: str, payload: Any) -> Any:
+    if payload is None or not settings.PAYLOAD_COMPRESSION:
+        return decoded(payload)
+    t0 = time.perf_counter()
+    raw = _serialize(payload)
+    version, zdict = _store.current(vendor)
+    blob = f"{_PREFIX}{vendor}:{version}:{base64.b64encode(compress(raw, zdict, settings.PAYLOAD_COMPRESSLEVEL)).decode('ascii')}"
+    _count(vendor, packed=1, raw_bytes=len(raw), stored_bytes=len(blob), pack_seconds=time.perf_counter() - t0)
+    held = _store.add_sample(vendor, raw)
+    # First dictionary of the vendor; until it is stored, payloads stay plain zlib (v0)
+    if version == 0 and held >= max(2, settings.PAYLOAD_DICT_SAMPLES):
+        _train_in_background(vendor)
+    return blob
+
+
+def unpack(value: Any) -> Any:
+    if not isinstance(value, str) or not value.startswith(_PREFIX):
+        return value
+    t0 = time.perf_counter()
+    vendor, version, data = value[len(_PREFIX):].split(":", 2)
+    payload = json.loads(decompress(base64.b64decode(data), _store.get(vendor, int(version))))
+    _count(vendor, unpacked=1, unpack_seconds=time.perf_counter() - t0)
+    return payload
+
+
+def pack_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: (pack(RAW_FIELDS[k], v) if k in RAW_FIELDS else v) for k, v in result.items()}
+
+
+def unpack_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: (unpack(v) if k in RAW_FIELDS else v) for k, v in result.items()}
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/admin/payloads")
+def payloads_summary() -> Dict[str, Any]:
+    versions = _store.versions()
+    with _stats_lock:
+        stats = {vendor: dict(c) for vendor, c in _stats.items()}
+    vendors: Dict[str, Any] = {}
+    for vendor in sorted(set(versions) | set(stats) | set(_store.samples)):
+        s = stats.get(vendor, {})
+        packed, unpacked = s.get("packed", 0), s.get("unpacked", 0)
+        vendors[vendor] = {
+            "dictionary_version": versions.get(vendor, 0),
+            "samples": len(_store.samples.get(vendor) or ()),
+            "packed": packed,
+            "unpacked": unpacked,
+            "raw_bytes": s.get("raw_bytes", 0),
+            "stored_bytes": s.get("stored_bytes", 0),
+            "ratio": round(s["raw_bytes"] / s["stored_bytes"], 2) if s.get("stored_bytes") else None,
+            "mean_pack_us": round(s["pack_seconds"] / packed * 1e6, 1) if packed else None,
+            "mean_unpack_us": round(s["unpack_seconds"] / unpacked * 1e6, 1) if unpacked else None,
+        }
+    return {"enabled": settings.PAYLOAD_COMPRESSION, "dir": settings.PAYLOAD_DICT_DIR, "vendors": vendors}
+
+
+@router.post("/admin/payloads/train")
+def payloads_train(vendor: str = Query(..., pattern="^[a-z0-9_]+$")) -> Dict[str, Any]:
+    try:
+        version = train(vendor)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"vendor": vendor, "version": version, "samples": len(_store.samples.get(vendor) or ())}
@@ -0,0 +1,217 @@
+"""
+Prefetch of S1 (AML) and S2 (fraud) while the applicant is still filling in the form.
+
+`POST /workflows/kyc/prefetch` takes a partial intake and starts every eligible SEON call in the background.
+AML needs user_fullname, user_dob and email; fraud needs email and phone_number. The call returns a token at
+once. The final `/workflows/kyc/full` request passes the token as `prefetch_token`, and each prefetched stage
+replaces its vendor round trip there. T1/T2 still run at submit time, on the final intake.
+
+A prefetched response is used only when the vendor payload built from the final intake is identical to the
+one that was sent. The entry stores a SHA-256 fingerprint of that payload, so an applicant who edits their
+email after the prefetch gets a fresh call. Custom fields only income and employment read (income_*,
+employment_*) are left out of the fingerprint, as for stored case results: choosing income options after the
+prefetch does not discard it. Calling prefetch again with the same token starts only the
+stages whose payload changed. Each result is used at most once.
+
+Results are kept for PREFETCH_TTL_SECONDS in the shared cache backend (namespace "prefetch"). When the
+submit arrives while a call from this process is still in flight, it waits for that call instead of
+starting another. Calls in flight on another worker are not visible, and the submit then calls the
+vendor itself. Prefetch calls are charged to global spend when made, and to the case's ledger when used.
+Intakes that hit the negative cache are not prefetched.
+
+Prefetch calls are speculative and billed, and the form re-sends its fields after every edit, so each token has
+a spend ledger of its own (kept with the token, across workers): a call starts only if `spend.allow(vendor,
+"speculative")` finds its price within what is left of CASE_SPEND_BUDGET, and at most PREFETCH_MAX_CALLS calls
+start per token. A stage whose payload fingerprint equals the last one started under the token is not called
+again, even once that result has been used or the call failed.
+
+GET /admin/prefetch — entries stored, calls in flight, and per stage calls started, used, stale (payload changed),
+                      missed and failed
+"""
+import hashlib
+import json
+import secrets
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import APIRouter, Depends
+
+from Taktile.service import cases, deadline, memory, negative_cache, scheduler, spend
+from Taktile.service.cache import get_cache
+from Taktile.service.config import settings
+from Taktile.service.security import require_admin
+from Taktile.stages.S1 import build_aml_payload, run_aml
+from Taktile.stages.S2 import build_fraud_payload, run_fraud
+
+
+# Stage -> (intake fields required before the call is worth making, payload builder, S* call, raw key)
+STAGES: Dict[str, Tuple[Tuple[str, ...], Callable[[Dict[str, Any]], Dict[str, Any]], Callable[..., Dict[str, Any]], str]] = {
+    "aml": (("user_fullname", "user_dob", "email"), build_aml_payload, run_aml, "aml_raw"),
+    "fraud": (("email", "phone_number"), build_fraud_payload, run_fraud, "fraud_raw"),
+}
+STAGE_VENDORS = {"aml": "seon_aml", "fraud": "seon_fraud"}
+
+_store = get_cache("prefetch", max_entries=settings.PREFETCH_MAX_ENTRIES, default_ttl=settings.PREFETCH_TTL_SECONDS)
+_executor = ThreadPoolExecutor(max_workers=settings.PREFETCH_WORKERS, thread_name_prefix="taktile-prefetch")
+# (token, stage) -> (fingerprint, future) for calls started by this process
+_inflight: Dict[Tuple[str, str], Tuple[str, Future]] = {}
+_lock = threading.Lock()
+_counters: Counter = Counter()
+
+memory.register_store("prefetch.inflight", lambda: _inflight)
+
+
+def fingerprint(stage: str, intake: Dict[str, Any]) -> str:
+    payload = STAGES[stage][1](cases.without_late_fields(intake))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def eligible(stage: str, intake: Dict[str, Any]) -> bool:
+    return all(str(intake.get(field) or "").strip() for field in STAGES[stage][0])
+
+
+def _ledger(meta: Dict[str, Any]) -> spend.Ledger:
+    """
+    A ledger holding what is left of the token's budget (CASE_SPEND_BUDGET less what its prefetches spent).
+    """
+    budget = settings.CASE_SPEND_BUDGET
+    return spend.Ledger(max(0.0, budget - meta.get("spend", 0.0)) if budget > 0 else None)
+
+
+def _add_spend(token: str, amount: float) -> None:
+    with _lock:
+        meta = _store.get(f"{token}:meta")
+        if meta is not None:
+            meta["spend"] = meta.get("spend", 0.0) + amount
+            _store.set(f"{token}:meta", meta)
+
+
+def _fetch(token: str, stage: str, fp: str, intake: Dict[str, Any], ledger: spend.Ledger, reserved: float) -> None:
+    _, call, raw_key = STAGES[stage][1:]
+    started = time.perf_counter()
+    try:
+        raw = spend.bound(ledger, call)(token, intake)[raw_key]
+        _store.set(
+            f"{token}:{stage}",
+            {
+                "fingerprint": fp,
+                "raw": raw,
+                "seconds": time.perf_counter() - started,
+                "calls": dict(ledger.calls),
+                "spend": dict(ledger.spend),
+            },
+        )
+    except Exception:
+        _counters[f"{stage}_failed"] += 1
+        raise
+    finally:
+        # The start reserved the call's list price; settle it to what was actually charged (retries included)
+        _add_spend(token, ledger.total - reserved)
+        with _lock:
+            if _inflight.get((token, stage), ("", None))[0] == fp:
+                del _inflight[(token, stage)]
+
+
+def start(intake: Dict[str, Any], token: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Start the eligible stages for `intake` under `token` (a new token unless a live one is passed).
+    Returns {token, stages: {stage: started | unchanged | ineligible | skipped | capped | over_budget}, expires_in}.
+    """
+    meta = _store.get(f"{token}:meta") if token else None
+    if meta is None:
+        token = secrets.token_urlsafe(16)
+        meta = {"created": time.time(), "calls": 0, "spend": 0.0, "fingerprints": {}}
+        _store.set(f"{token}:meta", meta)
+    if negative_cache.check(intake) is not None:
+        return {"token": token, "stages": {stage: "skipped" for stage in STAGES}, "expires_in": settings.PREFETCH_TTL_SECONDS}
+
+    stages: Dict[str, str] = {}
+    run = scheduler.bound(scheduler.current_class(), _fetch)
+    for stage in STAGES:
+        if not eligible(stage, intake):
+            stages[stage] = "ineligible"
+            continue
+        fp = fingerprint(stage, intake)
+        vendor = STAGE_VENDORS[stage]
+        with _lock:
+            meta = _store.get(f"{token}:meta") or meta
+            if meta["fingerprints"].get(stage) == fp:
+                stages[stage] = "unchanged"
+                continue
+            if meta["calls"] >= settings.PREFETCH_MAX_CALLS:
+                _counters[f"{stage}_capped"] += 1
+                stages[stage] = "capped"
+                continue
+            ledger = _ledger(meta)
+            if not spend.bound(ledger, spend.allow)(vendor, "speculative"):
+                stages[stage] = "over_budget"
+                continue
+            price = spend.unit_cost(vendor)
+            meta["calls"] += 1
+            meta["spend"] = meta.get("spend", 0.0) + price
+            meta["fingerprints"][stage] = fp
+            _store.set(f"{token}:meta", meta)
+            _inflight[(token, stage)] = (fp, _executor.submit(run, token, stage, fp, dict(intake), ledger, price))
+        _counters[f"{stage}_started"] += 1
+        stages[stage] = "started"
+    return {"token": token, "stages": stages, "expires_in": settings.PREFETCH_TTL_SECONDS}
+
+
+def take(token: Optional[str], stage: str, intake: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    The prefetched result of `stage` for this exact intake, or None (then call the vendor as usual).
+    Waits, within the workflow deadline, for a matching call still in flight in this process. The result is
+    consumed: {raw, seconds, calls, spend}.
+    """
+    if not token:
+        return None
+    fp = fingerprint(stage, intake)
+    with _lock:
+        inflight = _inflight.get((token, stage))
+    if inflight is not None and inflight[0] == fp:
+        try:
+            inflight[1].result(timeout=deadline.remaining())
+        except FutureTimeout:
+            _counters[f"{stage}_timed_out"] += 1
+            return None
+        except Exception:
+            return None
+    entry = _store.get(f"{token}:{stage}")
+    if entry is None:
+        _counters[f"{stage}_missed"] += 1
+        return None
+    _store.delete(f"{token}:{stage}")
+    if entry["fingerprint"] != fp:
+        _counters[f"{stage}_stale"] += 1
+        return None
+    _counters[f"{stage}_used"] += 1
+    return entry
+
+
+def absorb(ledger: spend.Ledger, entry: Dict[str, Any]) -> float:
+    """
+    Add a used prefetch's charges to the case ledger (global totals already have them); returns their sum.
+    """
+    for vendor, calls in entry["calls"].items():
+        for _ in range(calls):
+            ledger.charge(vendor, entry["spend"][vendor] / calls)
+    return sum(entry["spend"].values())
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/admin/prefetch")
+def prefetch_state() -> Dict[str, Any]:
+    with _lock:
+        inflight = len(_inflight)
+    return {
+        "enabled": settings.PREFETCH_ENABLED,
+        "ttl_seconds": settings.PREFETCH_TTL_SECONDS,
+        "store_entries": len(_store),
+        "in_flight": inflight,
+        "counters": dict(_counters),
+    }
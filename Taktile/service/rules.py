@@ -0,0 +1,135 @@
+"""
+Sampled per-rule instrumentation of the T1–T4 policies (per worker process).
+
+Each named rule of a policy (a KO check, a review trigger, a flag scan) reports whether it hit and how long it
+took to evaluate. Only a RULE_SAMPLE_RATE share of evaluations is instrumented: a policy calls `trace(stage)`
+once at the start and gets either a Tracer or the no-op OFF, so an unsampled evaluation costs one random()
+and a no-op call per rule.
+
+Timing is by laps: `tracer.lap(rule, hit)` charges the rule with the time since the previous lap (or since
+`trace`), so laps placed at rule boundaries time each rule without wrapping it. Code between rules that is
+not a rule itself (choosing the income source, the scorecard) gets a lap of its own with hit False.
+The key space is the policies' closed set of rule names.
+
+GET /admin/rules?stage=T3&sort=seconds — per rule: sampled evaluations, hits, hit rate, total and mean time
+POST /admin/rules/reset — clear the counters
+"""
+import random
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, Query
+
+from Taktile.service import memory
+from Taktile.service.config import settings
+from Taktile.service.security import require_admin
+
+
+class RuleRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # (stage, rule) -> [evaluations, hits, seconds]
+        self._rules: Dict[Tuple[str, str], List[float]] = {}
+        self._sampled: Counter = Counter()  # stage -> instrumented evaluations
+
+    def start(self, stage: str) -> None:
+        with self._lock:
+            self._sampled[stage] += 1
+
+    def add(self, stage: str, rule: str, hit: bool, seconds: float) -> None:
+        with self._lock:
+            entry = self._rules.get((stage, rule))
+            if entry is None:
+                entry = self._rules[(stage, rule)] = [0, 0, 0.0]
+            entry[0] += 1
+            entry[1] += hit
+            entry[2] += seconds
+
+    def snapshot(self) -> Tuple[Dict[Tuple[str, str], List[float]], Dict[str, int]]:
+        with self._lock:
+            return {k: list(v) for k, v in self._rules.items()}, dict(self._sampled)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._rules.clear()
+            self._sampled.clear()
+
+
+_registry = RuleRegistry()
+memory.register_store("rules.registry", lambda: _registry._rules)
+
+
+class Tracer:
+    __slots__ = ("stage", "_last")
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+        _registry.start(stage)
+        self._last = time.perf_counter()
+
+    def lap(self, rule: str, hit: Any = False) -> None:
+        _registry.add(self.stage, rule, bool(hit), time.perf_counter() - self._last)
+        self._last = time.perf_counter()  # the registry's own time is not charged to the next rule
+
+
+class _Off:
+    __slots__ = ()
+
+    def lap(self, rule: str, hit: Any = False) -> None:
+        pass
+
+
+OFF = _Off()
+
+
+def trace(stage: str) -> Any:
+    """
+    A Tracer for this evaluation of `stage` (T1..T4) when it is sampled, else OFF.
+    """
+    rate = settings.RULE_SAMPLE_RATE
+    if rate > 0 and (rate >= 1 or random.random() < rate):
+        return Tracer(stage)
+    return OFF
+
+
+def summary(stage: Optional[str] = None, sort: str = "seconds") -> Dict[str, Any]:
+    rules, sampled = _registry.snapshot()
+    stages: Dict[str, List[Dict[str, Any]]] = {}
+    for (st, rule), (evaluations, hits, seconds) in rules.items():
+        if stage is not None and st != stage:
+            continue
+        stages.setdefault(st, []).append({
+            "rule": rule,
+            "evaluations": int(evaluations),
+            "hits": int(hits),
+            "hit_rate": round(hits / evaluations, 4) if evaluations else None,
+            "total_ms": round(seconds * 1000, 3),
+            "mean_us": round(seconds / evaluations * 1e6, 2) if evaluations else None,
+        })
+    key = {"seconds": "total_ms", "hits": "hits", "hit_rate": "hit_rate"}[sort]
+    for entries in stages.values():
+        entries.sort(key=lambda r: r[key] or 0, reverse=True)
+    return {
+        "sample_rate": settings.RULE_SAMPLE_RATE,
+        "sampled_evaluations": {st: n for st, n in sorted(sampled.items()) if stage is None or st == stage},
+        "stages": dict(sorted(stages.items())),
+    }
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/admin/rules")
+def rules_summary(
+    stage: Optional[str] = Query(default=None, pattern="^T[1-4]$"),
+    sort: str = Query(default="seconds", pattern="^(seconds|hits|hit_rate)$"),
+) -> Dict[str, Any]:
+    return summary(stage, sort)
+
+
+@router.post("/admin/rules/reset")
+def rules_reset() -> Dict[str, Any]:
+    _registry.reset()
+    return {"reset": True}
@@ -0,0 +1,240 @@
+"""
+Priority lanes for vendor calls: weighted fair queueing per vendor (per worker process).
+
+Each workflow runs in a priority class taken from the `X-Priority-Class` request header. Unknown or missing
+classes fall back to PRIORITY_DEFAULT_CLASS. Classes come from PRIORITY_CLASSES as "name:weight[:max_share]",
+e.g. "interactive:8,batch:1:0.75".
+
+Every vendor pool (seon, experian, equifax, transunion, plaid) allows at most VENDOR_CONCURRENCY_* calls in flight. While a slot
+is free and nobody is queued, a call goes straight through. Otherwise it queues with a virtual finish tag,
+max(virtual time, class's last tag) + 1 / weight, and freed slots go to the smallest tag. Under contention,
+each class therefore gets slots in proportion to its weight; when there is none, batch work uses the
+spare capacity.
+`max_share` caps the slots a class may hold at once. Calls are not preempted, so capping batch keeps a
+slot free for the next interactive call. Queued calls give up when the workflow deadline passes.
+
+GET /admin/scheduler — slots, in-flight and queued calls, calls served and recent queue wait p50/p99 per class
+"""
+import math
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from fastapi import APIRouter, Depends
+
+from Taktile.service import deadline
+from Taktile.service.config import settings
+from Taktile.service.security import require_admin
+from Taktile.service.sketch import SlidingSketch
+
+
+T = TypeVar("T")
+
+HEADER = "X-Priority-Class"
+
+# Vendor (as charged in spend) -> concurrency pool
+POOLS = {
+    "seon_aml": "seon",
+    "seon_fraud": "seon",
+    "experian": "experian",
+    "equifax": "equifax",
+    "transunion": "transunion",
+    "plaid": "plaid",
+}
+
+
+def parse_classes(spec: str) -> Dict[str, Tuple[float, float]]:
+    """
+    "interactive:8,batch:1:0.75" -> {"interactive": (8.0, 1.0), "batch": (1.0, 0.75)}
+    """
+    classes: Dict[str, Tuple[float, float]] = {}
+    for part in spec.split(","):
+        fields = [f.strip() for f in part.split(":")]
+        if not fields[0]:
+            continue
+        weight = float(fields[1]) if len(fields) > 1 and fields[1] else 1.0
+        max_share = float(fields[2]) if len(fields) > 2 and fields[2] else 1.0
+        classes[fields[0]] = (max(weight, 1e-6), min(max(max_share, 0.0), 1.0))
+    return classes
+
+
+CLASSES = parse_classes(settings.PRIORITY_CLASSES)
+
+_class: ContextVar[Optional[str]] = ContextVar("taktile_priority_class", default=None)
+
+
+def set_class(name: Optional[str]) -> str:
+    """
+    Set the priority class of the workflow running in the current context; returns the class in effect.
+    """
+    cls = name if name in CLASSES else settings.PRIORITY_DEFAULT_CLASS
+    _class.set(cls)
+    return cls
+
+
+def current_class() -> str:
+    return _class.get() or settings.PRIORITY_DEFAULT_CLASS
+
+
+def bound(cls: str, fn: Callable[..., T]) -> Callable[..., T]:
+    """
+    Wrap `fn` so that it keeps priority class `cls` when run on another thread.
+    """
+
+    def run(*args: Any, **kwargs: Any) -> T:
+        token = _class.set(cls)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _class.reset(token)
+
+    return run
+
+
+class _Waiter:
+    __slots__ = ("cls", "tag", "seq", "event", "granted")
+
+    def __init__(self, cls: str, tag: float, seq: int) -> None:
+        self.cls = cls
+        self.tag = tag
+        self.seq = seq
+        self.event = threading.Event()
+        self.granted = False
+
+
+class FairScheduler:
+    def __init__(self, name: str, slots: int, classes: Dict[str, Tuple[float, float]]) -> None:
+        self.name = name
+        self.slots = slots
+        self.classes = classes
+        self.in_flight = 0
+        self.in_flight_by_class: Counter = Counter()
+        self.served: Counter = Counter()
+        self.timed_out: Counter = Counter()
+        self.waits = {cls: SlidingSketch(300.0, 5, 100) for cls in classes}
+        self._queue: List[_Waiter] = []
+        self._vtime = 0.0
+        self._last_tag: Dict[str, float] = {cls: 0.0 for cls in classes}
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def cap(self, cls: str) -> int:
+        return max(1, int(math.floor(self.slots * self.classes[cls][1])))
+
+    def _eligible(self, cls: str) -> bool:
+        return self.in_flight < self.slots and self.in_flight_by_class[cls] < self.cap(cls)
+
+    def _grant(self, cls: str) -> None:
+        self.in_flight += 1
+        self.in_flight_by_class[cls] += 1
+        self.served[cls] += 1
+
+    def _dispatch(self) -> None:
+        while self._queue and self.in_flight < self.slots:
+            ready = [w for w in self._queue if self.in_flight_by_class[w.cls] < self.cap(w.cls)]
+            if not ready:
+                return
+            waiter = min(ready, key=lambda w: (w.tag, w.seq))
+            self._queue.remove(waiter)
+            self._vtime = max(self._vtime, waiter.tag)
+            self._grant(waiter.cls)
+            waiter.granted = True
+            waiter.event.set()
+
+    def acquire(self, cls: str, timeout: Optional[float] = None) -> float:
+        """
+        Take a slot for class `cls`, waiting at most `timeout` seconds; returns the seconds spent queued.
+        Raises DeadlineExceeded when the wait times out.
+        """
+        started = time.monotonic()
+        with self._lock:
+            if not self._queue and self._eligible(cls):
+                self._grant(cls)
+                self.waits[cls].update(0.0)
+                return 0.0
+            weight = self.classes[cls][0]
+            tag = max(self._vtime, self._last_tag[cls]) + 1.0 / weight
+            self._last_tag[cls] = tag
+            self._seq += 1
+            waiter = _Waiter(cls, tag, self._seq)
+            self._queue.append(waiter)
+            self._dispatch()
+        if not waiter.event.wait(timeout):
+            with self._lock:
+                if not waiter.granted:
+                    self._queue.remove(waiter)
+                    self.timed_out[cls] += 1
+                    raise deadline.DeadlineExceeded(f"deadline exceeded waiting for a {self.name} slot")
+        waited = time.monotonic() - started
+        self.waits[cls].update(waited)
+        return waited
+
+    def release(self, cls: str) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.in_flight_by_class[cls] -= 1
+            self._dispatch()
+
+    def describe(self) -> Dict[str, Any]:
+        with self._lock:
+            queued = Counter(w.cls for w in self._queue)
+            in_flight = dict(self.in_flight_by_class)
+        classes = {}
+        for cls, (weight, max_share) in self.classes.items():
+            p50, p99 = self.waits[cls].window().quantiles([0.5, 0.99])
+            classes[cls] = {
+                "weight": weight,
+                "max_slots": self.cap(cls),
+                "in_flight": in_flight.get(cls, 0),
+                "queued": queued.get(cls, 0),
+                "served": self.served[cls],
+                "timed_out": self.timed_out[cls],
+                "wait_p50_ms": None if p50 is None else round(p50 * 1000, 1),
+                "wait_p99_ms": None if p99 is None else round(p99 * 1000, 1),
+            }
+        return {"slots": self.slots, "in_flight": self.in_flight, "classes": classes}
+
+
+def _pools() -> Dict[str, FairScheduler]:
+    limits = {
+        "seon": settings.VENDOR_CONCURRENCY_SEON,
+        "experian": settings.VENDOR_CONCURRENCY_EXPERIAN,
+        "equifax": settings.VENDOR_CONCURRENCY_EQUIFAX,
+        "transunion": settings.VENDOR_CONCURRENCY_TRANSUNION,
+        "plaid": settings.VENDOR_CONCURRENCY_PLAID,
+    }
+    return {name: FairScheduler(name, slots, CLASSES) for name, slots in limits.items() if slots > 0}
+
+
+schedulers = _pools()
+
+
+@contextmanager
+def slot(vendor: Optional[str]) -> Iterator[None]:
+    """
+    Hold a concurrency slot of `vendor`'s pool for the current class (no-op for unlimited pools).
+    """
+    sched = schedulers.get(POOLS.get(vendor or "", vendor or ""))
+    if sched is None:
+        yield
+        return
+    cls = current_class()
+    sched.acquire(cls, deadline.remaining())
+    try:
+        yield
+    finally:
+        sched.release(cls)
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/admin/scheduler")
+def scheduler_state() -> Dict[str, Any]:
+    return {
+        "default_class": settings.PRIORITY_DEFAULT_CLASS,
+        "pools": {name: sched.describe() for name, sched in schedulers.items()},
+    }
@@ -0,0 +1,53 @@
+"""
+Authenticated encryption of small JSON values kept at rest (outage queue rows, stored intakes and vendor payloads).
+
+AES-256-GCM from `cryptography`, with a random 96-bit nonce per value. The key is derived from the caller's secret
+with HKDF-SHA256, per purpose, and the purpose is also the associated data: one secret never encrypts two kinds of
+data with the same key, and a blob sealed for one purpose does not open for another. A blob is base64 text, so it
+can be stored as a JSON string. Secrets that are empty or the "change-me" placeholder are not usable: callers keep
+the data off disk.
+"""
+import base64
+import binascii
+import json
+import os
+from functools import lru_cache
+from typing import Any
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+
+PLACEHOLDER_KEYS = ("", "change-me")
+
+_NONCE_BYTES = 12
+
+
+def usable(secret: str) -> bool:
+    return secret not in PLACEHOLDER_KEYS
+
+
+@lru_cache(maxsize=16)
+def _aead(secret: str, purpose: str) -> AESGCM:
+    key = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=f"taktile:{purpose}".encode("utf-8")).derive(secret.encode("utf-8"))
+    return AESGCM(key)
+
+
+def seal(value: Any, secret: str, purpose: str) -> str:
+    raw = json.dumps(value, separators=(",", ":")).encode("utf-8")
+    nonce = os.urandom(_NONCE_BYTES)
+    return base64.b64encode(nonce + _aead(secret, purpose).encrypt(nonce, raw, purpose.encode("utf-8"))).decode("ascii")
+
+
+def unseal(blob: str, secret: str, purpose: str) -> Any:
+    """
+    The sealed value; ValueError if `blob` was not sealed with this secret and purpose, or was altered.
+    """
+    try:
+        data = base64.b64decode(blob, validate=True)
+        raw = _aead(secret, purpose).decrypt(data[:_NONCE_BYTES], data[_NONCE_BYTES:], purpose.encode("utf-8"))
+    except (InvalidTag, binascii.Error, ValueError, TypeError):
+        raise ValueError(f"{purpose} value does not authenticate with its key") from None
+    return json.loads(raw)
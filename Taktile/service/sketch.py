@@ -0,0 +1,158 @@
+"""
+Streaming quantile sketches with bounded memory.
+
+KLLSketch is the KLL sketch (Karnin, Lang, Liberty 2016). Items live in a stack of compactors, and an
+item at level h stands for 2**h observations. When a level fills up it is sorted and every other item
+(random offset) moves up one level. Level capacities shrink geometrically (factor 2/3) below the top,
+so a sketch holds about 3·k items no matter how many values it has seen. Rank error is roughly 1.7/k
+with high probability; sketches merge.
+
+SlidingSketch keeps a ring of per-interval KLL sketches, so it can answer "the last `span` seconds" and
+"the `span` seconds before that" by merging intervals at query time.
+"""
+import math
+import random
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class KLLSketch:
+    def __init__(self, k: int = 100) -> None:
+        self.k = k
+        self.n = 0
+        self.compactors: List[List[float]] = [[]]
+        self._size = 0
+        self._max_size = self._capacity(0)
+        self._rng = random.Random()
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return max(2, int(math.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def _grow(self) -> None:
+        self.compactors.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _compress(self) -> None:
+        for h in range(len(self.compactors)):
+            level = self.compactors[h]
+            if len(level) >= self._capacity(h):
+                if h + 1 >= len(self.compactors):
+                    self._grow()
+                level.sort()
+                keep = [level.pop()] if len(level) % 2 else []
+                self.compactors[h + 1].extend(level[self._rng.randint(0, 1)::2])
+                self.compactors[h] = keep
+                self._size = sum(len(c) for c in self.compactors)
+                if self._size < self._max_size:
+                    break
+
+    def update(self, value: float) -> None:
+        self.compactors[0].append(float(value))
+        self.n += 1
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for h, level in enumerate(other.compactors):
+            self.compactors[h].extend(level)
+        self.n += other.n
+        self._size = sum(len(c) for c in self.compactors)
+        while self._size >= self._max_size:
+            before = self._size
+            self._compress()
+            if self._size >= before:
+                break
+
+    def copy(self) -> "KLLSketch":
+        out = KLLSketch(self.k)
+        out.compactors = [list(c) for c in self.compactors]
+        out.n = self.n
+        out._size = self._size
+        out._max_size = self._max_size
+        return out
+
+    def __len__(self) -> int:
+        return self._size
+
+    def sorted_view(self) -> Tuple[List[float], List[float]]:
+        """
+        (values ascending, cumulative weight fractions) — the sketch's approximate CDF.
+        """
+        pairs = sorted((v, 1 << h) for h, level in enumerate(self.compactors) for v in level)
+        total = float(sum(w for _, w in pairs)) or 1.0
+        values: List[float] = []
+        cum: List[float] = []
+        acc = 0
+        for v, w in pairs:
+            acc += w
+            values.append(v)
+            cum.append(acc / total)
+        return values, cum
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        values, cum = self.sorted_view()
+        if not values:
+            return [None for _ in qs]
+        return [values[min(len(values) - 1, bisect_left(cum, q))] for q in qs]
+
+
+def cdf_at(view: Tuple[List[float], List[float]], x: float) -> float:
+    values, cum = view
+    i = bisect_right(values, x)
+    return cum[i - 1] if i else 0.0
+
+
+class SlidingSketch:
+    """
+    Per-interval KLL sketches for the current window and the one before it
+    (2 x `buckets` intervals of `span_seconds / buckets` each).
+    """
+
+    def __init__(self, span_seconds: float, buckets: int, k: int) -> None:
+        self.span = span_seconds
+        self.width = span_seconds / buckets
+        self.buckets = buckets
+        self.k = k
+        self._ring: Dict[int, KLLSketch] = {}  # absolute interval index -> sketch
+        self._lock = threading.Lock()
+
+    def _interval(self, now: float) -> int:
+        return int(now // self.width)
+
+    def _expire(self, current: int) -> None:
+        oldest = current - 2 * self.buckets + 1
+        for idx in [i for i in self._ring if i < oldest]:
+            del self._ring[idx]
+
+    def update(self, value: float, now: Optional[float] = None) -> None:
+        idx = self._interval(time.time() if now is None else now)
+        with self._lock:
+            sketch = self._ring.get(idx)
+            if sketch is None:
+                self._expire(idx)
+                sketch = self._ring[idx] = KLLSketch(self.k)
+            sketch.update(value)
+
+    def window(self, previous: bool = False, now: Optional[float] = None) -> KLLSketch:
+        """
+        Merged sketch of the last `span` seconds (or of the `span` seconds before that).
+        """
+        current = self._interval(time.time() if now is None else now)
+        hi = current - (self.buckets if previous else 0)
+        lo = hi - self.buckets + 1
+        out = KLLSketch(self.k)
+        with self._lock:
+            self._expire(current)
+            parts = [s for i, s in self._ring.items() if lo <= i <= hi]
+            for part in parts:
+                out.merge(part)
+        return out
+
+    def items(self) -> int:
+        return sum(len(s) for s in self._ring.values())
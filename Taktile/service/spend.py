@@ -0,0 +1,164 @@
+"""
+Vendor spend accounting and per-case spend budgets.
+
+Every vendor HTTP attempt is charged at its unit price (VENDOR_COST_*), retries included. Charges go to the
+ledger of the workflow running in the current context and to process-wide totals. The ledger is a
+contextvar, like the deadline, so the clients need no extra arguments.
+
+The per-case budget caps optional work only: retries today, and speculative or hedged calls as they are
+added. Required first attempts always go out, because a case still has to be decided. Before any
+optional call, `allow(vendor)` checks that its price still fits in what is left of the budget; refusals
+are counted.
+
+GET /admin/spend — calls, spend and budget refusals per vendor since start, and the mean spend per workflow
+"""
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from fastapi import APIRouter, Depends
+
+from Taktile.service.config import settings
+from Taktile.service.security import require_admin
+
+
+T = TypeVar("T")
+
+
+def unit_costs() -> Dict[str, float]:
+    return {
+        "seon_aml": settings.VENDOR_COST_SEON_AML,
+        "seon_fraud": settings.VENDOR_COST_SEON_FRAUD,
+        "experian": settings.VENDOR_COST_EXPERIAN,
+        "equifax": settings.VENDOR_COST_EQUIFAX,
+        "transunion": settings.VENDOR_COST_TRANSUNION,
+        "plaid": settings.VENDOR_COST_PLAID,
+    }
+
+
+def unit_cost(vendor: str) -> float:
+    return unit_costs().get(vendor, 0.0)
+
+
+class Ledger:
+    """
+    Spend of one workflow run. `budget` None means no limit.
+    """
+
+    def __init__(self, budget: Optional[float]) -> None:
+        self.budget = budget
+        self.calls: Counter = Counter()
+        self.spend: Counter = Counter()
+        self.denied: Counter = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def total(self) -> float:
+        return sum(self.spend.values())
+
+    def charge(self, vendor: str, price: float) -> None:
+        with self._lock:
+            self.calls[vendor] += 1
+            self.spend[vendor] += price
+
+    def allows(self, price: float) -> bool:
+        return self.budget is None or self.total + price <= self.budget + 1e-9
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "total": round(self.total, 4),
+                "budget": self.budget,
+                "calls": dict(self.calls),
+                "by_vendor": {v: round(x, 4) for v, x in self.spend.items()},
+                "denied": dict(self.denied),
+            }
+
+
+_ledger: ContextVar[Optional[Ledger]] = ContextVar("taktile_spend_ledger", default=None)
+
+_calls: Counter = Counter()
+_spend: Counter = Counter()
+_denied: Counter = Counter()
+_workflows = 0
+_lock = threading.Lock()
+
+
+def start(budget: Optional[float] = None) -> Ledger:
+    """
+    Open a ledger for the workflow running in the current context. `budget` falls back to
+    CASE_SPEND_BUDGET; zero or less means no limit.
+    """
+    global _workflows
+    if budget is None:
+        budget = settings.CASE_SPEND_BUDGET
+    ledger = Ledger(budget if budget > 0 else None)
+    _ledger.set(ledger)
+    with _lock:
+        _workflows += 1
+    return ledger
+
+
+def current() -> Optional[Ledger]:
+    return _ledger.get()
+
+
+def bound(ledger: Optional[Ledger], fn: Callable[..., T]) -> Callable[..., T]:
+    """
+    Wrap `fn` so that it charges `ledger` when run on another thread (thread pools do not copy contextvars).
+    """
+
+    def run(*args: Any, **kwargs: Any) -> T:
+        token = _ledger.set(ledger)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _ledger.reset(token)
+
+    return run
+
+
+def charge(vendor: str) -> None:
+    price = unit_cost(vendor)
+    with _lock:
+        _calls[vendor] += 1
+        _spend[vendor] += price
+    ledger = _ledger.get()
+    if ledger is not None:
+        ledger.charge(vendor, price)
+
+
+def allow(vendor: str, kind: str = "retry") -> bool:
+    """
+    Whether an optional `kind` call to `vendor` fits in the current workflow's budget. Refusals are counted
+    per vendor and kind.
+    """
+    ledger = _ledger.get()
+    if ledger is None or ledger.allows(unit_cost(vendor)):
+        return True
+    key = f"{vendor}:{kind}"
+    with ledger._lock:
+        ledger.denied[key] += 1
+    with _lock:
+        _denied[key] += 1
+    return False
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/admin/spend")
+def spend_totals() -> Dict[str, Any]:
+    with _lock:
+        total = sum(_spend.values())
+        return {
+            "unit_costs": unit_costs(),
+            "case_budget": settings.CASE_SPEND_BUDGET if settings.CASE_SPEND_BUDGET > 0 else None,
+            "workflows": _workflows,
+            "total": round(total, 4),
+            "mean_per_workflow": round(total / _workflows, 4) if _workflows else None,
+            "calls": dict(_calls),
+            "by_vendor": {v: round(x, 4) for v, x in _spend.items()},
+            "denied": dict(_denied),
+        }
@@ -0,0 +1,338 @@
+"""
+Signed vendor webhooks: SEON transaction status updates and Plaid income updates, applied to cases in batches.
+
+POST /webhooks/seon  — SEON `transaction:status_update` ({id, state, label?}). `Digest: SHA-256=<hex>` must be the
+    HMAC-SHA256 of the raw body under SEON_WEBHOOK_SECRET (SEON's SECRET_KEY).
+POST /webhooks/plaid — Plaid INCOME webhooks ({webhook_code, item_id, user_id, ...}). `Plaid-Verification` must be a
+    JWT whose `request_body_sha256` claim is the SHA-256 of the raw body and whose `iat` is at most
+    PLAID_WEBHOOK_MAX_AGE_SECONDS old. Plaid signs ES256; the mock signs HS256 under PLAID_WEBHOOK_SECRET, and
+    only that is accepted here.
+
+A receiver verifies the signature (401 otherwise), drops a body already seen within WEBHOOK_DEDUP_TTL_SECONDS
+by any worker on the host (the seen set is in the SQLite cache backend, claimed with an atomic add) and queues the
+event, answering 202 without doing any work; a full queue answers 503 so the sender retries.
+A worker thread drains the queue in batches (up to WEBHOOK_BATCH_SIZE events, waiting at most
+WEBHOOK_BATCH_WAIT_SECONDS to fill one) and coalesces them per case, so a burst of updates re-evaluates a case once:
+  - SEON: a label goes to the negative cache (negative_cache.apply_label). The last state for a case whose
+    stored fraud result is FRAUD_REVIEW re-runs T2 on the stored SEON payload with that state (APPROVE clears the
+    review, DECLINE declines). A pass resumes the case from credit; a decline is recorded in the negative cache.
+    Without CASE_STORE_KEY no SEON payload is stored, and the state is only noted (payload_withheld).
+  - Plaid: INCOME_VERIFICATION and INCOME_VERIFICATION_RISK_SIGNALS resume the case from income.
+Cases are found in the case store (see cases) by SEON transaction id and by Plaid user, which is the
+client_user_id Taktile sends to Plaid. Events for unknown cases are counted and dropped. Re-evaluations run in
+the WEBHOOK_PRIORITY lane and their results are stored on the case (GET /admin/cases/{case_id}). A result that
+changes the case (a resume, or a fraud decline) is also POSTed, like an outage replay, to the `replay_callback` the
+case registered with /workflows/kyc/full, with `reevaluated_by: <event>` added. Each resume runs in its own
+context copy, so the workflow deadline it starts never applies to later events or deliveries on the worker thread.
+
+The queue is in memory, per worker: events still queued when the worker stops are lost.
+
+GET /admin/webhooks — queue depth, counters and the last applied events
+"""
+import base64
+import contextvars
+import hashlib
+import hmac
+import json
+import logging
+import queue
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from Taktile.service import analytics, background, cases, memory, negative_cache
+from Taktile.service.cache import get_cache
+from Taktile.service.config import settings
+from Taktile.service.security import require_admin
+from Taktile.stages.T2 import evaluate_fraud
+
+
+logger = logging.getLogger("taktile.webhooks")
+
+SEON_EVENT = "transaction:status_update"
+PLAID_INCOME_CODES = {"INCOME_VERIFICATION", "INCOME_VERIFICATION_RISK_SIGNALS"}
+
+_DEDUP_MAX_ENTRIES = 100000
+
+_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=settings.WEBHOOK_QUEUE_MAX)
+# Shared by every worker on the host whatever CACHE_BACKEND is: a sender's retry may reach another worker
+_seen = get_cache("webhooks", max_entries=_DEDUP_MAX_ENTRIES, default_ttl=settings.WEBHOOK_DEDUP_TTL_SECONDS, backend="sqlite")
+_recent: Deque[Dict[str, Any]] = deque(maxlen=100)
+_counters: Counter = Counter()
+_lock = threading.Lock()
+memory.register_store("webhooks.recent", lambda: _recent)
+
+_resumer: Optional[Callable[[str, str], Dict[str, Any]]] = None
+
+
+def set_resumer(fn: Callable[[str, str], Dict[str, Any]]) -> None:
+    """
+    Register the function that resumes a case from a stage (case_id, stage) and returns the workflow response.
+    """
+    global _resumer
+    _resumer = fn
+
+
+# --- Signatures ---
+
+
+def verify_seon(body: bytes, digest: Optional[str]) -> bool:
+    key = settings.SEON_WEBHOOK_SECRET.encode("utf-8")
+    expected = "SHA-256=" + hmac.new(key, body, hashlib.sha256).hexdigest()
+    return bool(digest) and hmac.compare_digest(digest.strip(), expected)
+
+
+def _b64url(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def verify_plaid(body: bytes, token: Optional[str]) -> bool:
+    try:
+        header_b64, claims_b64, signature_b64 = (token or "").split(".")
+        header = json.loads(_b64url(header_b64))
+        claims = json.loads(_b64url(claims_b64))
+        signature = _b64url(signature_b64)
+    except Exception:
+        return False
+    if header.get("alg") != "HS256":
+        return False
+    key = settings.PLAID_WEBHOOK_SECRET.encode("utf-8")
+    expected = hmac.new(key, f"{header_b64}.{claims_b64}".encode("ascii"), hashlib.sha256).digest()
+    if not hmac.compare_digest(signature, expected):
+        return False
+    try:
+        age = time.time() - float(claims.get("iat"))
+    except (TypeError, ValueError):
+        return False
+    if abs(age) > settings.PLAID_WEBHOOK_MAX_AGE_SECONDS:
+        return False
+    return hmac.compare_digest(str(claims.get("request_body_sha256") or ""), hashlib.sha256(body).hexdigest())
+
+
+# --- Queue ---
+
+
+def enqueue(vendor: str, body: bytes) -> str:
+    """
+    Queue a verified event: "queued", "duplicate", "invalid" (not a JSON object) or "full".
+    """
+    key = f"{vendor}:{hashlib.sha256(body).hexdigest()}"
+    try:
+        event = json.loads(body)
+    except ValueError:
+        event = None
+    if not isinstance(event, dict):
+        _counters[f"{vendor}_invalid"] += 1
+        return "invalid"
+    # Claimed before queueing, so two workers receiving the same body at once queue it once
+    if not _seen.add(key, 1):
+        _counters[f"{vendor}_duplicate"] += 1
+        return "duplicate"
+    try:
+        _queue.put_nowait({"vendor": vendor, "body": event, "received_at": time.time()})
+    except queue.Full:
+        _seen.delete(key)  # the sender's retry must not be dropped as a duplicate
+        _counters[f"{vendor}_rejected_full"] += 1
+        return "full"
+    _counters[f"{vendor}_queued"] += 1
+    ensure_worker()
+    return "queued"
+
+
+def _note(vendor: str, case_id: Optional[str], event: str, outcome: str, status: Optional[str] = None) -> None:
+    _counters[f"{vendor}_{outcome}"] += 1
+    _recent.append({"at": time.time(), "vendor": vendor, "case_id": case_id, "event": event, "outcome": outcome, "status": status})
+
+
+def _notify(case_id: str, result: Dict[str, Any], event: str) -> None:
+    """
+    Deliver a webhook-driven result to the case's callback, if it registered one; shaped like the
+    /workflows/kyc/full response, as an outage replay is.
+    """
+    callback = cases.callback(case_id)
+    if callback is None or not callback.get("url"):
+        return
+    background.deliver_callback(callback["url"], callback.get("token", ""), {**result, "reevaluated_by": event})
+    _counters["notified"] += 1
+
+
+def _resume(vendor: str, case_id: str, stage: str, event: str) -> None:
+    if _resumer is None:
+        _note(vendor, case_id, event, "no_resumer")
+        return
+    try:
+        # In a copy of the worker's context: the resume's deadline and spend ledger end with it
+        out = contextvars.copy_context().run(_resumer, case_id, stage)
+    except HTTPException as e:
+        # 409: an earlier stage of the case did not pass; 404: its intake has expired
+        _note(vendor, case_id, event, f"skipped_{e.status_code}")
+        return
+    except Exception as e:
+        logger.warning("webhook re-evaluation of case %s from %s failed: %s", case_id, stage, e)
+        _note(vendor, case_id, event, "resume_failed")
+        return
+    _note(vendor, case_id, event, f"resumed_from_{stage}", out.get("status"))
+    _notify(case_id, out, event)
+
+
+def _apply_seon_state(transaction_id: str, state: str) -> Optional[str]:
+    """
+    Re-evaluate the fraud gate of the transaction's case with the new SEON state; returns the case id when
+    the case passed fraud now and must be resumed from credit.
+    """
+    event = f"{SEON_EVENT}:{state}"
+    case_id = cases.case_for_transaction(transaction_id)
+    fraud = cases.stored(case_id, "fraud") if case_id is not None else None
+    intake = cases.intake(case_id) if case_id is not None else None
+    if fraud is None or intake is None:
+        _note("seon", case_id, event, "unknown_case")
+        return None
+    if (fraud.get("fraud_decision") or {}).get("decision") != "FRAUD_REVIEW":
+        _note("seon", case_id, event, "not_in_review", fraud["fraud_decision"].get("decision"))
+        return None
+    if fraud.get("fraud_raw") is None:
+        # Stored without CASE_STORE_KEY (or under an earlier key): there is no SEON payload to re-run T2 on
+        _note("seon", case_id, event, "payload_withheld")
+        return None
+
+    decision = evaluate_fraud(fraud["fraud_raw"], review_state=state)
+    analytics.record_fraud(decision)
+    cases.save(case_id, "fraud", intake, {"fraud_decision": decision, "fraud_raw": fraud["fraud_raw"]})
+    if decision["decision"] == "FRAUD_PASS":
+        return case_id
+    if decision["decision"] == "FRAUD_DECLINE":
+        negative_cache.record_decline(case_id, intake, "FRAUD_DECLINE", decision.get("reasons") or [])
+        aml = cases.stored(case_id, "aml") or {}
+        _notify(case_id, {
+            "case_id": case_id,
+            "status": "FRAUD_DECLINE",
+            "aml_decision": aml.get("aml_decision"),
+            "fraud_decision": decision,
+            "provisional_tier": decision.get("provisional_tier"),
+            "aml_raw": aml.get("aml_raw"),
+            "fraud_raw": fraud["fraud_raw"],
+            "stage_order": ["aml", "fraud"],
+        }, event)
+    _note("seon", case_id, event, "reevaluated", decision["decision"])
+    return None
+
+
+def apply_batch(events: List[Dict[str, Any]]) -> None:
+    """
+    Apply a batch of events in arrival order, re-evaluating each affected case once.
+    """
+    states: Dict[str, str] = {}  # SEON transaction -> last state in the batch
+    incomes: Dict[str, str] = {}  # case -> last Plaid webhook code in the batch
+    for ev in events:
+        body = ev["body"]
+        if ev["vendor"] == "seon":
+            transaction_id = str(body.get("id") or "")
+            if body.get("label"):
+                _counters[f"seon_label_{negative_cache.apply_label(transaction_id, str(body['label']))}"] += 1
+            if body.get("state"):
+                states[transaction_id] = str(body["state"]).upper()
+        else:
+            code = str(body.get("webhook_code") or "")
+            case_id = cases.case_for_plaid_user(str(body.get("user_id") or ""))
+            if code not in PLAID_INCOME_CODES:
+                _note("plaid", case_id, code, "ignored")
+            elif case_id is None:
+                _note("plaid", None, code, "unknown_case")
+            else:
+                incomes[case_id] = code
+
+    resumed = set()
+    for transaction_id, state in states.items():
+        case_id = _apply_seon_state(transaction_id, state)
+        if case_id is not None:
+            _resume("seon", case_id, "credit", f"{SEON_EVENT}:{state}")
+            resumed.add(case_id)
+    for case_id, code in incomes.items():
+        if case_id in resumed:
+            _note("plaid", case_id, code, "coalesced")  # the resume from credit re-ran income already
+        else:
+            _resume("plaid", case_id, "income", code)
+    _counters["batches"] += 1
+    _counters["events"] += len(events)
+
+
+def _worker() -> None:
+    while True:
+        batch = [_queue.get()]
+        fill_until = time.monotonic() + settings.WEBHOOK_BATCH_WAIT_SECONDS
+        while len(batch) < settings.WEBHOOK_BATCH_SIZE:
+            remaining = fill_until - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            apply_batch(batch)
+        except Exception:
+            logger.exception("webhook batch of %d events failed", len(batch))
+
+
+_worker_thread: Optional[threading.Thread] = None
+
+
+def ensure_worker() -> None:
+    global _worker_thread
+    with _lock:
+        if _worker_thread is None:
+            _worker_thread = threading.Thread(target=_worker, name="taktile-webhooks", daemon=True)
+            _worker_thread.start()
+
+
+def _accepted(vendor: str, body: bytes) -> JSONResponse:
+    outcome = enqueue(vendor, body)
+    if outcome == "invalid":
+        raise HTTPException(status_code=400, detail="Body must be a JSON object")
+    if outcome == "full":
+        raise HTTPException(status_code=503, detail="Webhook queue full, retry later")
+    return JSONResponse(status_code=202, content={"status": outcome})
+
+
+router = APIRouter()
+
+
+@router.post("/webhooks/seon")
+async def seon_webhook(request: Request) -> JSONResponse:
+    if not settings.SEON_WEBHOOK_SECRET:
+        raise HTTPException(status_code=404, detail="SEON webhooks are disabled")
+    body = await request.body()
+    if not verify_seon(body, request.headers.get("Digest")):
+        _counters["seon_bad_signature"] += 1
+        raise HTTPException(status_code=401, detail="Invalid signature")
+    if request.headers.get("X-Event-Type", SEON_EVENT) != SEON_EVENT:
+        _counters["seon_ignored"] += 1
+        return JSONResponse(status_code=202, content={"status": "ignored"})
+    return _accepted("seon", body)
+
+
+@router.post("/webhooks/plaid")
+async def plaid_webhook(request: Request) -> JSONResponse:
+    if not settings.PLAID_WEBHOOK_SECRET:
+        raise HTTPException(status_code=404, detail="Plaid webhooks are disabled")
+    body = await request.body()
+    if not verify_plaid(body, request.headers.get("Plaid-Verification")):
+        _counters["plaid_bad_signature"] += 1
+        raise HTTPException(status_code=401, detail="Invalid signature")
+    return _accepted("plaid", body)
+
+
+@router.get("/admin/webhooks", dependencies=[Depends(require_admin)])
+def webhooks_state() -> Dict[str, Any]:
+    return {
+        "receivers": {"seon": bool(settings.SEON_WEBHOOK_SECRET), "plaid": bool(settings.PLAID_WEBHOOK_SECRET)},
+        "queued": _queue.qsize(),
+        "queue_max": settings.WEBHOOK_QUEUE_MAX,
+        "batch_size": settings.WEBHOOK_BATCH_SIZE,
+        "counters": dict(_counters),
+        "recent": list(_recent)[-20:],
+    }
@@ -1,9 +1,44 @@
-from typing import Any, Dict
+"""
+S3: credit report pull, from one bureau or fanned out to several.
 
-from Taktile.clients.experian import ExperianClient
+CREDIT_BUREAUS lists the bureaus to pull (experian, equifax, transunion), primary first. With a single bureau
+this is the plain Experian pull. With more, every bureau is called at once on the shared executor, each with
+its own budget: the bureau's timeout (*_TIMEOUT_SECONDS), capped by the workflow deadline. A bureau that has
+not answered by then counts as timed out and is not waited for. The reports are then merged for T3 by
+CREDIT_MERGE_STRATEGY:
+  - first_good: the first usable report to arrive (the other calls finish in the background, still charged)
+  - lowest_score: the usable report with the lowest V4/FICO score
+  - tri_merge: one profile from all usable reports. Tradelines that several bureaus report (same creditor,
+    account number and open date) are kept once, in their most severe version; inquiries, public records and
+    statements are deduped; the score is the middle one of three (the lower of two); OFAC and fraud flags
+    from any bureau are kept.
+A report is usable when the bureau answered 200 with a credit profile and no errors. When none is, the envelope
+of the first bureau that answered (the primary's when none did) goes to T3 unchanged, so vendor errors and
+outages are handled as for a single bureau.
+"""
+import contextvars
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from Taktile.clients.equifax import EquifaxClient
+from Taktile.clients.experian import ExperianClient, error_envelope
+from Taktile.clients.transunion import TransUnionClient
+from Taktile.service import deadline
+from Taktile.service.config import settings
+from Taktile.stages.T3 import RESPONSE_KEYS
 
 
 experian = ExperianClient()
+equifax = EquifaxClient()
+transunion = TransUnionClient()
+
+STRATEGIES = ("first_good", "lowest_score", "tri_merge")
+# Keys the merge needs on top of what T3 reads (tradeline/inquiry identity)
+MERGE_KEYS = RESPONSE_KEYS | {"subscriberName", "accountNumber"}
+
+_executor = ThreadPoolExecutor(max_workers=settings.CREDIT_FANOUT_WORKERS, thread_name_prefix="taktile-bureau")
 
 
 def build_experian_payload(intake: Dict[str, Any]) -> Dict[str, Any]:
@@ -46,13 +81,247 @@ def build_experian_payload(intake: Dict[str, Any]) -> Dict[str, Any]:
 
 def get_credit_report(intake: Dict[str, Any]) -> Dict[str, Any]:
     """
-    S3: Build Experian payload and POST to Experian mock.
+    S3: Build the bureau payload and pull the report from every configured bureau (see module docstring).
     Returns the ExperianClient envelope:
       {
         "status": int,
         "headers": dict,
-        "data": dict   # creditProfile/errors, etc.
+        "data": dict,       # creditProfile/errors, etc. (only the keys T3 reads when projected)
+        "projected": bool,
+        "raw": bytes        # full response body
       }
+    With several bureaus it also carries "strategy" and "bureaus" ({bureau: {outcome, status, ms, used}}).
     """
     payload = build_experian_payload(intake)
-    return experian.post_credit_report(payload)
+    names = bureaus()
+    if len(names) == 1:
+        return _clients()[names[0]].post_credit_report(payload, keep_keys=RESPONSE_KEYS)
+    return pull_and_merge(names, payload, settings.CREDIT_MERGE_STRATEGY)
+
+
+def _clients() -> Dict[str, Any]:
+    return {"experian": experian, "equifax": equifax, "transunion": transunion}
+
+
+def bureaus() -> List[str]:
+    """
+    Configured bureaus in priority order; unknown names are ignored, Experian when none is left.
+    """
+    known = _clients()
+    names: List[str] = []
+    for name in settings.CREDIT_BUREAUS.split(","):
+        name = name.strip().lower()
+        if name in known and name not in names:
+            names.append(name)
+    return names or ["experian"]
+
+
+def usable(envelope: Dict[str, Any]) -> bool:
+    data = envelope.get("data") or {}
+    return envelope.get("status") == 200 and not data.get("errors") and bool(data.get("creditProfile"))
+
+
+def _pull(name: str, payload: Dict[str, Any], budget: float) -> Dict[str, Any]:
+    # Runs in a copy of the workflow's context: narrowing the deadline here bounds this bureau only
+    deadline.start(budget)
+    try:
+        return _clients()[name].post_credit_report(payload, keep_keys=MERGE_KEYS)
+    except deadline.DeadlineExceeded as e:
+        return error_envelope(e)
+
+
+def pull_and_merge(names: List[str], payload: Dict[str, Any], strategy: str) -> Dict[str, Any]:
+    """
+    Pull `payload` from every bureau in `names` concurrently and merge the usable reports by `strategy`.
+    """
+    if strategy not in STRATEGIES:
+        strategy = "tri_merge"
+    remaining = deadline.remaining()
+    budgets = {name: _clients()[name].timeout if remaining is None else min(_clients()[name].timeout, remaining) for name in names}
+    started = time.perf_counter()
+    pending = {
+        _executor.submit(contextvars.copy_context().run, _pull, name, payload, budgets[name]): name for name in names
+    }
+    envelopes: Dict[str, Dict[str, Any]] = {}
+    summary: Dict[str, Dict[str, Any]] = {}
+    arrived: List[str] = []
+    # A bureau is waited for until its own budget (plus a small grace for the call to return) runs out
+    give_up = {name: started + budgets[name] + 0.25 for name in names}
+    while pending:
+        now = time.perf_counter()
+        for future, name in list(pending.items()):
+            if now >= give_up[name]:
+                del pending[future]
+                summary[name] = {"outcome": "timeout", "status": None, "ms": None, "used": False}
+        if not pending:
+            break
+        done, _ = wait(list(pending), timeout=min(give_up[name] for name in pending.values()) - now, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = pending.pop(future)
+            try:
+                envelope = future.result()
+            except Exception as e:
+                envelope = error_envelope(e)
+            envelopes[name] = envelope
+            arrived.append(name)
+            summary[name] = {
+                "outcome": "ok" if usable(envelope) else ("timeout" if envelope.get("status") == 0 else "error"),
+                "status": envelope.get("status"),
+                "ms": round((time.perf_counter() - started) * 1000, 1),
+                "used": False,
+            }
+        if strategy == "first_good" and any(usable(envelopes[name]) for name in arrived):
+            break
+    for name in pending.values():
+        summary[name] = {"outcome": "not_awaited", "status": None, "ms": None, "used": False}
+
+    good = [name for name in arrived if usable(envelopes[name])]
+    if not good:
+        deadline.check("credit report")
+        answered = [name for name in names if name in envelopes and envelopes[name].get("status")]
+        fallback = answered[0] if answered else names[0]
+        out = dict(envelopes.get(fallback) or error_envelope(deadline.DeadlineExceeded(f"{fallback} did not answer in time")))
+        used = [fallback]
+    elif strategy == "first_good":
+        out, used = dict(envelopes[good[0]]), [good[0]]
+    elif strategy == "lowest_score":
+        scored = [name for name in good if _score(envelopes[name]) is not None]
+        pick = min(scored, key=lambda name: _score(envelopes[name])) if scored else min(good, key=names.index)
+        out, used = dict(envelopes[pick]), [pick]
+    else:
+        ordered = sorted(good, key=names.index)
+        data = {"creditProfile": [tri_merge([_profile(envelopes[name]) for name in ordered])]}
+        out = {
+            "status": 200,
+            "headers": {},
+            "data": data,
+            "projected": all(envelopes[name].get("projected") for name in ordered),
+            "raw": json.dumps(data).encode("utf-8"),
+        }
+        used = ordered
+    for name in used:
+        if name in summary:
+            summary[name]["used"] = True
+    out["strategy"] = strategy
+    out["bureaus"] = summary
+    return out
+
+
+# ----- merge helpers (Credit Profile layout, as read by T3) -----
+
+
+def _profile(envelope: Dict[str, Any]) -> Dict[str, Any]:
+    return ((envelope.get("data") or {}).get("creditProfile") or [{}])[0] or {}
+
+
+def _model(cp: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # Same model T3 scores on: the first V4/FICO model
+    for m in cp.get("riskModel") or []:
+        ind = str(m.get("modelIndicator") or "").upper()
+        if "V4" in ind or "FICO" in ind:
+            return m
+    return None
+
+
+def _num(v: Any) -> float:
+    try:
+        return float(str(v).replace(",", "").replace("$", "").strip())
+    except Exception:
+        return 0.0
+
+
+def _score(envelope: Dict[str, Any]) -> Optional[float]:
+    model = _model(_profile(envelope))
+    if model is None or not str(model.get("score") or "").strip():
+        return None
+    return _num(model.get("score"))
+
+
+def _norm(v: Any) -> str:
+    return " ".join(str(v or "").upper().split())
+
+
+def _tradeline_key(t: Dict[str, Any]) -> Tuple[str, str, str]:
+    return (_norm(t.get("subscriberName")), _norm(t.get("accountNumber")), _norm(t.get("openDate")))
+
+
+def _severity(t: Dict[str, Any]) -> Tuple[float, ...]:
+    epd = t.get("enhancedPaymentData") or {}
+    return (
+        _num(epd.get("chargeoffAmount")),
+        _num(t.get("delinquencies90to180Days")),
+        _num(t.get("delinquencies60Days")),
+        _num(t.get("delinquencies30Days")),
+        _num(t.get("amountPastDue")),
+        _num(t.get("balanceAmount")),
+    )
+
+
+def _dedupe(items: List[Dict[str, Any]], key: Callable[[Dict[str, Any]], Any]) -> List[Dict[str, Any]]:
+    seen: Dict[Any, Dict[str, Any]] = {}
+    for item in items:
+        seen.setdefault(key(item), item)
+    return list(seen.values())
+
+
+def merge_tradelines(lists: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    One tradeline per (creditor, account number, open date): the most severe copy, disputed if any copy is.
+    Tradelines without a creditor or account number cannot be matched and are all kept.
+    """
+    merged: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    unmatched: List[Dict[str, Any]] = []
+    for tradelines in lists:
+        for t in tradelines or []:
+            key = _tradeline_key(t)
+            if not key[0] or not key[1]:
+                unmatched.append(t)
+                continue
+            kept = merged.get(key)
+            if kept is None:
+                merged[key] = t
+                continue
+            disputed = str(kept.get("consumerDisputeFlag") or t.get("consumerDisputeFlag") or "").upper() == "Y"
+            if _severity(t) > _severity(kept):
+                kept = t
+            if disputed:
+                kept = {**kept, "consumerDisputeFlag": "Y"}
+            merged[key] = kept
+    return list(merged.values()) + unmatched
+
+
+def tri_merge(profiles: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge credit profiles (priority order) into one; see the module docstring for the rules.
+    """
+    scored = sorted((m for m in (_model(cp) for cp in profiles) if m is not None and str(m.get("score") or "").strip()), key=lambda m: _num(m.get("score")))
+    # Middle of three; of two, the lower (index 0); of one, itself
+    model = scored[(len(scored) - 1) // 2] if scored else None
+    fraud_flags: List[Any] = []
+    date_of_death = None
+    for cp in profiles:
+        for fs in cp.get("fraudShield") or []:
+            fs = fs or {}
+            date_of_death = date_of_death or fs.get("dateOfDeath")
+            for ind in (fs.get("fraudShieldIndicators") or {}).get("indicator") or []:
+                if ind not in fraud_flags:
+                    fraud_flags.append(ind)
+    fraud_shield: Dict[str, Any] = {"fraudShieldIndicators": {"indicator": fraud_flags}}
+    if date_of_death:
+        fraud_shield["dateOfDeath"] = date_of_death
+    ofac = next((cp["ofac"] for cp in profiles if str((cp.get("ofac") or {}).get("messageText") or "").strip()), None)
+    return {
+        "ofac": ofac or next((cp.get("ofac") for cp in profiles if cp.get("ofac")), {}),
+        "statement": _dedupe([s for cp in profiles for s in cp.get("statement") or []], lambda s: _norm(s.get("statementText"))),
+        "fraudShield": [fraud_shield],
+        "publicRecord": _dedupe(
+            [r for cp in profiles for r in cp.get("publicRecord") or []],
+            lambda r: (_norm(r.get("courtName")), _norm(r.get("filingDate")), _norm(r.get("status"))),
+        ),
+        "inquiry": _dedupe(
+            [i for cp in profiles for i in cp.get("inquiry") or []],
+            lambda i: (_norm(i.get("subscriberName")), _norm(i.get("date")), _norm(i.get("type"))),
+        ),
+        "riskModel": [model] if model else [],
+        "tradeline": merge_tradelines([cp.get("tradeline") or [] for cp in profiles]),
+    }
@@ -0,0 +1,39 @@
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict
+
+from Taktile.service.config import settings
+from Taktile.stages.S4 import plaid
+
+
+_executor = ThreadPoolExecutor(max_workers=settings.EMPLOYMENT_WORKERS, thread_name_prefix="taktile-employment")
+
+
+def build_employment_options_from_intake(intake: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Plaid employment options from intake.custom_fields:
+      - employment_profile: "active" | "inactive" | "mismatch" (mock shaping)
+      - income_inject_error: shared with the income calls
+    """
+    cf = (intake.get("custom_fields") or {}) if isinstance(intake, dict) else {}
+    options: Dict[str, Any] = {}
+    if cf.get("employment_profile"):
+        options["employment_profile"] = cf.get("employment_profile")
+    if cf.get("income_inject_error"):
+        options["inject_error"] = cf.get("income_inject_error")
+    return options
+
+
+def get_employment(client_user_id: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    S5: Plaid employment record ({"employment": {employer, status, hire_date}} or a Plaid error body).
+    """
+    return plaid.employment_get(client_user_id, options=options)
+
+
+def start_employment(client_user_id: str, options: Dict[str, Any]) -> "Future[Dict[str, Any]]":
+    """
+    Start S5 alongside S4. The call runs in a copy of the caller's context, so it shares the workflow
+    deadline, spend ledger and priority class.
+    """
+    return _executor.submit(contextvars.copy_context().run, get_employment, client_user_id, options)
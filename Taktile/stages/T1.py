@@ -1,5 +1,7 @@
 from typing import Any, Dict, List
 
+from Taktile.service import rules
+
 
 class ComplianceDecision:
     DECLINE = "DECLINE"
@@ -24,7 +26,10 @@ def evaluate_aml(aml_response: Dict[str, Any]) -> Dict[str, Any]:
         }
       }
     """
-    if not aml_response or not aml_response.get("success"):
+    tr = rules.trace("T1")
+    failed = not aml_response or not aml_response.get("success")
+    tr.lap("technical_error_or_timeout", failed)
+    if failed:
         return {
             "decision": ComplianceDecision.DECLINE,
             "reasons": ["technical_error_or_timeout"],
@@ -36,12 +41,16 @@ def evaluate_aml(aml_response: Dict[str, Any]) -> Dict[str, Any]:
 
     if data.get("has_sanction_match"):
         reasons.append("sanctions_match")
+    tr.lap("sanctions_match", "sanctions_match" in reasons)
     if data.get("has_pep_match"):
         reasons.append("pep_match")
+    tr.lap("pep_match", "pep_match" in reasons)
     if data.get("has_crimelist_match"):
         reasons.append("crimelist_match")
+    tr.lap("crimelist_match", "crimelist_match" in reasons)
     if data.get("has_adversemedia_match"):
         reasons.append("adverse_media_signal")
+    tr.lap("adverse_media_signal", "adverse_media_signal" in reasons)
 
     if any(r in reasons for r in ("sanctions_match", "pep_match", "crimelist_match")):
         return {
@@ -1,38 +1,48 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
+from Taktile.service import rules
 
-def _has_severe_flags(data: Dict[str, Any]) -> List[str]:
+
+def _has_severe_flags(data: Dict[str, Any], tr: Any = rules.OFF) -> List[str]:
     reasons: List[str] = []
 
     # Device details
     dd = (data.get("device_details") or {}) if isinstance(data.get("device_details"), dict) else {}
     if dd.get("vpn"):
         reasons.append("device_vpn")
+    tr.lap("device_vpn", dd.get("vpn"))
     if dd.get("proxy"):
         reasons.append("device_proxy")
+    tr.lap("device_proxy", dd.get("proxy"))
     # Heuristic: emulator/bot flags often captured as suspicious_flags list
     for flag in dd.get("suspicious_flags", []) or []:
         f = str(flag).lower()
         if any(k in f for k in ["emulator", "bot", "automation"]):
             reasons.append("device_emulator_or_bot")
             break
+    tr.lap("device_emulator_or_bot", "device_emulator_or_bot" in reasons)
 
     # IP details
     ipd = (data.get("ip_details") or {}) if isinstance(data.get("ip_details"), dict) else {}
     ip_type = (ipd.get("ip_type") or "").upper()
     if ip_type == "DCH":
         reasons.append("ip_datacenter")
+    tr.lap("ip_datacenter", ip_type == "DCH")
     if ipd.get("proxy"):
         reasons.append("ip_proxy")
+    tr.lap("ip_proxy", ipd.get("proxy"))
     if ipd.get("vpn"):
         reasons.append("ip_vpn")
+    tr.lap("ip_vpn", ipd.get("vpn"))
     if ipd.get("tor"):
         reasons.append("ip_tor")
+    tr.lap("ip_tor", ipd.get("tor"))
 
     # Basic presence checks
     # If session/device missing entirely, mark as weaker signal for review bucket
     if not dd:
         reasons.append("missing_device")
+    tr.lap("missing_device", not dd)
     # Additional blocks could be scanned similarly (email_details/phone_details)
 
     return reasons
@@ -61,7 +71,7 @@ def _tier_from_score(score: float | int) -> int:
     return 0
 
 
-def evaluate_fraud(fraud_response: Dict[str, Any]) -> Dict[str, Any]:
+def evaluate_fraud(fraud_response: Dict[str, Any], review_state: Optional[str] = None) -> Dict[str, Any]:
     """
     Input: SEON Fraud API JSON (mock).
     Output:
@@ -75,6 +85,8 @@ def evaluate_fraud(fraud_response: Dict[str, Any]) -> Dict[str, Any]:
       - DECLINE if fraud_score >= 90 OR severe combo (vpn/proxy + datacenter IP + emulator/bot flags).
       - REVIEW if 70 <= fraud_score < 90 OR single severe red flag OR missing device/session.
       - PASS otherwise.
+    `review_state` is the state an analyst gave the transaction in SEON after the fact (status update
+    webhook): DECLINE declines, APPROVE turns a REVIEW into a PASS. The hard declines above stand either way.
     Tier mapping (if PASS):
       - <=30: 7
       - <=40: 6
@@ -85,7 +97,10 @@ def evaluate_fraud(fraud_response: Dict[str, Any]) -> Dict[str, Any]:
       - <=90: 1
       - else: 0
     """
-    if not isinstance(fraud_response, dict) or not fraud_response.get("success"):
+    tr = rules.trace("T2")
+    failed = not isinstance(fraud_response, dict) or not fraud_response.get("success")
+    tr.lap("vendor_error_or_timeout", failed)
+    if failed:
         return {
             "decision": "FRAUD_REVIEW",
             "provisional_tier": None,
@@ -95,7 +110,7 @@ def evaluate_fraud(fraud_response: Dict[str, Any]) -> Dict[str, Any]:
 
     data = fraud_response.get("data") or {}
     fraud_score = data.get("fraud_score", 0)
-    reasons = _has_severe_flags(data)
+    reasons = _has_severe_flags(data, tr)
 
     # Decline if very high or multiple severe red flags
     try:
@@ -103,7 +118,9 @@ def evaluate_fraud(fraud_response: Dict[str, Any]) -> Dict[str, Any]:
     except Exception:
         score_val = 0.0
 
-    if score_val >= 90 or len(reasons) >= 3:
+    declined = score_val >= 90 or len(reasons) >= 3
+    tr.lap("decline_score_or_flag_combo", declined)
+    if declined:
         return {
             "decision": "FRAUD_DECLINE",
             "provisional_tier": None,
@@ -111,9 +128,23 @@ def evaluate_fraud(fraud_response: Dict[str, Any]) -> Dict[str, Any]:
             "details": {"fraud_score": score_val},
         }
 
+    manual_decline = review_state == "DECLINE"
+    tr.lap("seon_manual_decline", manual_decline)
+    if manual_decline:
+        return {
+            "decision": "FRAUD_DECLINE",
+            "provisional_tier": None,
+            "reasons": reasons + ["seon_manual_decline"],
+            "details": {"fraud_score": score_val},
+        }
+
     # Review if medium-high or at least one severe flag or missing device/session
     # Note: "missing_device" is included by _has_severe_flags as a reason when device_details absent.
-    if 70 <= score_val < 90 or any(reasons):
+    review = 70 <= score_val < 90 or any(reasons)
+    tr.lap("review_score_or_flag", review)
+    if review and review_state == "APPROVE":
+        reasons = reasons + ["seon_manual_approve"]  # kept as context on the pass
+    elif review:
         return {
             "decision": "FRAUD_REVIEW",
             "provisional_tier": None,
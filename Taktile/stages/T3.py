@@ -1,5 +1,7 @@
 from typing import Any, Dict, List, Optional
 
+from Taktile.service import rules
+
 
 CONFIG = {
     "scoreFloor": 660,
@@ -14,6 +16,22 @@ CONFIG = {
     "thinFile": {"minOpenTrades": 2, "minOldestOpenMonths": 12},
 }
 
+# Every key this policy reads, at any depth of the Experian response, plus error details.
+# Projected decoding (ExperianClient) drops all other keys; add new ones here when a rule reads them.
+RESPONSE_KEYS = frozenset({
+    "creditProfile", "errors", "code", "message", "status",
+    "ofac", "messageText",
+    "statement", "statementText",
+    "fraudShield", "dateOfDeath", "fraudShieldIndicators", "indicator",
+    "publicRecord", "courtName", "statusDate", "filingDate",
+    "inquiry", "type", "date",
+    "riskModel", "modelIndicator", "score",
+    "tradeline", "accountType", "revolvingOrInstallment", "openOrClosed", "openDate", "balanceDate", "balanceAmount",
+    "amountPastDue", "maxDelinquencyDate", "delinquencies30Days", "delinquencies60Days", "delinquencies90to180Days",
+    "specialComment", "originalCreditorName", "consumerDisputeFlag",
+    "enhancedPaymentData", "enhancedPaymentStatus", "enhancedSpecialComment", "chargeoffAmount", "creditLimitAmount",
+})
+
 
 def _months_since(date_str: Optional[str]) -> int:
     """
@@ -60,9 +78,15 @@ def _extract_cp(data: Dict[str, Any]) -> Dict[str, Any]:
     return (data.get("creditProfile") or [{}])[0] or {}
 
 
-def evaluate_credit_policy(resp: Dict[str, Any], seon_tier: Optional[int], freeze_override_code: Optional[str] = None) -> Dict[str, Any]:
+def evaluate_credit_policy(
+    resp: Dict[str, Any],
+    seon_tier: Optional[int],
+    freeze_override_code: Optional[str] = None,
+    config: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
     """
     Evaluate Experian response and produce credit decision + tiers.
+    `config` overrides individual CONFIG keys (used by policy simulations); None means CONFIG as-is.
     Returns:
       {
         "decision": "CREDIT_DECLINE" | "CREDIT_REVIEW" | "CREDIT_PASS",
@@ -73,8 +97,13 @@ def evaluate_credit_policy(resp: Dict[str, Any], seon_tier: Optional[int], freez
         "scorecard": Dict[str, Any]
       }
     """
+    cfg = {**CONFIG, **config} if config else CONFIG
+    tr = rules.trace("T3")
+
     # If vendor-level error present, push to review
-    if not isinstance(resp, dict) or (resp.get("errors") and len(resp.get("errors")) > 0):
+    failed = not isinstance(resp, dict) or (resp.get("errors") and len(resp.get("errors")) > 0)
+    tr.lap("vendor_error_or_timeout", failed)
+    if failed:
         return {
             "decision": "CREDIT_REVIEW",
             "bureau_tier": 0,
@@ -92,12 +121,14 @@ def evaluate_credit_policy(resp: Dict[str, Any], seon_tier: Optional[int], freez
     ofac = cp.get("ofac") or {}
     if str(ofac.get("messageText") or "").strip():
         ko_reasons.append("OFAC_MATCH")
+    tr.lap("OFAC_MATCH", "OFAC_MATCH" in ko_reasons)
 
     # Security freeze present w/o override (decline)
     statements = cp.get("statement") or []
     has_freeze_stmt = any("freeze" in str(s.get("statementText") or "").lower() for s in statements)
     if has_freeze_stmt and not freeze_override_code:
         ko_reasons.append("SECURITY_FREEZE_NO_OVERRIDE")
+    tr.lap("SECURITY_FREEZE_NO_OVERRIDE", "SECURITY_FREEZE_NO_OVERRIDE" in ko_reasons)
 
     # Deceased/fraud severe flags (decline)
     fraud = (cp.get("fraudShield") or [None])[0] or {}
@@ -105,16 +136,18 @@ def evaluate_credit_policy(resp: Dict[str, Any], seon_tier: Optional[int], freez
     # indicator "5" is often severe; also treat dateOfDeath if ever present
     if fraud.get("dateOfDeath") or ("5" in [str(x) for x in indicators]):
         ko_reasons.append("DECEASED_OR_FRAUD_FLAG")
+    tr.lap("DECEASED_OR_FRAUD_FLAG", "DECEASED_OR_FRAUD_FLAG" in ko_reasons)
 
     # Bankruptcies in last 7y (84 months)
     public_records = cp.get("publicRecord") or []
     recent_bk = any(
         ("bankruptcy" in str(r.get("courtName") or "").lower())
-        and _months_since(r.get("statusDate") or r.get("filingDate")) <= CONFIG["recentBankruptcyMonths"]
+        and _months_since(r.get("statusDate") or r.get("filingDate")) <= cfg["recentBankruptcyMonths"]
         for r in public_records
     )
     if recent_bk:
         ko_reasons.append("RECENT_BANKRUPTCY")
+    tr.lap("RECENT_BANKRUPTCY", recent_bk)
 
     tradelines = cp.get("tradeline") or []
 
@@ -125,22 +158,24 @@ def evaluate_credit_policy(resp: Dict[str, Any], seon_tier: Optional[int], freez
         co_amt = _num((t.get("enhancedPaymentData") or {}).get("chargeoffAmount"))
         when = t.get("statusDate") or t.get("balanceDate")
         if ("CHARGE" in status.upper() and "OFF" in status.upper()) or co_amt > 0:
-            if _months_since(when) <= CONFIG["recentChargeoffMonths"]:
+            if _months_since(when) <= cfg["recentChargeoffMonths"]:
                 recent_co = True
                 break
     if recent_co:
         ko_reasons.append("RECENT_CHARGEOFF")
+    tr.lap("RECENT_CHARGEOFF", recent_co)
 
     # Repo/Foreclosure in last 36 months
     repo_fore = False
     for t in tradelines:
         sc = f"{t.get('specialComment') or ''} {((t.get('enhancedPaymentData') or {}).get('enhancedSpecialComment') or '')}"
         when = t.get("statusDate") or t.get("maxDelinquencyDate")
-        if ("REPOSSESSION" in sc.upper() or "FORECLOSURE" in sc.upper()) and _months_since(when) <= CONFIG["recentRepoForeclosureMonths"]:
+        if ("REPOSSESSION" in sc.upper() or "FORECLOSURE" in sc.upper()) and _months_since(when) <= cfg["recentRepoForeclosureMonths"]:
             repo_fore = True
             break
     if repo_fore:
         ko_reasons.append("RECENT_REPO_OR_FORECLOSURE")
+    tr.lap("RECENT_REPO_OR_FORECLOSURE", repo_fore)
 
     # 90+ DPD ≤ 12m
     d90 = False
@@ -152,6 +187,7 @@ def evaluate_credit_policy(resp: Dict[str, Any], seon_tier: Optional[int], freez
             break
     if d90:
         ko_reasons.append("90DPD_LAST_12M")
+    tr.lap("90DPD_LAST_12M", d90)
 
     # Collections open > $500 ≤ 12m
     recent_coll = False
@@ -159,39 +195,45 @@ def evaluate_credit_policy(resp: Dict[str, Any], seon_tier: Optional[int], freez
         looks_coll = "COLLECT" in f"{t.get('specialComment') or ''} {t.get('originalCreditorName') or ''}".upper()
         bal = _num(t.get("balanceAmount"))
         when = t.get("openDate") or t.get("statusDate") or t.get("balanceDate")
-        if looks_coll and bal > CONFIG["collectionBalanceMin"] and _months_since(when) <= CONFIG["recentCollectionsMonths"]:
+        if looks_coll and bal > cfg["collectionBalanceMin"] and _months_since(when) <= cfg["recentCollectionsMonths"]:
             recent_coll = True
             break
     if recent_coll:
         ko_reasons.append("RECENT_COLLECTION_GT_500")
+    tr.lap("RECENT_COLLECTION_GT_500", recent_coll)
 
     # Revolving utilization > 90% (decline)
     open_rev = [t for t in tradelines if t.get("revolvingOrInstallment") == "R" and t.get("openOrClosed") == "O"]
     tot_bal = sum(_num(t.get("balanceAmount")) for t in open_rev)
     tot_lim = sum(_num((t.get("enhancedPaymentData") or {}).get("creditLimitAmount")) for t in open_rev)
     utilization = (tot_bal / tot_lim) if tot_lim > 0 else 0.0
-    if tot_lim > 0 and utilization > CONFIG["revolvingUtilizationMax"]:
+    if tot_lim > 0 and utilization > cfg["revolvingUtilizationMax"]:
         ko_reasons.append("REV_UTIL_GT_90")
+    tr.lap("REV_UTIL_GT_90", "REV_UTIL_GT_90" in ko_reasons)
 
     # Total past due > $500 and multiple past-due
     tot_past_due = sum(_num(t.get("amountPastDue")) for t in tradelines)
-    if tot_past_due > CONFIG["totalPastDueMin"]:
+    if tot_past_due > cfg["totalPastDueMin"]:
         ko_reasons.append("TOTAL_PAST_DUE_GT_500")
+    tr.lap("TOTAL_PAST_DUE_GT_500", "TOTAL_PAST_DUE_GT_500" in ko_reasons)
     num_past_due = sum(1 for t in tradelines if _num(t.get("amountPastDue")) > 0)
     if num_past_due > 1:
         ko_reasons.append("MULTIPLE_PAST_DUE")
+    tr.lap("MULTIPLE_PAST_DUE", "MULTIPLE_PAST_DUE" in ko_reasons)
 
     # Hard inquiries > threshold in last 6 months
     inquiries = cp.get("inquiry") or []
     hard6m = sum(1 for i in inquiries if _is_hard_inquiry(i) and _months_since(i.get("date")) <= 6)
-    if hard6m > CONFIG["hardInquiries6mMax"]:
+    if hard6m > cfg["hardInquiries6mMax"]:
         ko_reasons.append("EXCESSIVE_HARD_INQUIRIES_6M")
+    tr.lap("EXCESSIVE_HARD_INQUIRIES_6M", "EXCESSIVE_HARD_INQUIRIES_6M" in ko_reasons)
 
     # Thin & young file
     open_trades = [t for t in tradelines if t.get("openOrClosed") == "O"]
     oldest_open_months = min([_months_since(t.get("openDate") or "19000101") for t in open_trades] or [9999])
-    if len(open_trades) < CONFIG["thinFile"]["minOpenTrades"] and oldest_open_months < CONFIG["thinFile"]["minOldestOpenMonths"]:
+    if len(open_trades) < cfg["thinFile"]["minOpenTrades"] and oldest_open_months < cfg["thinFile"]["minOldestOpenMonths"]:
         ko_reasons.append("THIN_AND_YOUNG_FILE")
+    tr.lap("THIN_AND_YOUNG_FILE", "THIN_AND_YOUNG_FILE" in ko_reasons)
 
     # Score floor
     risk_models = cp.get("riskModel") or []
@@ -202,8 +244,9 @@ def evaluate_credit_policy(resp: Dict[str, Any], seon_tier: Optional[int], freez
             model = m
             break
     base_score = _num((model or {}).get("score"))
-    if model and base_score < CONFIG["scoreFloor"]:
+    if model and base_score < cfg["scoreFloor"]:
         ko_reasons.append("SCORE_BELOW_FLOOR")
+    tr.lap("SCORE_BELOW_FLOOR", "SCORE_BELOW_FLOOR" in ko_reasons)
 
     # If any KO, we decline
     if ko_reasons:
@@ -300,6 +343,8 @@ def evaluate_credit_policy(resp: Dict[str, Any], seon_tier: Optional[int], freez
     c_score += mix_adj
     contributions["creditMix"] = mix_adj
 
+    tr.lap("contribution_score")
+
     # Tier mapping
     if c_score >= 95:
         bureau_tier = 7
@@ -321,15 +366,18 @@ def evaluate_credit_policy(resp: Dict[str, Any], seon_tier: Optional[int], freez
     # Review flags
     if not model:
         review_reasons.append("NO_RISK_MODEL_SCORE")
+    tr.lap("NO_RISK_MODEL_SCORE", not model)
     disputed = any(str(t.get("consumerDisputeFlag") or "") for t in tradelines)
     if disputed:
         review_reasons.append("DISPUTED_TRADELINES")
+    tr.lap("DISPUTED_TRADELINES", disputed)
 
     final_decision = "CREDIT_PASS"
     if review_reasons:
         final_decision = "CREDIT_REVIEW"
 
     scorecard = _build_scorecard(model, utilization, hard6m, tradelines, open_rev, contributions)
+    scorecard["contributionScore"] = c_score
     final_tier = min(int(seon_tier or 0), int(bureau_tier)) if final_decision == "CREDIT_PASS" else None
 
     return {
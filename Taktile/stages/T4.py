@@ -1,5 +1,17 @@
 from typing import Any, Dict, Optional, Tuple
 
+from Taktile.service import rules
+
+
+CONFIG = {
+    "netMonthlyMin": 1000,
+    "suspiciousNetMonthlyMin": 1500,
+    "bankMinCoverageMonths": 3,
+    "creditLimitMultiplier": 8,
+    # Lower bound of net monthly income for tiers 7..1 (below the last bound: tier 0)
+    "incomeTierBounds": [5000, 3500, 2500, 1800, 1400, 1000, 800],
+}
+
 
 def _cadence_factor(cadence: Optional[str]) -> float:
     c = (cadence or "").upper()
@@ -41,20 +53,10 @@ def _net_monthly_from_bank(bank_income: Optional[Dict[str, Any]]) -> Optional[fl
 def _income_tier_from_net_monthly(net_monthly: float) -> int:
     # 7: ≥5000, 6: 3500–4999, 5: 2500–3499, 4: 1800–2499, 3: 1400–1799, 2: 1000–1399, 1: 800–999, 0: <800
     nm = float(net_monthly)
-    if nm >= 5000:
-        return 7
-    if nm >= 3500:
-        return 6
-    if nm >= 2500:
-        return 5
-    if nm >= 1800:
-        return 4
-    if nm >= 1400:
-        return 3
-    if nm >= 1000:
-        return 2
-    if nm >= 800:
-        return 1
+    bounds = CONFIG["incomeTierBounds"]
+    for i, bound in enumerate(bounds):
+        if nm >= bound:
+            return len(bounds) - i
     return 0
 
 
@@ -81,9 +83,12 @@ def evaluate_income(
     """
     reasons: list[str] = []
     review_reasons: list[str] = []
+    tr = rules.trace("T4")
 
     # Detect vendor-style errors → Review
-    if _has_plaid_error(payroll_resp) or _has_plaid_error(bank_resp) or _has_plaid_error(risk_resp):
+    failed = _has_plaid_error(payroll_resp) or _has_plaid_error(bank_resp) or _has_plaid_error(risk_resp)
+    tr.lap("vendor_error", failed)
+    if failed:
         return {
             "decision": "INCOME_REVIEW",
             "source_used": "unknown",
@@ -102,6 +107,7 @@ def evaluate_income(
     if isinstance(risk_resp, dict):
         risk_signals = risk_resp.get("signals") or []
     is_suspicious = any((s.get("code") or "").upper() != "NO_FINDINGS" and (s.get("severity") or "LOW") in ("MEDIUM", "HIGH") for s in risk_signals)
+    tr.lap("risk_signal_scan", is_suspicious)
 
     # Choose source
     source_used = "empty"
@@ -115,10 +121,13 @@ def evaluate_income(
         source_used = "bank"
         net_monthly = _net_monthly_from_bank(bank_income)
         coverage = bank_income.get("coverage")
+    tr.lap("income_source")
 
     # KO rules
     # 1) No income at all
-    if not net_monthly or net_monthly <= 0:
+    no_income = not net_monthly or net_monthly <= 0
+    tr.lap("NO_INCOME", no_income)
+    if no_income:
         return {
             "decision": "INCOME_DECLINE",
             "source_used": source_used,
@@ -131,7 +140,8 @@ def evaluate_income(
         }
 
     # 2) Net monthly too low (< 1000)
-    if net_monthly < 1000:
+    tr.lap("NET_MONTHLY_LT_1000", net_monthly < CONFIG["netMonthlyMin"])
+    if net_monthly < CONFIG["netMonthlyMin"]:
         return {
             "decision": "INCOME_DECLINE",
             "source_used": source_used,
@@ -144,7 +154,8 @@ def evaluate_income(
         }
 
     # 3) Suspicious + net monthly < 1500
-    if is_suspicious and net_monthly < 1500:
+    tr.lap("SUSPICIOUS_AND_LOW_INCOME", is_suspicious and net_monthly < CONFIG["suspiciousNetMonthlyMin"])
+    if is_suspicious and net_monthly < CONFIG["suspiciousNetMonthlyMin"]:
         return {
             "decision": "INCOME_DECLINE",
             "source_used": source_used,
@@ -159,7 +170,9 @@ def evaluate_income(
     # 4) Bank fallback coverage thin
     if source_used == "bank":
         cov = (coverage or "").upper()
-        if (cov != "FULL") and (coverage_months < 3):
+        thin = (cov != "FULL") and (coverage_months < CONFIG["bankMinCoverageMonths"])
+        tr.lap("INSUFFICIENT_COVERAGE", thin)
+        if thin:
             return {
                 "decision": "INCOME_DECLINE",
                 "source_used": source_used,
@@ -172,9 +185,10 @@ def evaluate_income(
             }
 
     # Review triggers (non-KO)
-    if is_suspicious and net_monthly >= 1500:
+    if is_suspicious and net_monthly >= CONFIG["suspiciousNetMonthlyMin"]:
         review_reasons.append("SUSPICIOUS_SIGNALS")
-    # Additional review hooks could include PDF fetch failure or employment mismatch.
+    tr.lap("SUSPICIOUS_SIGNALS", review_reasons)
+    # Additional review hooks could include PDF fetch failure (employment flags are applied by T5).
 
     # Compute tier and merge
     income_tier = _income_tier_from_net_monthly(net_monthly)
@@ -193,7 +207,7 @@ def evaluate_income(
         final_tier = None
 
     # Compute credit limit (8x monthly income) only on pass
-    credit_limit = round(net_monthly * 8, 2) if decision == "INCOME_PASS" else None
+    credit_limit = round(net_monthly * CONFIG["creditLimitMultiplier"], 2) if decision == "INCOME_PASS" else None
 
     return {
         "decision": decision,
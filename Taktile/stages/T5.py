@@ -0,0 +1,63 @@
+import re
+from typing import Any, Dict, List, Optional
+
+
+# Legal-form suffixes ignored when comparing employer names
+_SUFFIXES = {"inc", "incorporated", "corp", "corporation", "co", "company", "llc", "ltd", "limited", "plc", "lp"}
+
+
+def _employer_key(name: Any) -> str:
+    words = re.sub(r"[^a-z0-9 ]+", " ", str(name or "").lower()).split()
+    while words and words[-1] in _SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def evaluate_employment(employment_resp: Optional[Dict[str, Any]], payroll_resp: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    T5: Employment check (Plaid employment vs payroll income).
+
+    Flags:
+      - EMPLOYMENT_INACTIVE: the employment record is not ACTIVE
+      - EMPLOYER_MISMATCH: its employer is not payroll_income.employer (names compared without case,
+        punctuation or legal suffix; skipped when income did not come from payroll)
+    A missing response or a Plaid error leaves employment UNVERIFIED, which raises no flag.
+    """
+    employment = (employment_resp or {}).get("employment") if isinstance(employment_resp, dict) else None
+    if not isinstance(employment, dict) or (isinstance(employment_resp, dict) and employment_resp.get("error_code")):
+        return {"decision": "EMPLOYMENT_UNVERIFIED", "flags": [], "employer": None, "status": None, "payroll_employer": None}
+
+    payroll_income = (payroll_resp or {}).get("payroll_income") if isinstance(payroll_resp, dict) else None
+    payroll_employer = (payroll_income or {}).get("employer") if isinstance(payroll_income, dict) else None
+
+    flags: List[str] = []
+    status = str(employment.get("status") or "").upper()
+    if status != "ACTIVE":
+        flags.append("EMPLOYMENT_INACTIVE")
+    if payroll_employer and _employer_key(employment.get("employer")) != _employer_key(payroll_employer):
+        flags.append("EMPLOYER_MISMATCH")
+
+    return {
+        "decision": "EMPLOYMENT_FLAGGED" if flags else "EMPLOYMENT_VERIFIED",
+        "flags": flags,
+        "employer": employment.get("employer"),
+        "status": status or None,
+        "payroll_employer": payroll_employer,
+    }
+
+
+def apply_employment(income_eval: Dict[str, Any], employment_eval: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Attach the employment check to the T4 result. Flags turn an INCOME_PASS into INCOME_REVIEW (with the
+    flags as review reasons and, as for any income review, no tiers or limit); declines and reviews keep
+    their decision.
+    """
+    income_eval["employment"] = employment_eval
+    flags = employment_eval.get("flags") or []
+    if flags and income_eval.get("decision") == "INCOME_PASS":
+        income_eval["decision"] = "INCOME_REVIEW"
+        income_eval["review_reasons"] = list(income_eval.get("review_reasons") or []) + flags
+        income_eval["income_tier"] = None
+        income_eval["final_tier"] = None
+        income_eval["credit_limit"] = None
+    return income_eval
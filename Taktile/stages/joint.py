@@ -0,0 +1,56 @@
+"""
+Joint applications: combine the per-applicant KYC results (T3/T4 outputs) into one decision, tier and limit.
+
+Each applicant has to clear every gate on their own. A decline from either applicant declines the application,
+and otherwise a review from either sends it to review. When both pass:
+  - credit tier: the lower of the two credit final tiers (the weaker file sets the credit tier)
+  - income tier: T4's tier for the applicants' combined net monthly income
+  - final tier: the lower of the two, as in the single-applicant flow
+  - credit limit: T4's multiplier applied to the combined net monthly income
+"""
+from typing import Any, Dict, List, Optional
+
+from Taktile.stages.T4 import CONFIG as INCOME_CONFIG, _income_tier_from_net_monthly
+
+
+def _outcome(status: Optional[str]) -> str:
+    status = status or ""
+    if status.endswith("_DECLINE"):
+        return "decline"
+    return "pass" if status == "INCOME_PASS" else "review"
+
+
+def combine_joint(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    `results`: {applicant role: /workflows/kyc/full response}. Returns the joint decision:
+    {decision: JOINT_PASS | JOINT_REVIEW | JOINT_DECLINE, declined_by, review_by, credit_tier, income_tier,
+     final_tier, net_monthly, credit_limit}
+    """
+    outcomes = {role: _outcome(r.get("status")) for role, r in results.items()}
+    declined_by: List[str] = [role for role, o in outcomes.items() if o == "decline"]
+    review_by: List[str] = [role for role, o in outcomes.items() if o == "review"]
+    out: Dict[str, Any] = {
+        "decision": "JOINT_DECLINE" if declined_by else ("JOINT_REVIEW" if review_by else "JOINT_PASS"),
+        "declined_by": declined_by,
+        "review_by": review_by,
+        "credit_tier": None,
+        "income_tier": None,
+        "final_tier": None,
+        "net_monthly": None,
+        "credit_limit": None,
+    }
+    if out["decision"] != "JOINT_PASS":
+        return out
+
+    credit_tiers = [(r.get("credit_decision") or {}).get("final_tier") for r in results.values()]
+    net_monthly = round(sum(float(((r.get("income_decision") or {}).get("metrics") or {}).get("net_monthly") or 0.0) for r in results.values()), 2)
+    income_tier = _income_tier_from_net_monthly(net_monthly)
+    credit_tier = min(int(t) for t in credit_tiers) if all(t is not None for t in credit_tiers) else None
+    out.update(
+        credit_tier=credit_tier,
+        income_tier=income_tier,
+        final_tier=min(credit_tier, income_tier) if credit_tier is not None else None,
+        net_monthly=net_monthly,
+        credit_limit=round(net_monthly * INCOME_CONFIG["creditLimitMultiplier"], 2),
+    )
+    return out
@@ -0,0 +1 @@
+# Mock TransUnion package
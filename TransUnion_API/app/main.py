@@ -0,0 +1,259 @@
+"""
+Mock TransUnion credit report API - FastAPI single-file service (modelled on Experian_API)
+
+The body uses the same Credit Profile layout as the Experian mock (creditProfile / riskModel / tradeline ...),
+so Taktile's T3 policy and the multi-bureau merge read all bureaus the same way. The file itself differs:
+another score, a partly overlapping set of tradelines and TransUnion's own inquiry.
+
+README (developer quickstart)
+- Install:
+    pip install fastapi uvicorn pydantic
+
+- Run (port 8400):
+    uvicorn TransUnion_API.app.main:app --reload --port 8400
+
+- Health:
+    curl -s http://localhost:8400/
+
+- Success example:
+    curl -X POST http://localhost:8400/v1/credit-report \
+      -H "Authorization: Bearer tu-sandbox-token" \
+      -H "X-TU-Subscriber-Code: SBTU01" \
+      -H "Content-Type: application/json" \
+      -H "Accept: application/json" \
+      -d '{"consumerPii": {"primaryApplicant": {"name": {"firstName": "JON", "lastName": "CONSUMER"}}}}'
+
+- Scenarios (addOns.scenario): pass | review_credit | ko_credit, as for Experian
+- Error simulations (set lastName):
+  FAIL_400 -> 400, FAIL_403 -> 403, FAIL_404 -> 404, FAIL_500 -> 500, TIMEOUT -> ~12s delay then 504
+- TRANSUNION_DELAY_MS adds a fixed delay to every report (to try per-bureau timeouts)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import uuid
+from typing import List, Optional
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+# --------- Pydantic request models (minimal fields we use) ---------
+
+
+class Name(BaseModel):
+    firstName: Optional[str] = None
+    middleName: Optional[str] = None
+    lastName: str
+
+
+class Dob(BaseModel):
+    dob: Optional[str] = None
+
+
+class SSN(BaseModel):
+    ssn: Optional[str] = None
+
+
+class Address(BaseModel):
+    line1: Optional[str] = None
+    line2: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    zipCode: Optional[str] = None
+    country: Optional[str] = None
+
+
+class PrimaryApplicant(BaseModel):
+    name: Name
+    dob: Optional[Dob] = None
+    ssn: Optional[SSN] = None
+    currentAddress: Optional[Address] = None
+    previousAddress: Optional[List[Address]] = None
+
+
+class ConsumerPii(BaseModel):
+    primaryApplicant: PrimaryApplicant
+
+
+class CreditReportRequest(BaseModel):
+    consumerPii: ConsumerPii
+    permissiblePurpose: Optional[dict] = None
+    addOns: Optional[dict] = None
+
+
+# --------- Header / Auth dependency ---------
+
+
+def require_headers(
+    authorization: str = Header(..., alias="Authorization"),
+    subscriber_code: str = Header(..., alias="X-TU-Subscriber-Code"),
+    content_type: str = Header(..., alias="Content-Type"),
+    accept: str = Header(..., alias="Accept"),
+) -> dict:
+    if not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Invalid Authorization scheme")
+    if authorization.split(" ", 1)[1] != "tu-sandbox-token":
+        raise HTTPException(status_code=401, detail="Invalid bearer token")
+    if content_type.lower() != "application/json":
+        raise HTTPException(status_code=415, detail="Unsupported Content-Type")
+    if "application/json" not in accept.lower():
+        raise HTTPException(status_code=406, detail="Not Acceptable")
+    return {"subscriberCode": subscriber_code}
+
+
+# --------- Bodies ---------
+
+
+def error_body(status: int, code: str, message: str) -> dict:
+    return {
+        "creditProfile": [],
+        "errors": [{"code": code, "message": message, "status": str(status)}],
+        "dataSource": {"dataSourceResponse": "TRANSUNION"},
+    }
+
+
+def make_success_body(req: CreditReportRequest) -> dict:
+    return {
+        "creditProfile": [
+            {
+                "headerRecord": [{"reportDate": "063015", "reportTime": "121000", "bureau": "TRANSUNION", "versionNo": "04"}],
+                "publicRecord": [],
+                "statement": [
+                    {
+                        "dateReported": "06302015",
+                        "statementText": "FILE FROZEN DUE TO STATE LEGISLATION.",
+                        "type": "General",
+                    }
+                ],
+                "inquiry": [
+                    {"date": "08062013", "subscriberName": "EXPERIAN", "type": "SOFT"},
+                    {"date": "11152014", "subscriberName": "TRANSUNION", "type": "SOFT"},
+                ],
+                "riskModel": [
+                    {
+                        "modelIndicator": "FICO9",
+                        "score": "675",
+                        "evaluation": "OK",
+                        "scoreFactors": [{"importance": "M", "code": "PAST_DUE_HISTORY"}],
+                    }
+                ],
+                "fraudShield": [{"fraudShieldIndicators": {"indicator": []}, "text": "No fraud alerts on file."}],
+                "ofac": {"messageNumber": "", "messageText": ""},
+                "tradeline": [
+                    {
+                        # Same card as on the Experian/Equifax files (dedupes in a tri-merge)
+                        "subscriberName": "123 CREDIT CARDS",
+                        "subscriberCode": "0122868651",
+                        "accountNumber": "4003XXXXXXXX",
+                        "accountType": "Credit card",
+                        "revolvingOrInstallment": "R",
+                        "openOrClosed": "O",
+                        "status": "Open",
+                        "statusDate": "062015",
+                        "openDate": "112013",
+                        "balanceAmount": "273",
+                        "balanceDate": "06032015",
+                        "amountPastDue": "20",
+                        "enhancedPaymentData": {"creditLimitAmount": "1500", "enhancedPaymentStatus": "30"},
+                    },
+                    {
+                        "subscriberName": "AMERICAN APARTMENTS",
+                        "subscriberCode": "0122868651",
+                        "accountNumber": "48886031311",
+                        "accountType": "Rental",
+                        "revolvingOrInstallment": "I",
+                        "openOrClosed": "C",
+                        "status": "Inactive/Never late",
+                        "statusDate": "052015",
+                        "openDate": "102014",
+                        "balanceAmount": "4000",
+                        "monthlyPaymentAmount": "1000",
+                        "enhancedPaymentData": {"enhancedPaymentStatus": "OK"},
+                    },
+                    {
+                        "subscriberName": "METRO STUDENT LOANS",
+                        "subscriberCode": "0441987700",
+                        "accountNumber": "7700231",
+                        "accountType": "Student loan",
+                        "revolvingOrInstallment": "I",
+                        "openOrClosed": "O",
+                        "status": "Current",
+                        "statusDate": "052015",
+                        "openDate": "092010",
+                        "balanceAmount": "8200",
+                        "monthlyPaymentAmount": "120",
+                        "enhancedPaymentData": {"enhancedPaymentStatus": "OK"},
+                    },
+                ],
+            }
+        ],
+        "dataSource": {"dataSourceResponse": "TRANSUNION"},
+        "referenceIds": [],
+    }
+
+
+def shape_scenario(body: dict, scenario: Optional[str]) -> None:
+    cp = (body.get("creditProfile") or [{}])[0]
+    if scenario == "pass":
+        cp["statement"] = []
+        cp["riskModel"][0]["score"] = "768"
+        cp["tradeline"][0]["amountPastDue"] = "0"
+    elif scenario == "review_credit":
+        cp["riskModel"] = []
+        cp["tradeline"][0]["consumerDisputeFlag"] = "Y"
+    elif scenario == "ko_credit":
+        cp["ofac"]["messageText"] = "MATCH FOUND"
+
+
+# --------- FastAPI app ---------
+
+
+app = FastAPI(title="Mock TransUnion Credit Report", version="0.1.0")
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=int(os.getenv("GZIP_MINIMUM_SIZE", "1024")),
+    compresslevel=int(os.getenv("GZIP_COMPRESSLEVEL", "6")),
+)
+
+
+@app.get("/")
+async def root():
+    return {"status": "ok", "service": "mock-transunion-credit-report"}
+
+
+@app.post("/v1/credit-report")
+async def credit_report(req: CreditReportRequest, resp: Response, hdrs: dict = Depends(require_headers)):
+    delay_ms = float(os.getenv("TRANSUNION_DELAY_MS", "0"))
+    if delay_ms > 0:
+        await asyncio.sleep(delay_ms / 1000.0)
+    resp.headers["X-TU-Transaction-Id"] = str(uuid.uuid4())
+
+    last = req.consumerPii.primaryApplicant.name.lastName.upper().strip()
+    if last == "TIMEOUT":
+        await asyncio.sleep(12)
+        return JSONResponse(status_code=504, content=error_body(504, "TIMEOUT", "Gateway Timeout"))
+    error_map = {
+        "FAIL_400": (400, "BAD_REQUEST", "Malformed request"),
+        "FAIL_403": (403, "FORBIDDEN", "Forbidden"),
+        "FAIL_404": (404, "NOT_FOUND", "Consumer not found"),
+        "FAIL_500": (500, "SERVER_ERROR", "Internal server error"),
+    }
+    if last in error_map:
+        status, code, msg = error_map[last]
+        return JSONResponse(status_code=status, content=error_body(status, code, msg))
+
+    body = make_success_body(req)
+    scenario = (req.addOns or {}).get("scenario") if isinstance(req.addOns, dict) else None
+    shape_scenario(body, scenario)
+    return body
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=8400)